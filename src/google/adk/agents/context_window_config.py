@@ -0,0 +1,59 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+from google.genai import types
+from pydantic import BaseModel
+from pydantic import ConfigDict
+from pydantic import Field
+
+
+class ContextWindowConfig(BaseModel):
+  """Configs for the size of the contents an agent sends to the model.
+
+  Once the contents of a model request exceed `max_tokens`, the oldest contents
+  are dropped until they fit. A function call and its function response are
+  dropped together, and the latest content is always kept. The kept contents
+  start at a user turn: during a tool loop, the latest question of the user is
+  kept, followed by the latest tool round trips that fit `max_tokens`.
+
+  To keep the gist of the dropped contents, compact the session with a
+  `SessionCompactor` and an `LlmEventSummarizer`.
+  """
+
+  model_config = ConfigDict(
+      arbitrary_types_allowed=True,
+      extra='forbid',
+  )
+  """The pydantic model config."""
+
+  max_tokens: int = Field(gt=0)
+  """The maximum number of tokens of the contents of a model request."""
+
+  count_tokens: Optional[
+      Callable[[types.Content], Union[int, Awaitable[int]]]
+  ] = None
+  """Counts the tokens of a content, e.g. with the tokenizer of the model.
+
+  Can be sync or async, e.g. to call the `count_tokens` API of the model.
+
+  When not set, the tokens are estimated locally from the size of the content,
+  at about 4 characters per token.
+  """
@@ -14,12 +14,14 @@
 
 from __future__ import annotations
 
+from typing import Any
 from typing import Optional
 import uuid
 
 from google.genai import types
 from pydantic import BaseModel
 from pydantic import ConfigDict
+from pydantic import PrivateAttr
 
 from ..artifacts.base_artifact_service import BaseArtifactService
 from ..memory.base_memory_service import BaseMemoryService
@@ -156,6 +158,13 @@ class InvocationContext(BaseModel):
   of this invocation.
   """
 
+  _contents_builders: dict[tuple[Optional[str], str], Any] = PrivateAttr(
+      default_factory=dict
+  )
+  """The builders of the LLM request contents, by branch and agent name, reused
+  across the steps of this invocation.
+  """
+
   def increment_llm_call_count(
       self,
   ):
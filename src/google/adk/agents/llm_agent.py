@@ -50,6 +50,7 @@ from ..tools.function_tool import FunctionTool
 from ..tools.tool_context import ToolContext
 from .base_agent import BaseAgent
 from .callback_context import CallbackContext
+from .context_window_config import ContextWindowConfig
 from .invocation_context import InvocationContext
 from .readonly_context import ReadonlyContext
 
@@ -138,6 +139,13 @@ class LlmAgent(BaseAgent):
   tools: list[ToolUnion] = Field(default_factory=list)
   """Tools available to this agent."""
 
+  max_parallel_tool_calls: Optional[int] = Field(default=None, gt=0)
+  """The maximum number of function calls of a model response run at once.
+
+  The parallel function calls of a model response run concurrently, except for
+  the tools with `run_serially` set. No limit is applied when not set.
+  """
+
   generate_content_config: Optional[types.GenerateContentConfig] = None
   """The additional content generation configurations.
 
@@ -167,6 +175,14 @@ class LlmAgent(BaseAgent):
   user messages, tool results, etc.
   """
 
+  context_window: Optional[ContextWindowConfig] = None
+  """Bounds the number of tokens of the contents in the model request.
+
+  When set, the oldest contents are dropped from the model request once they
+  exceed the token budget, so that long sessions do not grow the prompt
+  without bound. The session events are kept.
+  """
+
   # Controlled input/output configurations - Start
   input_schema: Optional[type[BaseModel]] = None
   """The input schema when agent is used as a tool."""
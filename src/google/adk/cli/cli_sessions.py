@@ -0,0 +1,102 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from typing import Optional
+from typing import TextIO
+
+import click
+
+from ..sessions import session_transfer
+from ..sessions.base_session_service import BaseSessionService
+from ..sessions.session_transfer import TransferStats
+
+
+def create_session_service(
+    session_db_url: str,
+) -> tuple[BaseSessionService, Optional[str]]:
+  """Creates the session service connecting to the session DB URL.
+
+  Returns:
+    The session service, and the Agent Engine ID for 'agentengine://' URLs.
+    Agent Engine stores the sessions under its ID instead of the app name.
+  """
+  if session_db_url.startswith("agentengine://"):
+    from ..sessions.vertex_ai_session_service import VertexAiSessionService
+
+    agent_engine_id = session_db_url.split("://")[1]
+    if not agent_engine_id:
+      raise click.ClickException("Agent engine id can not be empty.")
+    return (
+        VertexAiSessionService(
+            os.environ["GOOGLE_CLOUD_PROJECT"],
+            os.environ["GOOGLE_CLOUD_LOCATION"],
+        ),
+        agent_engine_id,
+    )
+
+  from ..sessions.database_session_service import DatabaseSessionService
+
+  return DatabaseSessionService(db_url=session_db_url), None
+
+
+async def run_export(
+    *,
+    session_db_url: str,
+    app_name: Optional[str],
+    user_ids: list[str],
+    output: TextIO,
+) -> TransferStats:
+  """Exports the sessions of the users as NDJSON to the output."""
+  session_service, agent_engine_id = create_session_service(session_db_url)
+  # Connect to managed session if agent_engine_id is set.
+  app_name = agent_engine_id if agent_engine_id else app_name
+  if not app_name:
+    raise click.ClickException("--app_name is required.")
+  stats = await session_transfer.export_sessions(
+      session_service, output, app_name=app_name, user_ids=user_ids
+  )
+  _echo_stats("Exported", stats)
+  return stats
+
+
+async def run_import(
+    *,
+    session_db_url: str,
+    input_file: TextIO,
+    batch_size: int,
+) -> TransferStats:
+  """Imports the sessions from the NDJSON input."""
+  session_service, agent_engine_id = create_session_service(session_db_url)
+  stats = await session_transfer.import_sessions(
+      session_service,
+      input_file,
+      batch_size=batch_size,
+      # Agent Engine generates the session IDs, and stores the sessions under
+      # its ID.
+      keep_session_ids=not agent_engine_id,
+      app_name=agent_engine_id,
+  )
+  _echo_stats("Imported", stats)
+  return stats
+
+
+def _echo_stats(action: str, stats: TransferStats):
+  # Written to stderr, as the export may be written to stdout.
+  click.echo(
+      f"{action} {stats.num_sessions} sessions and {stats.num_events} events"
+      f" in {stats.elapsed_seconds:.2f}s"
+      f" ({stats.events_per_second:.0f} events/s).",
+      err=True,
+  )
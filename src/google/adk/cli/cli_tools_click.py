@@ -26,6 +26,7 @@ import uvicorn
 
 from . import cli_create
 from . import cli_deploy
+from . import cli_sessions
 from .. import version
 from .cli import run_cli
 from .cli_eval import MISSING_EVAL_DEPENDENCIES_MESSAGE
@@ -92,6 +93,12 @@ def deploy():
   pass
 
 
+@main.group()
+def sessions():
+  """Migrates sessions between session storages."""
+  pass
+
+
 @main.command("create", cls=HelpfulCommand)
 @click.option(
     "--model",
@@ -732,3 +739,102 @@ def cli_deploy_cloud_run(
     )
   except Exception as e:
     click.secho(f"Deploy failed: {e}", fg="red", err=True)
+
+
+_SESSION_DB_URL_HELP = """Required. The database URL of the session storage.
+
+  - Use 'agentengine://<agent_engine_resource_id>' to connect to Agent Engine sessions.
+
+  - Use 'sqlite://<path_to_sqlite_file>' to connect to a SQLite DB.
+
+  - See https://docs.sqlalchemy.org/en/20/core/engines.html#backend-specific-urls for more details on supported DB URLs."""
+
+
+@sessions.command("export", cls=HelpfulCommand)
+@click.option(
+    "--session_db_url",
+    type=str,
+    required=True,
+    help=_SESSION_DB_URL_HELP,
+)
+@click.option(
+    "--app_name",
+    type=str,
+    help=(
+        "Required unless exporting from Agent Engine, which stores the"
+        " sessions under its ID. The app name of the sessions to export."
+    ),
+)
+@click.option(
+    "--user_id",
+    "user_ids",
+    type=str,
+    multiple=True,
+    required=True,
+    help=(
+        "Required. The user whose sessions are exported. Can be repeated."
+        " Session services cannot list their users, so there is no option to"
+        " export the sessions of all users."
+    ),
+)
+@click.argument("output", type=click.File("w"), default="-")
+def cli_sessions_export(
+    session_db_url: str,
+    app_name: Optional[str],
+    user_ids: tuple[str],
+    output,
+):
+  """Exports sessions and their events as NDJSON.
+
+  OUTPUT: The file to write the sessions to, stdout by default.
+
+  Example:
+
+    adk sessions export --session_db_url=sqlite:///sessions.db
+    --app_name=my_app --user_id=user sessions.ndjson
+  """
+  asyncio.run(
+      cli_sessions.run_export(
+          session_db_url=session_db_url,
+          app_name=app_name,
+          user_ids=list(user_ids),
+          output=output,
+      )
+  )
+
+
+@sessions.command("import", cls=HelpfulCommand)
+@click.option(
+    "--session_db_url",
+    type=str,
+    required=True,
+    help=_SESSION_DB_URL_HELP,
+)
+@click.option(
+    "--batch_size",
+    type=int,
+    default=100,
+    show_default=True,
+    help="Optional. The number of events inserted at once.",
+)
+@click.argument("input_file", type=click.File("r"), default="-")
+def cli_sessions_import(
+    session_db_url: str,
+    batch_size: int,
+    input_file,
+):
+  """Imports sessions exported by `adk sessions export`.
+
+  INPUT_FILE: The NDJSON file to read the sessions from, stdin by default.
+
+  Example:
+
+    adk sessions import --session_db_url=postgresql://... sessions.ndjson
+  """
+  asyncio.run(
+      cli_sessions.run_import(
+          session_db_url=session_db_url,
+          input_file=input_file,
+          batch_size=batch_size,
+      )
+  )
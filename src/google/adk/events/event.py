@@ -15,7 +15,8 @@ from __future__ import annotations
 
 from datetime import datetime
 import random
-import string
+import threading
+import time
 from typing import Optional
 
 from google.genai import types
@@ -26,6 +27,16 @@ from pydantic import Field
 from ..models.llm_response import LlmResponse
 from .event_actions import EventActions
 
+# The number of random bits of a UUIDv7, in the rand_a and rand_b fields.
+_RANDOM_BITS = 74
+_RANDOM_MASK = (1 << _RANDOM_BITS) - 1
+_UUID_VERSION_7 = 0x7000
+_UUID_VARIANT_RFC_4122 = 0b10
+
+_id_lock = threading.Lock()
+_last_id_millis = 0
+_last_id_random = 0
+
 
 class Event(LlmResponse):
   """Represents an event in a conversation between agents and users.
@@ -132,5 +143,32 @@ class Event(LlmResponse):
 
   @staticmethod
   def new_id():
-    characters = string.ascii_letters + string.digits
-    return ''.join(random.choice(characters) for _ in range(8))
+    """Returns a new time-ordered ID, formatted as a UUIDv7.
+
+    IDs sort in creation order within a process: IDs created in the same
+    millisecond increment the random bits of the previous ID instead of drawing
+    new ones.
+    """
+    global _last_id_millis, _last_id_random
+    with _id_lock:
+      millis = time.time_ns() // 1_000_000
+      if millis > _last_id_millis:
+        _last_id_millis = millis
+        _last_id_random = random.getrandbits(_RANDOM_BITS)
+      else:
+        # Same millisecond, or the clock went backwards.
+        _last_id_random = (_last_id_random + 1) & _RANDOM_MASK
+        if not _last_id_random:
+          _last_id_millis += 1
+      millis, random_bits = _last_id_millis, _last_id_random
+    digits = '%032x' % (
+        millis << 80
+        | (_UUID_VERSION_7 | random_bits >> 62) << 64
+        | _UUID_VARIANT_RFC_4122 << 62
+        | random_bits & ((1 << 62) - 1)
+    )
+    # Formatted directly, as building a `uuid.UUID` is slower.
+    return (
+        f'{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-'
+        f'{digits[20:]}'
+    )
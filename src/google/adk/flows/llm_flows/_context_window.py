@@ -0,0 +1,169 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Handles the token budget of the contents of LLM requests."""
+
+from __future__ import annotations
+
+import inspect
+import logging
+import math
+from typing import AsyncGenerator
+
+from google.genai import types
+from typing_extensions import override
+
+from ...agents.invocation_context import InvocationContext
+from ...events.event import Event
+from ...models.llm_request import LlmRequest
+from ._base_llm_processor import BaseLlmRequestProcessor
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+_CHARS_PER_TOKEN = 4
+# The number of tokens of an image or another media part, as counted by Gemini.
+_TOKENS_PER_MEDIA_PART = 258
+
+
+class _ContextWindowLlmRequestProcessor(BaseLlmRequestProcessor):
+  """Drops the oldest contents that exceed the token budget of the agent."""
+
+  @override
+  async def run_async(
+      self, invocation_context: InvocationContext, llm_request: LlmRequest
+  ) -> AsyncGenerator[Event, None]:
+    from ...agents.llm_agent import LlmAgent
+
+    agent = invocation_context.agent
+    if not isinstance(agent, LlmAgent) or not agent.context_window:
+      return
+    if not llm_request.contents:
+      return
+
+    count_tokens = agent.context_window.count_tokens or _estimate_tokens
+    groups = _group_function_responses(llm_request.contents)
+    group_tokens = []
+    for group in groups:
+      num_group_tokens = 0
+      for content in group:
+        num_content_tokens = count_tokens(content)
+        if inspect.isawaitable(num_content_tokens):
+          num_content_tokens = await num_content_tokens
+        num_group_tokens += num_content_tokens
+      group_tokens.append(num_group_tokens)
+    kept_groups = _select_groups(
+        groups, group_tokens, agent.context_window.max_tokens
+    )
+    if len(kept_groups) < len(groups):
+      logger.debug(
+          'Dropped %d content groups of agent %s to fit %d tokens.',
+          len(groups) - len(kept_groups),
+          agent.name,
+          agent.context_window.max_tokens,
+      )
+      llm_request.contents = [
+          content for i in kept_groups for content in groups[i]
+      ]
+
+    # Maintain async generator behavior
+    if False:  # Ensures it behaves as a generator
+      yield  # This is a no-op but maintains generator structure
+
+
+request_processor = _ContextWindowLlmRequestProcessor()
+
+
+def _estimate_tokens(content: types.Content) -> int:
+  """Estimates the number of tokens of a content from its size."""
+  num_chars = 0
+  num_tokens = 0
+  for part in content.parts or []:
+    if part.text:
+      num_chars += len(part.text)
+    elif part.function_call:
+      num_chars += len(part.function_call.name or '') + len(
+          str(part.function_call.args)
+      )
+    elif part.function_response:
+      num_chars += len(part.function_response.name or '') + len(
+          str(part.function_response.response)
+      )
+    elif part.inline_data or part.file_data:
+      num_tokens += _TOKENS_PER_MEDIA_PART
+    else:
+      num_chars += len(part.model_dump_json(exclude_none=True))
+  return num_tokens + math.ceil(num_chars / _CHARS_PER_TOKEN)
+
+
+def _is_user_turn(content: types.Content) -> bool:
+  return content.role == 'user' and not any(
+      part.function_response for part in content.parts or []
+  )
+
+
+def _select_groups(
+    groups: list[list[types.Content]],
+    group_tokens: list[int],
+    max_tokens: int,
+) -> list[int]:
+  """Returns the indexes of the groups to keep within `max_tokens`.
+
+  The oldest groups are dropped first, and the latest group is always kept. The
+  kept contents must start with a user turn: Gemini rejects a function call
+  that does not follow a user turn or a function response. In the middle of a
+  tool loop, where no user turn follows the dropped groups, the last user turn
+  is kept instead, followed by the latest tool round trips that fit the budget.
+  """
+  start = 0
+  num_tokens = sum(group_tokens)
+  while num_tokens > max_tokens and start < len(groups) - 1:
+    num_tokens -= group_tokens[start]
+    start += 1
+  if not start:
+    return list(range(len(groups)))
+  for i in range(start, len(groups)):
+    if _is_user_turn(groups[i][0]):
+      return list(range(i, len(groups)))
+  user_turn = next(
+      (i for i in range(start - 1, -1, -1) if _is_user_turn(groups[i][0])),
+      None,
+  )
+  if user_turn is None:
+    return list(range(start, len(groups)))
+  start = len(groups) - 1
+  num_tokens = group_tokens[user_turn] + group_tokens[start]
+  while (
+      start - 1 > user_turn
+      and num_tokens + group_tokens[start - 1] <= max_tokens
+  ):
+    start -= 1
+    num_tokens += group_tokens[start]
+  return [user_turn] + list(range(start, len(groups)))
+
+
+def _group_function_responses(
+    contents: list[types.Content],
+) -> list[list[types.Content]]:
+  """Groups each function response content with the content before it.
+
+  The contents builder places the function responses right after their function
+  calls, so that a group is never split between a call and its response.
+  """
+  groups: list[list[types.Content]] = []
+  for content in contents:
+    if groups and any(part.function_response for part in content.parts or []):
+      groups[-1].append(content)
+    else:
+      groups.append([content])
+  return groups
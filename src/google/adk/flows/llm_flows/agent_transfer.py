@@ -56,7 +56,8 @@ class _AgentTransferLlmRequestProcessor(BaseLlmRequestProcessor):
         )
     ])
 
-    transfer_to_agent_tool = FunctionTool(func=transfer_to_agent)
+    # Only sets the transfer action, so it doesn't need a worker thread.
+    transfer_to_agent_tool = FunctionTool(func=transfer_to_agent, executor=None)
     tool_context = ToolContext(invocation_context)
     await transfer_to_agent_tool.process_llm_request(
         tool_context=tool_context, llm_request=llm_request
@@ -42,11 +42,14 @@ class _ContentLlmRequestProcessor(BaseLlmRequestProcessor):
       return
 
     if agent.include_contents != 'none':
-      llm_request.contents = _get_contents(
-          invocation_context.branch,
-          invocation_context.session.events,
-          agent.name,
-      )
+      # The builder only processes the events appended since the previous step
+      # of the invocation.
+      key = (invocation_context.branch, agent.name)
+      builder = invocation_context._contents_builders.get(key)
+      if builder is None:
+        builder = _ContentsBuilder(invocation_context.branch, agent.name)
+        invocation_context._contents_builders[key] = builder
+      llm_request.contents = builder.build(invocation_context.session.events)
 
     # Maintain async generator behavior
     if False:  # Ensures it behaves as a generator
@@ -196,10 +199,113 @@ def _get_contents(
   Returns:
     A list of contents.
   """
-  filtered_events = []
-  # Parse the events, leaving the contents and the function calls and
-  # responses from the current agent.
-  for event in events:
+  return _ContentsBuilder(current_branch, agent_name).build(events)
+
+
+class _ContentsBuilder:
+  """Builds the contents for the LLM request incrementally.
+
+  The events of a session are only appended to during an invocation, so each
+  event is filtered, converted and copied once, by the first step that sees it.
+  The async function responses are then only rearranged from the earliest
+  function call whose responses changed, instead of across the whole history.
+
+  The contents returned by `build` are copies of the cached ones down to the
+  parts, so that request processors can replace or modify parts. The nested
+  objects of the parts, e.g. function call arguments, are shared and must be
+  treated as immutable.
+  """
+
+  def __init__(self, current_branch: Optional[str], agent_name: str):
+    self._current_branch = current_branch
+    self._agent_name = agent_name
+    self._reset(None)
+
+  def _reset(self, events: Optional[list[Event]]):
+    # The session events processed so far.
+    self._events = events
+    self._num_events = 0
+    self._last_event: Optional[Event] = None
+    # The events kept for the contents, with the IDs of their function calls
+    # and function responses.
+    self._filtered_events: list[Event] = []
+    self._function_call_ids: list[list[str]] = []
+    self._function_response_ids: list[list[str]] = []
+    # The indexes in the filtered events of the function call events and of the
+    # latest function response event, by function call ID.
+    self._function_call_indexes: dict[str, list[int]] = {}
+    self._function_response_indexes: dict[str, int] = {}
+    # The filtered events rearranged with their function responses, and the
+    # length of the rearranged events before each filtered event.
+    self._arranged_events: list[Event] = []
+    self._arranged_lengths: list[int] = []
+    # The merged function response events, by their filtered event indexes.
+    self._merged_events: dict[tuple[int, ...], Event] = {}
+    # The event and its content to send, by event ID.
+    self._contents: dict[int, tuple[Event, types.Content]] = {}
+
+  def build(self, events: list[Event]) -> list[types.Content]:
+    """Returns the contents for the events of the session."""
+    if not self._extends_processed_events(events):
+      self._reset(events)
+
+    # The index of the first filtered event to rearrange.
+    first_changed_index = len(self._filtered_events)
+    for event in events[self._num_events :]:
+      if not self._is_included(event):
+        continue
+      index = len(self._filtered_events)
+      if _is_other_agent_reply(self._agent_name, event):
+        event = _convert_foreign_event(event)
+      self._filtered_events.append(event)
+      function_call_ids = [
+          function_call.id for function_call in event.get_function_calls()
+      ]
+      function_response_ids = [
+          function_response.id
+          for function_response in event.get_function_responses()
+      ]
+      self._function_call_ids.append(function_call_ids)
+      self._function_response_ids.append(function_response_ids)
+      for function_call_id in function_call_ids:
+        self._function_call_indexes.setdefault(function_call_id, []).append(
+            index
+        )
+      for function_call_id in function_response_ids:
+        self._function_response_indexes[function_call_id] = index
+        # The function call events answered earlier are rearranged again.
+        for call_index in self._function_call_indexes.get(function_call_id, []):
+          first_changed_index = min(first_changed_index, call_index)
+    self._num_events = len(events)
+    self._last_event = events[-1] if events else None
+    self._rearrange(first_changed_index)
+
+    latest_events = _rearrange_events_for_latest_function_response(
+        self._filtered_events
+    )
+    if latest_events is not self._filtered_events:
+      # The latest function response answers an earlier async function call,
+      # and the events in between are dropped for this request only.
+      return [
+          self._content(event, cache=False)
+          for event in (
+              _rearrange_events_for_async_function_responses_in_history(
+                  latest_events
+              )
+          )
+      ]
+
+    return [self._content(event) for event in self._arranged_events]
+
+  def _extends_processed_events(self, events: list[Event]) -> bool:
+    """Whether the events are the processed ones, with new events appended."""
+    if events is not self._events or len(events) < self._num_events:
+      return False
+    return (
+        not self._num_events or events[self._num_events - 1] is self._last_event
+    )
+
+  def _is_included(self, event: Event) -> bool:
     if (
         not event.content
         or not event.content.role
@@ -209,31 +315,70 @@ def _get_contents(
       # Skip events without content, or generated neither by user nor by model
       # or has empty text.
       # E.g. events purely for mutating session states.
-      continue
-    if not _is_event_belongs_to_branch(current_branch, event):
+      return False
+    if not _is_event_belongs_to_branch(self._current_branch, event):
       # Skip events not belong to current branch.
-      continue
+      return False
     if _is_auth_event(event):
       # skip auth event
-      continue
-    filtered_events.append(
-        _convert_foreign_event(event)
-        if _is_other_agent_reply(agent_name, event)
-        else event
-    )
+      return False
+    return True
 
-  result_events = _rearrange_events_for_latest_function_response(
-      filtered_events
-  )
-  result_events = _rearrange_events_for_async_function_responses_in_history(
-      result_events
-  )
-  contents = []
-  for event in result_events:
-    content = copy.deepcopy(event.content)
-    remove_client_function_call_id(content)
-    contents.append(content)
-  return contents
+  def _rearrange(self, first_changed_index: int):
+    """Rearranges the filtered events from the given index.
+
+    Same as `_rearrange_events_for_async_function_responses_in_history`, but
+    keeps the events rearranged before the index.
+    """
+    if first_changed_index < len(self._arranged_lengths):
+      del self._arranged_events[self._arranged_lengths[first_changed_index] :]
+      del self._arranged_lengths[first_changed_index:]
+    for index in range(first_changed_index, len(self._filtered_events)):
+      self._arranged_lengths.append(len(self._arranged_events))
+      if self._function_response_ids[index]:
+        # function_response should be handled together with function_call.
+        continue
+      event = self._filtered_events[index]
+      self._arranged_events.append(event)
+      response_indexes = tuple(
+          sorted({
+              self._function_response_indexes[function_call_id]
+              for function_call_id in self._function_call_ids[index]
+              if function_call_id in self._function_response_indexes
+          })
+      )
+      if len(response_indexes) == 1:
+        self._arranged_events.append(self._filtered_events[response_indexes[0]])
+      elif response_indexes:
+        # Merge all async function_response as one response event
+        if response_indexes not in self._merged_events:
+          self._merged_events[response_indexes] = (
+              _merge_function_response_events(
+                  [self._filtered_events[i] for i in response_indexes]
+              )
+          )
+        self._arranged_events.append(self._merged_events[response_indexes])
+
+  def _content(self, event: Event, cache: bool = True) -> types.Content:
+    """Returns a copy of the content to send for the event.
+
+    Args:
+      event: The event to send.
+      cache: Whether to cache the content of the event. Only set it for events
+        kept by the builder, so that their IDs are not reused by other events.
+    """
+    cached = self._contents.get(id(event))
+    if cached is None or cached[0] is not event:
+      content = copy.deepcopy(event.content)
+      remove_client_function_call_id(content)
+      if not cache:
+        return content
+      cached = (event, content)
+      self._contents[id(event)] = cached
+    content = cached[1]
+    return content.model_copy(
+        update={'parts': [part.model_copy() for part in content.parts]}
+    )
 
 
 def _is_other_agent_reply(current_agent_name: str, event: Event) -> bool:
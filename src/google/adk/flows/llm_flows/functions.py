@@ -21,8 +21,10 @@ import inspect
 import logging
 from typing import Any
 from typing import AsyncGenerator
+from typing import Awaitable
 from typing import cast
 from typing import Optional
+from typing import TYPE_CHECKING
 import uuid
 
 from google.genai import types
@@ -38,6 +40,9 @@ from ...telemetry import tracer
 from ...tools.base_tool import BaseTool
 from ...tools.tool_context import ToolContext
 
+if TYPE_CHECKING:
+  from ...agents.llm_agent import LlmAgent
+
 AF_FUNCTION_CALL_ID_PREFIX = 'adk-'
 REQUEST_EUC_FUNCTION_CALL_NAME = 'adk_request_credential'
 
@@ -129,17 +134,20 @@ async def handle_function_calls_async(
     tools_dict: dict[str, BaseTool],
     filters: Optional[set[str]] = None,
 ) -> Optional[Event]:
-  """Calls the functions and returns the function response event."""
+  """Calls the functions and returns the function response event.
+
+  The function calls run concurrently, up to `max_parallel_tool_calls` of the
+  agent at once. The calls of tools that must run serially wait for the calls
+  before them, and the calls after them wait for them to finish.
+  """
   from ...agents.llm_agent import LlmAgent
 
   agent = invocation_context.agent
   if not isinstance(agent, LlmAgent):
     return
 
-  function_calls = function_call_event.get_function_calls()
-
-  function_response_events: list[Event] = []
-  for function_call in function_calls:
+  tools_and_calls = []
+  for function_call in function_call_event.get_function_calls():
     if filters and function_call.id not in filters:
       continue
     tool, tool_context = _get_tool_and_context(
@@ -148,49 +156,41 @@ async def handle_function_calls_async(
         function_call,
         tools_dict,
     )
-    # do not use "args" as the variable name, because it is a reserved keyword
-    # in python debugger.
-    function_args = function_call.args or {}
-    function_response: Optional[dict] = None
+    tools_and_calls.append((tool, tool_context, function_call))
 
-    for callback in agent.canonical_before_tool_callbacks:
-      function_response = callback(
-          tool=tool, args=function_args, tool_context=tool_context
-      )
-      if inspect.isawaitable(function_response):
-        function_response = await function_response
-      if function_response:
-        break
+  semaphore = (
+      asyncio.Semaphore(agent.max_parallel_tool_calls)
+      if agent.max_parallel_tool_calls
+      else None
+  )
 
-    if not function_response:
-      function_response = await __call_tool_async(
-          tool, args=function_args, tool_context=tool_context
+  async def call_function(tool, tool_context, function_call):
+    if semaphore is None:
+      return await _call_function_async(
+          invocation_context, agent, tool, tool_context, function_call
       )
-
-    for callback in agent.canonical_after_tool_callbacks:
-      altered_function_response = callback(
-          tool=tool,
-          args=function_args,
-          tool_context=tool_context,
-          tool_response=function_response,
+    async with semaphore:
+      return await _call_function_async(
+          invocation_context, agent, tool, tool_context, function_call
       )
-      if inspect.isawaitable(altered_function_response):
-        altered_function_response = await altered_function_response
-      if altered_function_response is not None:
-        function_response = altered_function_response
-        break
-
-    if tool.is_long_running:
-      # Allow long running function to return None to not provide function response.
-      if not function_response:
-        continue
 
-    # Builds the function response event.
-    function_response_event = __build_response_event(
-        tool, function_response, tool_context, invocation_context
-    )
-    function_response_events.append(function_response_event)
+  # The responses are kept in the order of the function calls.
+  function_response_events: list[Optional[Event]] = []
+  batch = []
+  for tool, tool_context, function_call in tools_and_calls:
+    if tool.run_serially:
+      function_response_events.extend(await _gather_or_cancel(batch))
+      batch = []
+      function_response_events.append(
+          await call_function(tool, tool_context, function_call)
+      )
+    else:
+      batch.append(call_function(tool, tool_context, function_call))
+  function_response_events.extend(await _gather_or_cancel(batch))
 
+  function_response_events = [
+      event for event in function_response_events if event
+  ]
   if not function_response_events:
     return None
   merged_event = merge_parallel_function_response_events(
@@ -209,6 +209,84 @@ async def handle_function_calls_async(
   return merged_event
 
 
+async def _call_function_async(
+    invocation_context: InvocationContext,
+    agent: LlmAgent,
+    tool: BaseTool,
+    tool_context: ToolContext,
+    function_call: types.FunctionCall,
+) -> Optional[Event]:
+  """Calls a function with the tool callbacks of the agent.
+
+  Returns:
+    The function response event, or None if a long running tool did not
+    respond yet.
+  """
+  # do not use "args" as the variable name, because it is a reserved keyword
+  # in python debugger.
+  function_args = function_call.args or {}
+  function_response: Optional[dict] = None
+
+  for callback in agent.canonical_before_tool_callbacks:
+    function_response = callback(
+        tool=tool, args=function_args, tool_context=tool_context
+    )
+    if inspect.isawaitable(function_response):
+      function_response = await function_response
+    if function_response:
+      break
+
+  if not function_response:
+    function_response = await __call_tool_async(
+        tool, args=function_args, tool_context=tool_context
+    )
+
+  for callback in agent.canonical_after_tool_callbacks:
+    altered_function_response = callback(
+        tool=tool,
+        args=function_args,
+        tool_context=tool_context,
+        tool_response=function_response,
+    )
+    if inspect.isawaitable(altered_function_response):
+      altered_function_response = await altered_function_response
+    if altered_function_response is not None:
+      function_response = altered_function_response
+      break
+
+  if tool.is_long_running:
+    # Allow long running function to return None to not provide function response.
+    if not function_response:
+      return None
+
+  # Builds the function response event.
+  return __build_response_event(
+      tool, function_response, tool_context, invocation_context
+  )
+
+
+async def _gather_or_cancel(
+    coroutines: list[Awaitable[Optional[Event]]],
+) -> list[Optional[Event]]:
+  """Runs the coroutines concurrently and returns their results in order.
+
+  If one of them fails, the others are cancelled, and waited for before the
+  error is raised.
+  """
+  if len(coroutines) <= 1:
+    return [await coroutine for coroutine in coroutines]
+  tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+  try:
+    return await asyncio.gather(*tasks)
+  except BaseException:
+    for task in tasks:
+      task.cancel()
+    # So that their cleanup does not outlive the invocation, and their errors
+    # are retrieved.
+    await asyncio.gather(*tasks, return_exceptions=True)
+    raise
+
+
 async def handle_function_calls_live(
     invocation_context: InvocationContext,
     function_call_event: Event,
@@ -488,16 +566,18 @@ def merge_parallel_function_response_events(
   # Merge actions from all events
 
   merged_actions = EventActions()
-  merged_requested_auth_configs = {}
   for event in function_response_events:
-    merged_requested_auth_configs.update(event.actions.requested_auth_configs)
-    merged_actions = merged_actions.model_copy(
-        update=event.actions.model_dump()
-    )
-  merged_actions.requested_auth_configs = merged_requested_auth_configs
+    # The actions of later function calls win, so that the merged actions only
+    # depend on the order of the function calls.
+    for field_name in EventActions.model_fields:
+      value = getattr(event.actions, field_name)
+      if isinstance(value, dict):
+        getattr(merged_actions, field_name).update(value)
+      elif value is not None:
+        setattr(merged_actions, field_name, value)
   # Create the new merged event
   merged_event = Event(
-      invocation_id=Event.new_id(),
+      invocation_id=base_event.invocation_id,
       author=base_event.author,
       branch=base_event.branch,
       content=types.Content(role='user', parts=merged_parts),
@@ -18,6 +18,7 @@ import logging
 
 from ...auth import auth_preprocessor
 from . import _code_execution
+from . import _context_window
 from . import _nl_planning
 from . import basic
 from . import contents
@@ -43,6 +44,9 @@ class SingleFlow(BaseLlmFlow):
         instructions.request_processor,
         identity.request_processor,
         contents.request_processor,
+        # Drops the oldest contents over the token budget, before the other
+        # processors add their own contents.
+        _context_window.request_processor,
         # Some implementations of NL Planning mark planning contents as thoughts
         # in the post processor. Since these need to be unmarked, NL Planning
         # should be after contents.
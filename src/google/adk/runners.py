@@ -40,6 +40,7 @@ from .memory.in_memory_memory_service import InMemoryMemoryService
 from .sessions.base_session_service import BaseSessionService
 from .sessions.in_memory_session_service import InMemorySessionService
 from .sessions.session import Session
+from .sessions.session_compactor import SessionCompactor
 from .telemetry import tracer
 from .tools.built_in_code_execution_tool import built_in_code_execution
 
@@ -71,6 +72,8 @@ class Runner:
   """The session service for the runner."""
   memory_service: Optional[BaseMemoryService] = None
   """The memory service for the runner."""
+  session_compactor: Optional[SessionCompactor] = None
+  """Compacts the sessions that grew too large after each invocation."""
 
   def __init__(
       self,
@@ -80,6 +83,7 @@ class Runner:
       artifact_service: Optional[BaseArtifactService] = None,
       session_service: BaseSessionService,
       memory_service: Optional[BaseMemoryService] = None,
+      session_compactor: Optional[SessionCompactor] = None,
   ):
     """Initializes the Runner.
 
@@ -89,12 +93,15 @@ class Runner:
         artifact_service: The artifact service for the runner.
         session_service: The session service for the runner.
         memory_service: The memory service for the runner.
+        session_compactor: Compacts the sessions that grew too large after
+          each invocation, in the background.
     """
     self.app_name = app_name
     self.agent = agent
     self.artifact_service = artifact_service
     self.session_service = session_service
     self.memory_service = memory_service
+    self.session_compactor = session_compactor
 
   def run(
       self,
@@ -130,6 +137,9 @@ class Runner:
         ):
           event_queue.put(event)
       finally:
+        if self.session_compactor:
+          # asyncio.run cancels the tasks still pending when it returns.
+          await self.session_compactor.wait()
         event_queue.put(None)
 
     def _asyncio_thread_main():
@@ -193,10 +203,27 @@ class Runner:
         )
 
       invocation_context.agent = self._find_agent_to_run(session, root_agent)
-      async for event in invocation_context.agent.run_async(invocation_context):
-        if not event.partial:
-          await self.session_service.append_event(session=session, event=event)
-        yield event
+      invocation_failed = True
+      try:
+        async for event in invocation_context.agent.run_async(
+            invocation_context
+        ):
+          if not event.partial:
+            await self.session_service.append_event(
+                session=session, event=event
+            )
+          yield event
+        invocation_failed = False
+      finally:
+        # Session services that buffer writes persist them at the end of every
+        # invocation.
+        flush_error = await self._flush_session(
+            session, invocation_failed=invocation_failed
+        )
+        if self.session_compactor:
+          self.session_compactor.maybe_compact(session)
+        if flush_error:
+          raise flush_error
 
   async def _append_new_message_to_session(
       self,
@@ -321,9 +348,42 @@ class Runner:
                 active_streaming_tools
             )
 
-    async for event in invocation_context.agent.run_live(invocation_context):
-      await self.session_service.append_event(session=session, event=event)
-      yield event
+    invocation_failed = True
+    try:
+      async for event in invocation_context.agent.run_live(invocation_context):
+        await self.session_service.append_event(session=session, event=event)
+        yield event
+      invocation_failed = False
+    finally:
+      flush_error = await self._flush_session(
+          session, invocation_failed=invocation_failed
+      )
+      if flush_error:
+        raise flush_error
+
+  async def _flush_session(
+      self, session: Session, *, invocation_failed: bool
+  ) -> Optional[Exception]:
+    """Persists the writes the session service buffered for the session.
+
+    Args:
+        session: The session of the invocation.
+        invocation_failed: Whether the invocation is ending with an exception.
+          A flush error is then logged, so that it does not replace the
+          exception of the invocation.
+
+    Returns:
+        The flush error to raise once the invocation is wrapped up, if any.
+    """
+    try:
+      await self.session_service.flush(session)
+    except Exception as e:
+      if not invocation_failed:
+        return e
+      logger.exception(
+          'Failed to flush session %s after the invocation failed.', session.id
+      )
+    return None
 
   def _find_agent_to_run(
       self, session: Session, root_agent: BaseAgent
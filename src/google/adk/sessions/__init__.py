@@ -14,20 +14,30 @@
 import logging
 
 from .base_session_service import BaseSessionService
+from .caching_session_service import CachingSessionService
+from .file_log_session_service import FileLogSessionService
 from .in_memory_session_service import InMemorySessionService
 from .session import Session
+from .session_compactor import LlmEventSummarizer
+from .session_compactor import SessionCompactor
 from .state import State
 from .vertex_ai_session_service import VertexAiSessionService
+from .write_behind_session_service import WriteBehindSessionService
 
 logger = logging.getLogger('google_adk.' + __name__)
 
 
 __all__ = [
     'BaseSessionService',
+    'CachingSessionService',
+    'FileLogSessionService',
     'InMemorySessionService',
+    'LlmEventSummarizer',
     'Session',
+    'SessionCompactor',
     'State',
     'VertexAiSessionService',
+    'WriteBehindSessionService',
 ]
 
 try:
@@ -15,29 +15,153 @@
 """Utility functions for session service."""
 
 import base64
-from typing import Any, Optional
+import copy
+import heapq
+import json
+from typing import Any
+from typing import Iterable
+from typing import Optional
 
 from google.genai import types
 
+from .base_session_service import ListSessionsConfig
+from .session import Session
+from .state import State
 
-def encode_content(content: types.Content):
-  """Encodes a content object to a JSON dictionary."""
+# The key referencing a blob stored outside of the encoded content.
+BLOB_INDEX_KEY = "blob_index"
+
+
+def encode_content(content: types.Content, blobs: Optional[list[bytes]] = None):
+  """Encodes a content object to a JSON dictionary.
+
+  Args:
+    content: The content to encode.
+    blobs: If provided, the raw inline_data bytes are appended to this list and
+      referenced by their index, instead of being base64 encoded in the JSON.
+  """
   encoded_content = content.model_dump(exclude_none=True)
   for p in encoded_content["parts"]:
     if "inline_data" in p:
-      p["inline_data"]["data"] = base64.b64encode(
-          p["inline_data"]["data"]
-      ).decode("utf-8")
+      if blobs is not None:
+        blobs.append(p["inline_data"].pop("data"))
+        p["inline_data"][BLOB_INDEX_KEY] = len(blobs) - 1
+      else:
+        p["inline_data"]["data"] = base64.b64encode(
+            p["inline_data"]["data"]
+        ).decode("utf-8")
   return encoded_content
 
 
 def decode_content(
     content: Optional[dict[str, Any]],
+    blobs: Optional[list[bytes]] = None,
 ) -> Optional[types.Content]:
-  """Decodes a content object from a JSON dictionary."""
+  """Decodes a content object from a JSON dictionary.
+
+  Args:
+    content: The JSON dictionary to decode.
+    blobs: The raw inline_data bytes referenced by the content, if it was
+      encoded with blobs.
+  """
   if not content:
     return None
   for p in content["parts"]:
     if "inline_data" in p:
-      p["inline_data"]["data"] = base64.b64decode(p["inline_data"]["data"])
+      if BLOB_INDEX_KEY in p["inline_data"]:
+        p["inline_data"]["data"] = blobs[p["inline_data"].pop(BLOB_INDEX_KEY)]
+      else:
+        p["inline_data"]["data"] = base64.b64decode(p["inline_data"]["data"])
   return types.Content.model_validate(content)
+
+
+def has_blob_references(content: Optional[dict[str, Any]]) -> bool:
+  """Whether the encoded content references blobs stored outside of it."""
+  if not content:
+    return False
+  return any(
+      BLOB_INDEX_KEY in p["inline_data"]
+      for p in content["parts"]
+      if "inline_data" in p
+  )
+
+
+def encode_page_token(*values: Any) -> str:
+  """Encodes the position of the last listed item into an opaque page token."""
+  return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode(
+      "ascii"
+  )
+
+
+def decode_page_token(page_token: str) -> list[Any]:
+  """Decodes a page token encoded by `encode_page_token`."""
+  try:
+    return json.loads(base64.urlsafe_b64decode(page_token.encode("ascii")))
+  except ValueError as e:
+    raise ValueError(f"Invalid page token: {page_token}") from e
+
+
+def extract_state_delta(state: dict[str, Any]):
+  app_state_delta = {}
+  user_state_delta = {}
+  session_state_delta = {}
+  if state:
+    for key in state.keys():
+      if key.startswith(State.APP_PREFIX):
+        app_state_delta[key.removeprefix(State.APP_PREFIX)] = state[key]
+      elif key.startswith(State.USER_PREFIX):
+        user_state_delta[key.removeprefix(State.USER_PREFIX)] = state[key]
+      elif not key.startswith(State.TEMP_PREFIX):
+        session_state_delta[key] = state[key]
+  return app_state_delta, user_state_delta, session_state_delta
+
+
+def merge_state(app_state, user_state, session_state):
+  # Merge states for response
+  merged_state = copy.deepcopy(session_state)
+  for key in app_state.keys():
+    merged_state[State.APP_PREFIX + key] = app_state[key]
+  for key in user_state.keys():
+    merged_state[State.USER_PREFIX + key] = user_state[key]
+  return merged_state
+
+
+def paginate_sessions(
+    sessions: Iterable[Session], config: Optional[ListSessionsConfig]
+) -> tuple[list[Session], Optional[str]]:
+  """Filters and pages the sessions held in memory, as the config asks.
+
+  Returns:
+    The sessions of the page, from the most to the least recently updated, and
+    the token of the next page if there is one.
+  """
+  if not config:
+    return list(sessions), None
+  if config.updated_after is not None:
+    sessions = [
+        session
+        for session in sessions
+        if session.last_update_time > config.updated_after
+    ]
+  if config.page_token:
+    last_update_time, session_id = decode_page_token(config.page_token)
+    sessions = [
+        session
+        for session in sessions
+        if (session.last_update_time, session.id)
+        < (last_update_time, session_id)
+    ]
+  if not config.page_size:
+    return sorted(sessions, key=_update_order, reverse=True), None
+  # Only the sessions of the page are sorted.
+  sessions = heapq.nlargest(config.page_size + 1, sessions, key=_update_order)
+  if len(sessions) <= config.page_size:
+    return sessions, None
+  sessions = sessions[: config.page_size]
+  return sessions, encode_page_token(
+      sessions[-1].last_update_time, sessions[-1].id
+  )
+
+
+def _update_order(session: Session) -> tuple[float, str]:
+  return (session.last_update_time, session.id)
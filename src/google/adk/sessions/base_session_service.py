@@ -14,6 +14,9 @@
 
 import abc
 from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
 from typing import Optional
 
 from pydantic import BaseModel
@@ -23,6 +26,9 @@ from ..events.event import Event
 from .session import Session
 from .state import State
 
+EventSummarizer = Callable[[list[Event]], Awaitable[Optional[Event]]]
+"""Produces an event summarizing the given events, or None to skip it."""
+
 
 class GetSessionConfig(BaseModel):
   """The configuration of getting a session."""
@@ -31,6 +37,23 @@ class GetSessionConfig(BaseModel):
   after_timestamp: Optional[float] = None
 
 
+class ListSessionsConfig(BaseModel):
+  """The configuration of listing sessions.
+
+  When a config is given, the sessions are listed from the most to the least
+  recently updated.
+  """
+
+  page_size: Optional[int] = None
+  """The maximum number of sessions to return. All of them if not set."""
+
+  page_token: Optional[str] = None
+  """The `next_page_token` of the previous response, to list the next page."""
+
+  updated_after: Optional[float] = None
+  """Only lists the sessions updated after this timestamp."""
+
+
 class ListSessionsResponse(BaseModel):
   """The response of listing sessions.
 
@@ -39,6 +62,9 @@ class ListSessionsResponse(BaseModel):
 
   sessions: list[Session] = Field(default_factory=list)
 
+  next_page_token: Optional[str] = None
+  """The token to list the next page of sessions, if there are more."""
+
 
 class BaseSessionService(abc.ABC):
   """Base class for session services.
@@ -79,11 +105,44 @@ class BaseSessionService(abc.ABC):
   ) -> Optional[Session]:
     """Gets a session."""
 
+  async def get_session_without_events(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Optional[Session]:
+    """Gets a session with its state, but without its events.
+
+    By default, the session is read with its last event only, which is then
+    dropped. Services that can read a session without listing its events should
+    override this method.
+    """
+    session = await self.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=GetSessionConfig(num_recent_events=1),
+    )
+    if session is not None:
+      session.events = []
+    return session
+
   @abc.abstractmethod
   async def list_sessions(
-      self, *, app_name: str, user_id: str
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
   ) -> ListSessionsResponse:
-    """Lists all the sessions."""
+    """Lists the sessions of a user.
+
+    Args:
+      app_name: the name of the app.
+      user_id: the id of the user.
+      config: the pagination and filters of the listing. If not provided, all
+        the sessions of the user are listed in no particular order.
+
+    Returns:
+      The sessions, without their events and states.
+    """
 
   @abc.abstractmethod
   async def delete_session(
@@ -91,13 +150,150 @@ class BaseSessionService(abc.ABC):
   ) -> None:
     """Deletes a session."""
 
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      after: Optional[float] = None,
+      batch_size: int = 100,
+  ) -> AsyncIterator[Event]:
+    """Iterates over the events of a session, from the oldest one.
+
+    Unlike `get_session`, services that override this method read the events
+    `batch_size` at a time, so iterating over a session of any length takes
+    constant memory. By default, the whole session is read with `get_session`.
+
+    Args:
+      app_name: the name of the app.
+      user_id: the id of the user.
+      session_id: the id of the session.
+      after: only iterates over the events at or after this timestamp.
+      batch_size: the number of events read at once.
+
+    Yields:
+      The events of the session, none if the session does not exist.
+    """
+    session = await self.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=GetSessionConfig(after_timestamp=after) if after else None,
+    )
+    if session is None:
+      return
+    for event in session.events:
+      yield event
+
   async def append_event(self, session: Session, event: Event) -> Event:
     """Appends an event to a session object."""
     if event.partial:
       return event
+    self._apply_event(session, event)
+    return event
+
+  def _apply_event(self, session: Session, event: Event) -> None:
+    """Applies a non-partial event to a session object, without suspending.
+
+    Services guarding their sessions with a thread lock call it while holding
+    the lock, which must not be held across a suspension point.
+    """
     self.__update_session_state(session, event)
     session.events.append(event)
-    return event
+
+  async def append_events(
+      self, session: Session, events: list[Event]
+  ) -> list[Event]:
+    """Appends several events to a session object, in order.
+
+    Services that can persist a batch of events more cheaply than one event at
+    a time (e.g. in a single transaction) should override this method.
+    """
+    for event in events:
+      await self.append_event(session=session, event=event)
+    return events
+
+  async def flush(self, session: Session) -> None:
+    """Persists the events buffered for a session, if any.
+
+    Services that write events as they are appended have nothing to flush, so
+    this is a no-op by default.
+    """
+
+  @property
+  def supports_archiving(self) -> bool:
+    """Whether the service implements `archive_events`.
+
+    Services that implement it must override this property too, so that
+    callers such as `SessionCompactor` can skip the services that do not.
+    """
+    return False
+
+  async def archive_events(
+      self,
+      session: Session,
+      events: list[Event],
+      *,
+      checkpoint_event: Optional[Event] = None,
+  ) -> None:
+    """Moves the oldest events of a session out of its active events.
+
+    Reads of the session no longer return the archived events. The session
+    state is not changed, as it already reflects the archived events.
+
+    Args:
+      session: the session the events belong to.
+      events: the oldest events of the session to archive.
+      checkpoint_event: the event that replaces the archived events, e.g. a
+        summary of them.
+
+    Raises:
+      NotImplementedError: if the service does not support archiving events,
+        i.e. `supports_archiving` is False.
+    """
+    raise NotImplementedError(
+        f'{type(self).__name__} does not support archiving events.'
+    )
+
+  async def compact_session(
+      self,
+      session: Session,
+      *,
+      keep_recent_events: int,
+      summarizer: Optional[EventSummarizer] = None,
+  ) -> Session:
+    """Folds the older events of a session into a checkpoint.
+
+    The events before the last `keep_recent_events` ones are archived, and
+    replaced by the summary produced by `summarizer`, if any. A function call
+    and its response are never separated, so slightly more events may be kept.
+
+    Args:
+      session: the session to compact, with all its active events. Its events
+        are updated in place.
+      keep_recent_events: the number of most recent events to keep.
+      summarizer: produces the event summarizing the archived events.
+
+    Returns:
+      The compacted session.
+    """
+    watermark = _compaction_watermark(session.events, keep_recent_events)
+    if not watermark:
+      return session
+
+    archived_events = session.events[:watermark]
+    checkpoint_event = None
+    if summarizer:
+      checkpoint_event = await summarizer(archived_events)
+    if checkpoint_event:
+      # The checkpoint takes the place of the archived events in the history.
+      checkpoint_event.timestamp = archived_events[-1].timestamp
+    await self.archive_events(
+        session, archived_events, checkpoint_event=checkpoint_event
+    )
+    session.events[:watermark] = [checkpoint_event] if checkpoint_event else []
+    return session
 
   def __update_session_state(self, session: Session, event: Event):
     """Updates the session state based on the event."""
@@ -107,3 +303,22 @@ class BaseSessionService(abc.ABC):
       if key.startswith(State.TEMP_PREFIX):
         continue
       session.state.update({key: value})
+
+
+def _compaction_watermark(events: list[Event], keep_recent_events: int) -> int:
+  """Returns the number of events to archive to keep the recent ones."""
+  watermark = max(0, len(events) - keep_recent_events)
+  call_indexes = {}
+  for i, event in enumerate(events[:watermark]):
+    for function_call in event.get_function_calls():
+      call_indexes[function_call.id] = i
+  # Moves the function calls answered by a kept event into the kept events,
+  # along with the events that follow them.
+  i = len(events) - 1
+  while i >= watermark:
+    for function_response in events[i].get_function_responses():
+      watermark = min(
+          watermark, call_indexes.get(function_response.id, watermark)
+      )
+    i -= 1
+  return watermark
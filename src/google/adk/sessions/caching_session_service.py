@@ -0,0 +1,278 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+import copy
+from typing import Any
+from typing import AsyncIterator
+from typing import Optional
+
+from typing_extensions import override
+
+from ..events.event import Event
+from .base_session_service import BaseSessionService
+from .base_session_service import GetSessionConfig
+from .base_session_service import ListSessionsConfig
+from .base_session_service import ListSessionsResponse
+from .session import Session
+
+_SessionKey = tuple[str, str, str]
+
+
+class CachingSessionService(BaseSessionService):
+  """A read-through cache of sessions in front of another session service.
+
+  The cache keeps the events of the most recently used sessions in process.
+  Once a session is cached, `get_session` only fetches the events that are
+  newer than the last cached event from the delegate, along with the current
+  state, instead of the whole session.
+
+  Only events read from the delegate are cached. Events appended through the
+  cache are read back by the next delta fetch, along with the events other
+  writers appended in the meantime.
+
+  The delta fetch selects events by timestamp, so it misses an event created
+  before the last cached event but appended after it, e.g. by another writer.
+  With delegates that maintain `Session.version`, such as
+  `DatabaseSessionService` and `InMemorySessionService`, the cache detects it:
+  when the version moved by more than the number of new events, the whole
+  session is fetched again. With other delegates, e.g.
+  `VertexAiSessionService`, such events are only seen once the session is
+  evicted from the cache.
+
+  As with `InMemorySessionService`, the returned sessions are copies, and only
+  the requested events are copied.
+
+  Attributes:
+    num_hits: The number of `get_session` calls served by a delta fetch.
+    num_misses: The number of `get_session` calls that fetched the whole
+      session, including those whose delta fetch could not be trusted.
+  """
+
+  def __init__(self, delegate: BaseSessionService, *, max_sessions: int = 128):
+    """Initializes the caching session service.
+
+    Args:
+      delegate: The session service that stores the sessions.
+      max_sessions: The maximum number of sessions to cache. The least recently
+        used sessions are dropped first.
+    """
+    self.delegate = delegate
+    self.max_sessions = max_sessions
+    self.num_hits = 0
+    self.num_misses = 0
+    self._sessions: OrderedDict[_SessionKey, Session] = OrderedDict()
+
+  @override
+  async def create_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
+  ) -> Session:
+    session = await self.delegate.create_session(
+        app_name=app_name, user_id=user_id, state=state, session_id=session_id
+    )
+    self._put(session.model_copy(update={'events': list(session.events)}))
+    return session
+
+  @override
+  async def get_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    key = (app_name, user_id, session_id)
+    cached_session = self._sessions.pop(key, None)
+    if cached_session is not None:
+      cached_session = await self._fetch_new_events(cached_session)
+    if cached_session is not None:
+      self.num_hits += 1
+    else:
+      self.num_misses += 1
+      session = await self.delegate.get_session(
+          app_name=app_name, user_id=user_id, session_id=session_id
+      )
+      if session is None:
+        return None
+      cached_session = session.model_copy(
+          update={'events': list(session.events)}
+      )
+    self._put(cached_session)
+
+    events = _filter_events(cached_session.events, config)
+    return cached_session.model_copy(
+        update={
+            'events': copy.deepcopy(events),
+            'state': copy.deepcopy(cached_session.state),
+        }
+    )
+
+  @override
+  async def get_session_without_events(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Optional[Session]:
+    return await self.delegate.get_session_without_events(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+
+  @override
+  async def list_sessions(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    return await self.delegate.list_sessions(
+        app_name=app_name, user_id=user_id, config=config
+    )
+
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      after: Optional[float] = None,
+      batch_size: int = 100,
+  ) -> AsyncIterator[Event]:
+    # Streamed events are not cached, as the sessions read this way are
+    # usually too long to be worth it.
+    async for event in self.delegate.iter_events(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        after=after,
+        batch_size=batch_size,
+    ):
+      yield event
+
+  @override
+  async def delete_session(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    self._sessions.pop((app_name, user_id, session_id), None)
+    await self.delegate.delete_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+
+  @override
+  async def append_event(self, session: Session, event: Event) -> Event:
+    return await self.delegate.append_event(session=session, event=event)
+
+  @override
+  async def append_events(
+      self, session: Session, events: list[Event]
+  ) -> list[Event]:
+    return await self.delegate.append_events(session=session, events=events)
+
+  @override
+  async def flush(self, session: Session) -> None:
+    await self.delegate.flush(session)
+
+  @property
+  @override
+  def supports_archiving(self) -> bool:
+    return self.delegate.supports_archiving
+
+  @override
+  async def archive_events(
+      self,
+      session: Session,
+      events: list[Event],
+      *,
+      checkpoint_event: Optional[Event] = None,
+  ) -> None:
+    await self.delegate.archive_events(
+        session, events, checkpoint_event=checkpoint_event
+    )
+    self._sessions.pop((session.app_name, session.user_id, session.id), None)
+
+  async def _fetch_new_events(
+      self, cached_session: Session
+  ) -> Optional[Session]:
+    """Returns the cached session updated with the events it is missing.
+
+    Returns None if the session is gone, or if the delta may have missed events,
+    in which case the whole session must be fetched.
+    """
+    after_timestamp = (
+        cached_session.events[-1].timestamp if cached_session.events else None
+    )
+    session = await self.delegate.get_session(
+        app_name=cached_session.app_name,
+        user_id=cached_session.user_id,
+        session_id=cached_session.id,
+        config=GetSessionConfig(after_timestamp=after_timestamp),
+    )
+    if session is None:
+      return None
+
+    # The delegates may return events at the boundary that are cached already,
+    # with a timestamp truncated by the storage.
+    cached_ids = set()
+    if session.events:
+      oldest_timestamp = session.events[0].timestamp
+      for event in reversed(cached_session.events):
+        if event.timestamp < oldest_timestamp:
+          break
+        cached_ids.add(event.id)
+    new_events = [
+        event for event in session.events if event.id not in cached_ids
+    ]
+    if session.version - cached_session.version > len(new_events):
+      # Every append moves the version at least once per batch of events, so
+      # some appended events are older than the last cached event.
+      return None
+    return cached_session.model_copy(
+        update={
+            'events': cached_session.events + new_events,
+            'state': session.state,
+            'last_update_time': session.last_update_time,
+            'version': session.version,
+        }
+    )
+
+  def _put(self, session: Session):
+    key = (session.app_name, session.user_id, session.id)
+    self._sessions[key] = session
+    self._sessions.move_to_end(key)
+    while len(self._sessions) > self.max_sessions:
+      self._sessions.popitem(last=False)
+
+
+def _filter_events(
+    events: list[Event], config: Optional[GetSessionConfig]
+) -> list[Event]:
+  """Returns the events selected by the config, as the delegates would."""
+  if not config:
+    return events
+  if config.num_recent_events:
+    events = events[-config.num_recent_events :]
+  if config.after_timestamp:
+    i = len(events) - 1
+    while i >= 0:
+      if events[i].timestamp < config.after_timestamp:
+        break
+      i -= 1
+    if i >= 0:
+      events = events[i + 1 :]
+  return events
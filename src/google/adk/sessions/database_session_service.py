@@ -11,26 +11,46 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-import copy
+import asyncio
 from datetime import datetime
-from datetime import timezone
 import json
 import logging
+import pickle
 from typing import Any
+from typing import AsyncIterator
+from typing import Callable
 from typing import Optional
+from typing import TypeVar
+from typing import Union
 import uuid
 
+from pydantic import BaseModel
+from sqlalchemy import and_
+from sqlalchemy import bindparam
 from sqlalchemy import Boolean
 from sqlalchemy import delete
 from sqlalchemy import Dialect
 from sqlalchemy import ForeignKeyConstraint
 from sqlalchemy import func
+from sqlalchemy import Index
+from sqlalchemy import Integer
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import text
 from sqlalchemy import Text
+from sqlalchemy import type_coerce
+from sqlalchemy import update
 from sqlalchemy.dialects import mysql
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import Connection
 from sqlalchemy.engine import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import ArgumentError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.inspection import inspect
 from sqlalchemy.orm import DeclarativeBase
@@ -39,27 +59,41 @@ from sqlalchemy.orm import mapped_column
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import Session as DatabaseSessionFactory
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm.exc import StaleDataError
 from sqlalchemy.schema import MetaData
 from sqlalchemy.types import DateTime
-from sqlalchemy.types import PickleType
+from sqlalchemy.types import LargeBinary
 from sqlalchemy.types import String
 from sqlalchemy.types import TypeDecorator
 from typing_extensions import override
 from tzlocal import get_localzone
 
 from ..events.event import Event
+from ..events.event_actions import EventActions
 from . import _session_util
 from .base_session_service import BaseSessionService
 from .base_session_service import GetSessionConfig
+from .base_session_service import ListSessionsConfig
 from .base_session_service import ListSessionsResponse
 from .session import Session
-from .state import State
 
 logger = logging.getLogger("google_adk." + __name__)
 
 DEFAULT_MAX_KEY_LENGTH = 128
 DEFAULT_MAX_VARCHAR_LENGTH = 256
 
+# The version of the JSON document `EventActionsType` stores.
+_EVENT_ACTIONS_SCHEMA_VERSION = 1
+
+# The number of times an append is retried when the session row changed
+# between reading and updating it.
+_MAX_APPEND_ATTEMPTS = 5
+
+_MISSING = object()
+
+_T = TypeVar("_T")
+
 
 class DynamicJSON(TypeDecorator):
   """A JSON-like type that uses JSONB on PostgreSQL and TEXT with JSON serialization for other databases."""
@@ -90,6 +124,49 @@ class DynamicJSON(TypeDecorator):
     return value
 
 
+class _EventActionsDocument(BaseModel):
+  """The JSON document stored for EventActions."""
+
+  version: int
+  actions: EventActions
+
+
+class EventActionsType(TypeDecorator):
+  """Stores EventActions as a schema-versioned JSON document.
+
+  The document is kept in a binary column, the storage type of the pickled
+  EventActions written by earlier versions, so existing tables need no schema
+  change. Pickled rows are still decoded, and can be re-encoded with
+  `DatabaseSessionService.migrate_event_actions`.
+  """
+
+  impl = LargeBinary
+  cache_ok = True
+
+  def process_bind_param(self, value: Optional[EventActions], dialect: Dialect):
+    if value is None:
+      return None
+    return (
+        _EventActionsDocument(
+            version=_EVENT_ACTIONS_SCHEMA_VERSION, actions=value
+        )
+        .model_dump_json(by_alias=True, exclude_none=True)
+        .encode("utf-8")
+    )
+
+  def process_result_value(self, value: Optional[bytes], dialect: Dialect):
+    if value is None:
+      return None
+    if not _is_json_event_actions(value):
+      return pickle.loads(value)
+    document = _EventActionsDocument.model_validate_json(value)
+    if document.version > _EVENT_ACTIONS_SCHEMA_VERSION:
+      raise ValueError(
+          f"Unsupported event actions schema version {document.version}."
+      )
+    return document.actions
+
+
 class Base(DeclarativeBase):
   """Base class for database tables."""
 
@@ -121,12 +198,26 @@ class StorageSession(Base):
   update_time: Mapped[DateTime] = mapped_column(
       DateTime(), default=func.now(), onupdate=func.now()
   )
+  # Every update of the row is a compare-and-swap on the version.
+  version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
 
   storage_events: Mapped[list["StorageEvent"]] = relationship(
       "StorageEvent",
       back_populates="storage_session",
   )
 
+  __mapper_args__ = {"version_id_col": version}
+
+  __table_args__ = (
+      # Serves the listing of the sessions of a user by update time.
+      Index(
+          "ix_sessions_app_name_user_id_update_time",
+          "app_name",
+          "user_id",
+          "update_time",
+      ),
+  )
+
   def __repr__(self):
     return f"<StorageSession(id={self.id}, update_time={self.update_time})>"
 
@@ -156,7 +247,7 @@ class StorageEvent(Base):
   )
   timestamp: Mapped[DateTime] = mapped_column(DateTime(), default=func.now())
   content: Mapped[dict[str, Any]] = mapped_column(DynamicJSON, nullable=True)
-  actions: Mapped[MutableDict[str, Any]] = mapped_column(PickleType)
+  actions: Mapped[EventActions] = mapped_column(EventActionsType)
 
   long_running_tool_ids_json: Mapped[Optional[str]] = mapped_column(
       Text, nullable=True
@@ -183,6 +274,15 @@ class StorageEvent(Base):
           ["sessions.app_name", "sessions.user_id", "sessions.id"],
           ondelete="CASCADE",
       ),
+      # Serves the per-session event reads, including the tail reads for
+      # `GetSessionConfig.num_recent_events`.
+      Index(
+          "ix_events_app_name_user_id_session_id_timestamp",
+          "app_name",
+          "user_id",
+          "session_id",
+          "timestamp",
+      ),
   )
 
   @property
@@ -201,6 +301,76 @@ class StorageEvent(Base):
       self.long_running_tool_ids_json = json.dumps(list(value))
 
 
+class StorageEventBlob(Base):
+  """Represents the raw bytes of an inline_data part of an event."""
+
+  __tablename__ = "event_blobs"
+
+  app_name: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
+  )
+  user_id: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
+  )
+  session_id: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
+  )
+  event_id: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
+  )
+  blob_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+  data: Mapped[bytes] = mapped_column(
+      LargeBinary().with_variant(mysql.LONGBLOB, "mysql")
+  )
+
+  __table_args__ = (
+      ForeignKeyConstraint(
+          ["event_id", "app_name", "user_id", "session_id"],
+          [
+              "events.id",
+              "events.app_name",
+              "events.user_id",
+              "events.session_id",
+          ],
+          ondelete="CASCADE",
+      ),
+  )
+
+
+class StorageArchivedEvent(Base):
+  """Represents an event moved out of a session by compaction."""
+
+  __tablename__ = "archived_events"
+
+  app_name: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
+  )
+  user_id: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
+  )
+  session_id: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
+  )
+  id: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
+  )
+
+  timestamp: Mapped[DateTime] = mapped_column(DateTime())
+  # The whole event, encoded as JSON.
+  event: Mapped[str] = mapped_column(
+      Text().with_variant(mysql.LONGTEXT, "mysql")
+  )
+
+  __table_args__ = (
+      ForeignKeyConstraint(
+          ["app_name", "user_id", "session_id"],
+          ["sessions.app_name", "sessions.user_id", "sessions.id"],
+          ondelete="CASCADE",
+      ),
+  )
+
+
 class StorageAppState(Base):
   """Represents an app state stored in the database."""
 
@@ -236,17 +406,50 @@ class StorageUserState(Base):
   )
 
 
+class SessionConflictError(ValueError):
+  """Raised when appended events conflict with concurrent appends."""
+
+
 class DatabaseSessionService(BaseSessionService):
-  """A session service that uses a database for storage."""
+  """A session service that uses a database for storage.
+
+  Database URLs with an async driver (e.g. ``postgresql+asyncpg://``,
+  ``sqlite+aiosqlite://`` or ``mysql+aiomysql://``) are served by a SQLAlchemy
+  ``AsyncEngine``, so database round trips never block the event loop. Other
+  URLs use a regular synchronous ``Engine``.
 
-  def __init__(self, db_url: str):
-    """Initializes the database session service with a database URL."""
+  Note that ``sqlite+aiosqlite:///:memory:`` shares a single connection between
+  all database sessions, so it is only suitable for non-concurrent use.
+  """
+
+  def __init__(
+      self,
+      db_url: str,
+      *,
+      store_inline_data_as_blobs: bool = False,
+      **kwargs: Any,
+  ):
+    """Initializes the database session service with a database URL.
+
+    Args:
+      db_url: The database URL.
+      store_inline_data_as_blobs: Whether to store the bytes of inline_data
+        parts as raw binary in the `event_blobs` table, instead of base64
+        encoding them in the event content JSON. Events stored either way can
+        be read back regardless of this setting.
+      **kwargs: Additional keyword arguments forwarded to the engine factory,
+        e.g. ``pool_size``, ``max_overflow``, ``pool_timeout`` or
+        ``pool_recycle``.
+    """
     # 1. Create DB engine for db connection
     # 2. Create all tables based on schema
     # 3. Initialize all properties
 
     try:
-      db_engine = create_engine(db_url)
+      if make_url(db_url).get_dialect().is_async:
+        db_engine = create_async_engine(db_url, **kwargs)
+      else:
+        db_engine = create_engine(db_url, **kwargs)
     except Exception as e:
       if isinstance(e, ArgumentError):
         raise ValueError(
@@ -264,18 +467,57 @@ class DatabaseSessionService(BaseSessionService):
     local_timezone = get_localzone()
     logger.info(f"Local timezone: {local_timezone}")
 
-    self.db_engine: Engine = db_engine
+    self.db_engine: Union[Engine, AsyncEngine] = db_engine
+    self.store_inline_data_as_blobs = store_inline_data_as_blobs
     self.metadata: MetaData = MetaData()
+
+    if isinstance(db_engine, AsyncEngine):
+      # DB session factory method
+      self.database_session_factory: Union[
+          sessionmaker[DatabaseSessionFactory],
+          async_sessionmaker[AsyncSession],
+      ] = async_sessionmaker(bind=db_engine)
+      # Tables are created lazily on first use since it requires awaiting.
+      self._tables_created = False
+      self._tables_lock: Optional[asyncio.Lock] = None
+      return
+
     self.inspector = inspect(self.db_engine)
 
     # DB session factory method
-    self.database_session_factory: sessionmaker[DatabaseSessionFactory] = (
-        sessionmaker(bind=self.db_engine)
-    )
+    self.database_session_factory = sessionmaker(bind=self.db_engine)
 
     # Uncomment to recreate DB every time
     # Base.metadata.drop_all(self.db_engine)
-    Base.metadata.create_all(self.db_engine)
+    with self.db_engine.begin() as connection:
+      _create_tables(connection)
+    self._tables_created = True
+
+  async def _prepare_tables(self) -> None:
+    """Creates all tables on the async engine if not created yet."""
+    if self._tables_created:
+      return
+    if self._tables_lock is None:
+      self._tables_lock = asyncio.Lock()
+    async with self._tables_lock:
+      if self._tables_created:
+        return
+      async with self.db_engine.begin() as connection:
+        await connection.run_sync(_create_tables)
+      self._tables_created = True
+
+  async def _run(self, fn: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+    """Runs `fn` with a new database session as its first argument.
+
+    With an async engine, `fn` runs through `AsyncSession.run_sync`, so every
+    database round trip yields to the event loop instead of blocking it.
+    """
+    if isinstance(self.db_engine, AsyncEngine):
+      await self._prepare_tables()
+      async with self.database_session_factory() as session_factory:
+        return await session_factory.run_sync(fn, *args, **kwargs)
+    with self.database_session_factory() as session_factory:
+      return fn(session_factory, *args, **kwargs)
 
   @override
   async def create_session(
@@ -285,6 +527,23 @@ class DatabaseSessionService(BaseSessionService):
       user_id: str,
       state: Optional[dict[str, Any]] = None,
       session_id: Optional[str] = None,
+  ) -> Session:
+    return await self._run(
+        self._create_session_impl,
+        app_name=app_name,
+        user_id=user_id,
+        state=state,
+        session_id=session_id,
+    )
+
+  def _create_session_impl(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
   ) -> Session:
     # 1. Populate states.
     # 2. Build storage session object
@@ -292,64 +551,65 @@ class DatabaseSessionService(BaseSessionService):
     # 4. Build the session object with generated id
     # 5. Return the session
 
-    with self.database_session_factory() as session_factory:
-
-      # Fetch app and user states from storage
-      storage_app_state = session_factory.get(StorageAppState, (app_name))
-      storage_user_state = session_factory.get(
-          StorageUserState, (app_name, user_id)
-      )
-
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
+    # Fetch app and user states from storage
+    storage_app_state = session_factory.get(StorageAppState, (app_name))
+    storage_user_state = session_factory.get(
+        StorageUserState, (app_name, user_id)
+    )
 
-      # Create state tables if not exist
-      if not storage_app_state:
-        storage_app_state = StorageAppState(app_name=app_name, state={})
-        session_factory.add(storage_app_state)
-      if not storage_user_state:
-        storage_user_state = StorageUserState(
-            app_name=app_name, user_id=user_id, state={}
-        )
-        session_factory.add(storage_user_state)
+    app_state = storage_app_state.state if storage_app_state else {}
+    user_state = storage_user_state.state if storage_user_state else {}
 
-      # Extract state deltas
-      app_state_delta, user_state_delta, session_state = _extract_state_delta(
-          state
+    # Create state tables if not exist
+    if not storage_app_state:
+      storage_app_state = StorageAppState(app_name=app_name, state={})
+      session_factory.add(storage_app_state)
+    if not storage_user_state:
+      storage_user_state = StorageUserState(
+          app_name=app_name, user_id=user_id, state={}
       )
+      session_factory.add(storage_user_state)
 
-      # Apply state delta
-      app_state.update(app_state_delta)
-      user_state.update(user_state_delta)
+    # Extract state deltas
+    app_state_delta, user_state_delta, session_state = (
+        _session_util.extract_state_delta(state)
+    )
 
-      # Store app and user state
-      if app_state_delta:
-        storage_app_state.state = app_state
-      if user_state_delta:
-        storage_user_state.state = user_state
+    # Apply state delta
+    app_state.update(app_state_delta)
+    user_state.update(user_state_delta)
 
-      # Store the session
-      storage_session = StorageSession(
-          app_name=app_name,
-          user_id=user_id,
-          id=session_id,
-          state=session_state,
-      )
-      session_factory.add(storage_session)
-      session_factory.commit()
+    # Store app and user state
+    if app_state_delta:
+      storage_app_state.state = app_state
+    if user_state_delta:
+      storage_user_state.state = user_state
 
-      session_factory.refresh(storage_session)
+    # Store the session
+    storage_session = StorageSession(
+        app_name=app_name,
+        user_id=user_id,
+        id=session_id,
+        state=session_state,
+    )
+    session_factory.add(storage_session)
+    session_factory.commit()
 
-      # Merge states for response
-      merged_state = _merge_state(app_state, user_state, session_state)
-      session = Session(
-          app_name=str(storage_session.app_name),
-          user_id=str(storage_session.user_id),
-          id=str(storage_session.id),
-          state=merged_state,
-          last_update_time=storage_session.update_time.timestamp(),
-      )
-      return session
+    session_factory.refresh(storage_session)
+
+    # Merge states for response
+    merged_state = _session_util.merge_state(
+        app_state, user_state, session_state
+    )
+    session = Session(
+        app_name=str(storage_session.app_name),
+        user_id=str(storage_session.user_id),
+        id=str(storage_session.id),
+        state=merged_state,
+        last_update_time=storage_session.update_time.timestamp(),
+        version=storage_session.version,
+    )
+    return session
 
   @override
   async def get_session(
@@ -359,172 +619,348 @@ class DatabaseSessionService(BaseSessionService):
       user_id: str,
       session_id: str,
       config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    return await self._run(
+        self._get_session_impl,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=config,
+    )
+
+  def _get_session_impl(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
   ) -> Optional[Session]:
     # 1. Get the storage session entry from session table
     # 2. Get all the events based on session id and filtering config
     # 3. Convert and return the session
-    with self.database_session_factory() as session_factory:
-      storage_session = session_factory.get(
-          StorageSession, (app_name, user_id, session_id)
-      )
-      if storage_session is None:
-        return None
-
-      if config and config.after_timestamp:
-        after_dt = datetime.fromtimestamp(
-            config.after_timestamp, tz=timezone.utc
-        )
-        timestamp_filter = StorageEvent.timestamp > after_dt
-      else:
-        timestamp_filter = True
-
+    storage_session = session_factory.get(
+        StorageSession, (app_name, user_id, session_id)
+    )
+    if storage_session is None:
+      return None
+
+    query = (
+        session_factory.query(StorageEvent)
+        .filter(StorageEvent.app_name == app_name)
+        .filter(StorageEvent.user_id == user_id)
+        .filter(StorageEvent.session_id == storage_session.id)
+    )
+    if config and config.after_timestamp:
+      # Event timestamps are stored as naive local datetimes, and may be
+      # truncated by the database, so events at the boundary are included.
+      after_dt = datetime.fromtimestamp(config.after_timestamp)
+      query = query.filter(StorageEvent.timestamp >= after_dt)
+
+    if config and config.num_recent_events:
+      # Read the newest events backwards through the session index, then
+      # restore the chronological order.
       storage_events = (
-          session_factory.query(StorageEvent)
-          .filter(StorageEvent.session_id == storage_session.id)
-          .filter(timestamp_filter)
-          .order_by(StorageEvent.timestamp.asc())
-          .limit(
-              config.num_recent_events
-              if config and config.num_recent_events
-              else None
-          )
+          query.order_by(StorageEvent.timestamp.desc(), StorageEvent.id.desc())
+          .limit(config.num_recent_events)
           .all()
       )
+      storage_events.reverse()
+    else:
+      # Event IDs are time-ordered, so they break timestamp ties in creation
+      # order.
+      storage_events = query.order_by(
+          StorageEvent.timestamp.asc(), StorageEvent.id.asc()
+      ).all()
+
+    # Fetch states from storage
+    storage_app_state = session_factory.get(StorageAppState, (app_name))
+    storage_user_state = session_factory.get(
+        StorageUserState, (app_name, user_id)
+    )
 
-      # Fetch states from storage
-      storage_app_state = session_factory.get(StorageAppState, (app_name))
-      storage_user_state = session_factory.get(
-          StorageUserState, (app_name, user_id)
-      )
+    app_state = storage_app_state.state if storage_app_state else {}
+    user_state = storage_user_state.state if storage_user_state else {}
+    session_state = storage_session.state
 
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
-      session_state = storage_session.state
+    # Merge states
+    merged_state = _session_util.merge_state(
+        app_state, user_state, session_state
+    )
 
-      # Merge states
-      merged_state = _merge_state(app_state, user_state, session_state)
+    # Convert storage session to session
+    session = Session(
+        app_name=app_name,
+        user_id=user_id,
+        id=session_id,
+        state=merged_state,
+        last_update_time=storage_session.update_time.timestamp(),
+        version=storage_session.version,
+    )
+    blobs = _fetch_blobs(session_factory, storage_events)
+    session.events = [
+        _from_storage_event(e, blobs.get(e.id)) for e in storage_events
+    ]
+    return session
 
-      # Convert storage session to session
-      session = Session(
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      after: Optional[float] = None,
+      batch_size: int = 100,
+  ) -> AsyncIterator[Event]:
+    # Every batch is read in its own short transaction, resuming after the
+    # last event read, instead of holding a cursor and its connection open
+    # while the caller processes the events.
+    last_event_key = None
+    while True:
+      events, last_event_key = await self._run(
+          self._read_events_batch,
           app_name=app_name,
           user_id=user_id,
-          id=session_id,
-          state=merged_state,
-          last_update_time=storage_session.update_time.timestamp(),
+          session_id=session_id,
+          after=after,
+          last_event_key=last_event_key,
+          batch_size=batch_size,
       )
-      session.events = [
-          Event(
-              id=e.id,
-              author=e.author,
-              branch=e.branch,
-              invocation_id=e.invocation_id,
-              content=_session_util.decode_content(e.content),
-              actions=e.actions,
-              timestamp=e.timestamp.timestamp(),
-              long_running_tool_ids=e.long_running_tool_ids,
-              grounding_metadata=e.grounding_metadata,
-              partial=e.partial,
-              turn_complete=e.turn_complete,
-              error_code=e.error_code,
-              error_message=e.error_message,
-              interrupted=e.interrupted,
+      for event in events:
+        yield event
+      if len(events) < batch_size:
+        return
+
+  def _read_events_batch(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      after: Optional[float],
+      last_event_key: Optional[tuple[datetime, str]],
+      batch_size: int,
+  ) -> tuple[list[Event], Optional[tuple[datetime, str]]]:
+    query = session_factory.query(StorageEvent).filter(
+        StorageEvent.app_name == app_name,
+        StorageEvent.user_id == user_id,
+        StorageEvent.session_id == session_id,
+    )
+    if last_event_key:
+      timestamp, event_id = last_event_key
+      query = query.filter(
+          or_(
+              StorageEvent.timestamp > timestamp,
+              and_(
+                  StorageEvent.timestamp == timestamp,
+                  StorageEvent.id > event_id,
+              ),
           )
-          for e in storage_events
-      ]
-    return session
+      )
+    elif after:
+      query = query.filter(
+          StorageEvent.timestamp >= datetime.fromtimestamp(after)
+      )
+    storage_events = (
+        query.order_by(StorageEvent.timestamp.asc(), StorageEvent.id.asc())
+        .limit(batch_size)
+        .all()
+    )
+    if not storage_events:
+      return [], last_event_key
+
+    blobs = _fetch_blobs(session_factory, storage_events)
+    events = [_from_storage_event(e, blobs.get(e.id)) for e in storage_events]
+    return events, (storage_events[-1].timestamp, storage_events[-1].id)
 
   @override
   async def list_sessions(
-      self, *, app_name: str, user_id: str
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
   ) -> ListSessionsResponse:
-    with self.database_session_factory() as session_factory:
-      results = (
-          session_factory.query(StorageSession)
-          .filter(StorageSession.app_name == app_name)
-          .filter(StorageSession.user_id == user_id)
-          .all()
-      )
-      sessions = []
-      for storage_session in results:
-        session = Session(
-            app_name=app_name,
-            user_id=user_id,
-            id=storage_session.id,
-            state={},
-            last_update_time=storage_session.update_time.timestamp(),
+    return await self._run(
+        self._list_sessions_impl,
+        app_name=app_name,
+        user_id=user_id,
+        config=config,
+    )
+
+  def _list_sessions_impl(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    query = (
+        session_factory.query(StorageSession)
+        .filter(StorageSession.app_name == app_name)
+        .filter(StorageSession.user_id == user_id)
+    )
+    if config:
+      if config.updated_after is not None:
+        query = query.filter(
+            StorageSession.update_time
+            > datetime.fromtimestamp(config.updated_after)
+        )
+      if config.page_token:
+        update_time, session_id = _session_util.decode_page_token(
+            config.page_token
+        )
+        update_time_column = StorageSession.update_time
+        update_time = datetime.fromisoformat(update_time)
+        if session_factory.get_bind().dialect.name == "sqlite":
+          # SQLite compares datetimes as strings, and CURRENT_TIMESTAMP has no
+          # fractional seconds unlike the bound datetimes.
+          update_time_column = func.julianday(update_time_column)
+          update_time = func.julianday(update_time)
+        query = query.filter(
+            or_(
+                update_time_column < update_time,
+                and_(
+                    update_time_column == update_time,
+                    StorageSession.id < session_id,
+                ),
+            )
         )
-        sessions.append(session)
-      return ListSessionsResponse(sessions=sessions)
+      query = query.order_by(
+          StorageSession.update_time.desc(), StorageSession.id.desc()
+      )
+      if config.page_size:
+        # One more session tells whether there is a next page.
+        query = query.limit(config.page_size + 1)
+    results = query.all()
+
+    next_page_token = None
+    if config and config.page_size and len(results) > config.page_size:
+      results = results[: config.page_size]
+      next_page_token = _session_util.encode_page_token(
+          results[-1].update_time.isoformat(), results[-1].id
+      )
+
+    sessions = []
+    for storage_session in results:
+      session = Session(
+          app_name=app_name,
+          user_id=user_id,
+          id=storage_session.id,
+          state={},
+          last_update_time=storage_session.update_time.timestamp(),
+          version=storage_session.version,
+      )
+      sessions.append(session)
+    return ListSessionsResponse(
+        sessions=sessions, next_page_token=next_page_token
+    )
 
   @override
   async def delete_session(
       self, app_name: str, user_id: str, session_id: str
   ) -> None:
-    with self.database_session_factory() as session_factory:
-      stmt = delete(StorageSession).where(
-          StorageSession.app_name == app_name,
-          StorageSession.user_id == user_id,
-          StorageSession.id == session_id,
-      )
-      session_factory.execute(stmt)
-      session_factory.commit()
+    await self._run(
+        self._delete_session_impl,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
 
-  @override
-  async def append_event(self, session: Session, event: Event) -> Event:
-    logger.info(f"Append event: {event} to session {session.id}")
+  def _delete_session_impl(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+  ) -> None:
+    stmt = delete(StorageSession).where(
+        StorageSession.app_name == app_name,
+        StorageSession.user_id == user_id,
+        StorageSession.id == session_id,
+    )
+    session_factory.execute(stmt)
+    session_factory.commit()
 
-    if event.partial:
-      return event
+  @property
+  @override
+  def supports_archiving(self) -> bool:
+    return True
 
-    # 1. Check if timestamp is stale
-    # 2. Update session attributes based on event config
-    # 3. Store event to table
-    with self.database_session_factory() as session_factory:
-      storage_session = session_factory.get(
-          StorageSession, (session.app_name, session.user_id, session.id)
-      )
+  @override
+  async def archive_events(
+      self,
+      session: Session,
+      events: list[Event],
+      *,
+      checkpoint_event: Optional[Event] = None,
+  ) -> None:
+    await self._run(
+        self._archive_events_impl,
+        session=session,
+        events=events,
+        checkpoint_event=checkpoint_event,
+    )
 
-      if storage_session.update_time.timestamp() > session.last_update_time:
-        raise ValueError(
-            "The last_update_time provided in the session object"
-            f" {datetime.fromtimestamp(session.last_update_time):'%Y-%m-%d %H:%M:%S'} is"
-            " earlier than the update_time in the storage_session"
-            f" {storage_session.update_time:'%Y-%m-%d %H:%M:%S'}. Please check"
-            " if it is a stale session."
+  def _archive_events_impl(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      session: Session,
+      events: list[Event],
+      checkpoint_event: Optional[Event],
+  ) -> None:
+    key = {
+        "app_name": session.app_name,
+        "user_id": session.user_id,
+        "session_id": session.id,
+    }
+    event_ids = [event.id for event in events]
+    session_factory.add_all(
+        StorageArchivedEvent(
+            **key,
+            id=event.id,
+            timestamp=datetime.fromtimestamp(event.timestamp),
+            event=event.model_dump_json(exclude_none=True),
         )
-
-      # Fetch states from storage
-      storage_app_state = session_factory.get(
-          StorageAppState, (session.app_name)
-      )
-      storage_user_state = session_factory.get(
-          StorageUserState, (session.app_name, session.user_id)
+        for event in events
+    )
+    # The archived events carry their blobs, so they are deleted explicitly
+    # instead of relying on the foreign keys, which SQLite does not enforce by
+    # default.
+    for storage_class, id_column in (
+        (StorageEventBlob, StorageEventBlob.event_id),
+        (StorageEvent, StorageEvent.id),
+    ):
+      session_factory.execute(
+          delete(storage_class)
+          .filter_by(**key)
+          .where(id_column.in_(event_ids))
+          .execution_options(synchronize_session=False)
       )
 
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
-      session_state = storage_session.state
-
-      # Extract state delta
-      app_state_delta = {}
-      user_state_delta = {}
-      session_state_delta = {}
-      if event.actions:
-        if event.actions.state_delta:
-          app_state_delta, user_state_delta, session_state_delta = (
-              _extract_state_delta(event.actions.state_delta)
-          )
-
-      # Merge state
-      app_state.update(app_state_delta)
-      user_state.update(user_state_delta)
-      session_state.update(session_state_delta)
-
-      # Update storage
-      storage_app_state.state = app_state
-      storage_user_state.state = user_state
-      storage_session.state = session_state
-
+    if checkpoint_event:
+      storage_events, storage_blobs = self._to_storage_events(
+          session, [checkpoint_event]
+      )
+      session_factory.add_all(storage_events)
+      if storage_blobs:
+        session_factory.flush()
+        session_factory.add_all(storage_blobs)
+    session_factory.commit()
+
+  def _to_storage_events(
+      self, session: Session, events: list[Event]
+  ) -> tuple[list[StorageEvent], list[StorageEventBlob]]:
+    """Converts events to rows, along with the rows of their blobs."""
+    storage_events = []
+    storage_blobs = []
+    for event in events:
       storage_event = StorageEvent(
           id=event.id,
           invocation_id=event.invocation_id,
@@ -544,20 +980,216 @@ class DatabaseSessionService(BaseSessionService):
           interrupted=event.interrupted,
       )
       if event.content:
-        storage_event.content = _session_util.encode_content(event.content)
+        blobs = [] if self.store_inline_data_as_blobs else None
+        storage_event.content = _session_util.encode_content(
+            event.content, blobs=blobs
+        )
+        storage_blobs.extend(
+            StorageEventBlob(
+                app_name=session.app_name,
+                user_id=session.user_id,
+                session_id=session.id,
+                event_id=event.id,
+                blob_index=blob_index,
+                data=data,
+            )
+            for blob_index, data in enumerate(blobs or [])
+        )
+      storage_events.append(storage_event)
+    return storage_events, storage_blobs
+
+  async def migrate_event_actions(self, batch_size: int = 1000) -> int:
+    """Re-encodes the pickled event actions written by earlier versions.
+
+    Pickled rows stay readable, this only has to run once to move existing
+    databases to the JSON encoding.
 
-      session_factory.add(storage_event)
+    Args:
+      batch_size: The number of events read and committed at a time.
 
+    Returns:
+      The number of migrated events.
+    """
+    return await self._run(
+        self._migrate_event_actions_impl, batch_size=batch_size
+    )
+
+  def _migrate_event_actions_impl(
+      self, session_factory: DatabaseSessionFactory, *, batch_size: int
+  ) -> int:
+    primary_key = (
+        StorageEvent.app_name,
+        StorageEvent.user_id,
+        StorageEvent.session_id,
+        StorageEvent.id,
+    )
+    # Reads the column without decoding it.
+    raw_actions = type_coerce(StorageEvent.actions, LargeBinary)
+    num_migrated = 0
+    offset = 0
+    while True:
+      rows = session_factory.execute(
+          select(*primary_key, raw_actions)
+          .order_by(*primary_key)
+          .limit(batch_size)
+          .offset(offset)
+      ).all()
+      if not rows:
+        break
+      for app_name, user_id, session_id, event_id, actions in rows:
+        if actions is None or _is_json_event_actions(actions):
+          continue
+        session_factory.execute(
+            update(StorageEvent)
+            .where(
+                StorageEvent.app_name == app_name,
+                StorageEvent.user_id == user_id,
+                StorageEvent.session_id == session_id,
+                StorageEvent.id == event_id,
+            )
+            .values(actions=pickle.loads(actions))
+            .execution_options(synchronize_session=False)
+        )
+        num_migrated += 1
       session_factory.commit()
-      session_factory.refresh(storage_session)
+      offset += batch_size
+    return num_migrated
+
+  @override
+  async def append_event(self, session: Session, event: Event) -> Event:
+    logger.info(f"Append event: {event} to session {session.id}")
+
+    if event.partial:
+      return event
 
-      # Update timestamp with commit time
-      session.last_update_time = storage_session.update_time.timestamp()
+    await self._run(self._append_events_impl, session=session, events=[event])
 
     # Also update the in-memory session
     await super().append_event(session=session, event=event)
     return event
 
+  @override
+  async def append_events(
+      self, session: Session, events: list[Event]
+  ) -> list[Event]:
+    logger.info(f"Append {len(events)} events to session {session.id}")
+
+    events_to_store = [event for event in events if not event.partial]
+    if events_to_store:
+      await self._run(
+          self._append_events_impl, session=session, events=events_to_store
+      )
+
+    # Also update the in-memory session
+    for event in events_to_store:
+      await BaseSessionService.append_event(self, session=session, event=event)
+    return events
+
+  def _append_events_impl(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      session: Session,
+      events: list[Event],
+  ) -> None:
+    # The session row is updated with a compare-and-swap on its version, so an
+    # append that raced with another one is retried on top of it.
+    for attempt in range(_MAX_APPEND_ATTEMPTS):
+      try:
+        self._try_append_events(session_factory, session=session, events=events)
+        return
+      except StaleDataError as e:
+        session_factory.rollback()
+        if attempt == _MAX_APPEND_ATTEMPTS - 1:
+          raise SessionConflictError(
+              f"Session {session.id} kept being modified concurrently."
+          ) from e
+
+  def _try_append_events(
+      self,
+      session_factory: DatabaseSessionFactory,
+      *,
+      session: Session,
+      events: list[Event],
+  ) -> None:
+    # 1. Rebase the events if the session was appended to concurrently
+    # 2. Update session attributes based on event config
+    # 3. Store events to table, all in one transaction
+    storage_session = session_factory.get(
+        StorageSession, (session.app_name, session.user_id, session.id)
+    )
+
+    # Extract state delta
+    app_state_delta = {}
+    user_state_delta = {}
+    session_state_delta = {}
+    for event in events:
+      if event.actions and event.actions.state_delta:
+        event_app_delta, event_user_delta, event_session_delta = (
+            _session_util.extract_state_delta(event.actions.state_delta)
+        )
+        app_state_delta.update(event_app_delta)
+        user_state_delta.update(event_user_delta)
+        session_state_delta.update(event_session_delta)
+
+    rebased = storage_session.version != session.version
+    if rebased:
+      # Other invocations appended events since the caller read the session.
+      # The session state delta is applied on top of theirs, unless it changes
+      # keys they changed too.
+      conflicting_keys = [
+          key
+          for key in session_state_delta
+          if storage_session.state.get(key, _MISSING)
+          != session.state.get(key, _MISSING)
+      ]
+      if conflicting_keys:
+        raise SessionConflictError(
+            f"The state keys {conflicting_keys} of session {session.id} were"
+            " changed concurrently. Get the session again before appending."
+        )
+
+    # Only write the app and user state rows touched by the delta, as every
+    # session of the app (or user) contends for the same row.
+    if app_state_delta:
+      _update_state(
+          session_factory,
+          StorageAppState,
+          app_state_delta,
+          app_name=session.app_name,
+      )
+    if user_state_delta:
+      _update_state(
+          session_factory,
+          StorageUserState,
+          user_state_delta,
+          app_name=session.app_name,
+          user_id=session.user_id,
+      )
+
+    # The session row is always updated so that its update_time and version
+    # move.
+    storage_session.state.update(session_state_delta)
+    flag_modified(storage_session, "state")
+
+    storage_events, storage_blobs = self._to_storage_events(session, events)
+    session_factory.add_all(storage_events)
+
+    # Flush the events first so that the blobs satisfy their foreign key.
+    if storage_blobs:
+      session_factory.flush()
+      session_factory.add_all(storage_blobs)
+
+    session_factory.commit()
+    session_factory.refresh(storage_session)
+
+    # Update timestamp with commit time
+    session.last_update_time = storage_session.update_time.timestamp()
+    if rebased:
+      # So the caller sees the state set by the other invocations.
+      session.state.update(storage_session.state)
+    session.version = storage_session.version
+
 
 def convert_event(event: StorageEvent) -> Event:
   """Converts a storage event to an event."""
@@ -572,26 +1204,117 @@ def convert_event(event: StorageEvent) -> Event:
   )
 
 
-def _extract_state_delta(state: dict[str, Any]):
-  app_state_delta = {}
-  user_state_delta = {}
-  session_state_delta = {}
-  if state:
-    for key in state.keys():
-      if key.startswith(State.APP_PREFIX):
-        app_state_delta[key.removeprefix(State.APP_PREFIX)] = state[key]
-      elif key.startswith(State.USER_PREFIX):
-        user_state_delta[key.removeprefix(State.USER_PREFIX)] = state[key]
-      elif not key.startswith(State.TEMP_PREFIX):
-        session_state_delta[key] = state[key]
-  return app_state_delta, user_state_delta, session_state_delta
-
-
-def _merge_state(app_state, user_state, session_state):
-  # Merge states for response
-  merged_state = copy.deepcopy(session_state)
-  for key in app_state.keys():
-    merged_state[State.APP_PREFIX + key] = app_state[key]
-  for key in user_state.keys():
-    merged_state[State.USER_PREFIX + key] = user_state[key]
-  return merged_state
+def _from_storage_event(
+    storage_event: StorageEvent, blobs: Optional[list[bytes]]
+) -> Event:
+  """Converts a storage event to an event, with the blobs of its content."""
+  return Event(
+      id=storage_event.id,
+      author=storage_event.author,
+      branch=storage_event.branch,
+      invocation_id=storage_event.invocation_id,
+      content=_session_util.decode_content(storage_event.content, blobs=blobs),
+      actions=storage_event.actions,
+      timestamp=storage_event.timestamp.timestamp(),
+      long_running_tool_ids=storage_event.long_running_tool_ids,
+      grounding_metadata=storage_event.grounding_metadata,
+      partial=storage_event.partial,
+      turn_complete=storage_event.turn_complete,
+      error_code=storage_event.error_code,
+      error_message=storage_event.error_message,
+      interrupted=storage_event.interrupted,
+  )
+
+
+def _fetch_blobs(
+    session_factory: DatabaseSessionFactory,
+    storage_events: list[StorageEvent],
+) -> dict[str, list[bytes]]:
+  """Fetches the blobs referenced by the events, keyed by event id."""
+  event_ids = [
+      e.id
+      for e in storage_events
+      if _session_util.has_blob_references(e.content)
+  ]
+  if not event_ids:
+    return {}
+  first_event = storage_events[0]
+  storage_blobs = session_factory.execute(
+      select(
+          StorageEventBlob.event_id,
+          StorageEventBlob.blob_index,
+          StorageEventBlob.data,
+      )
+      .where(
+          StorageEventBlob.app_name == first_event.app_name,
+          StorageEventBlob.user_id == first_event.user_id,
+          StorageEventBlob.session_id == first_event.session_id,
+          StorageEventBlob.event_id.in_(event_ids),
+      )
+      .order_by(StorageEventBlob.event_id, StorageEventBlob.blob_index)
+  ).all()
+  blobs = {}
+  for event_id, _, data in storage_blobs:
+    blobs.setdefault(event_id, []).append(data)
+  return blobs
+
+
+def _is_json_event_actions(value: bytes) -> bool:
+  """Whether the stored event actions are JSON, as opposed to a pickle."""
+  return value[:1] == b"{"
+
+
+def _create_tables(connection: Connection) -> None:
+  """Creates the missing tables, and the missing indexes of existing tables."""
+  Base.metadata.create_all(connection)
+  session_columns = {
+      column["name"]
+      for column in inspect(connection).get_columns(
+          StorageSession.__tablename__
+      )
+  }
+  if "version" not in session_columns:
+    connection.execute(
+        text(
+            f"ALTER TABLE {StorageSession.__tablename__} ADD COLUMN version"
+            " INTEGER NOT NULL DEFAULT 0"
+        )
+    )
+  # `create_all` skips existing tables, so indexes added after a table was
+  # first created are migrated here.
+  for table in Base.metadata.sorted_tables:
+    for index in table.indexes:
+      index.create(connection, checkfirst=True)
+
+
+def _update_state(
+    session_factory: DatabaseSessionFactory,
+    storage_class: type[Union[StorageAppState, StorageUserState]],
+    state_delta: dict[str, Any],
+    **primary_key: str,
+) -> None:
+  """Merges the state delta into the state row identified by `primary_key`.
+
+  On PostgreSQL the delta is merged in place with the JSONB `||` operator, so
+  only the given keys are written and concurrent writers to the same row don't
+  overwrite each other's keys. Other dialects rewrite the JSON document.
+  """
+  if session_factory.get_bind().dialect.name == "postgresql":
+    session_factory.execute(
+        update(storage_class)
+        .where(*[
+            getattr(storage_class, column) == value
+            for column, value in primary_key.items()
+        ])
+        .values(
+            state=storage_class.state.op("||")(
+                bindparam(None, state_delta, type_=postgresql.JSONB)
+            )
+        )
+    )
+    return
+
+  storage_state = session_factory.get(
+      storage_class, tuple(primary_key.values())
+  )
+  storage_state.state.update(state_delta)
@@ -0,0 +1,693 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import bisect
+from collections import OrderedDict
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Any
+from typing import AsyncIterator
+from typing import BinaryIO
+from typing import Callable
+from typing import Optional
+from typing import TypeVar
+import urllib.parse
+import uuid
+
+from typing_extensions import override
+
+from . import _session_util
+from ..events.event import Event
+from .base_session_service import BaseSessionService
+from .base_session_service import GetSessionConfig
+from .base_session_service import ListSessionsConfig
+from .base_session_service import ListSessionsResponse
+from .session import Session
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+# Every record starts with the length of its payload, its type and its
+# timestamp.
+_RECORD_HEADER = struct.Struct('>IBd')
+# The payload is an event encoded as JSON.
+_EVENT_RECORD = 1
+# The payload is the session state, encoded as JSON, after the events before.
+_CHECKPOINT_RECORD = 2
+
+_SEGMENT_SUFFIX = '.log'
+# The events archived out of a session are appended to a file next to its
+# segment, as event records.
+_ARCHIVE_SUFFIX = '.archive'
+
+_SessionKey = tuple[str, str, str]
+
+_T = TypeVar('_T')
+
+
+class _SegmentIndex:
+  """The in-memory index of the segment file of a session."""
+
+  def __init__(self, path: str):
+    self.path = path
+    # The offset and timestamp of every event record, in order. The timestamps
+    # are clamped to never decrease, so that they can be bisected.
+    self.event_offsets: list[int] = []
+    self.event_timestamps: list[float] = []
+    # The offset of the last checkpoint, and the number of events before it.
+    self.checkpoint_offset = 0
+    self.num_checkpointed_events = 0
+    self.size = 0
+    self.last_update_time = 0.0
+    # The session state, only restored when the session is read or appended to.
+    self.state: Optional[dict[str, Any]] = None
+
+  def add_event(self, offset: int, timestamp: float):
+    if self.event_timestamps:
+      timestamp = max(timestamp, self.event_timestamps[-1])
+    self.event_offsets.append(offset)
+    self.event_timestamps.append(timestamp)
+
+
+class FileLogSessionService(BaseSessionService):
+  """A session service storing each session as an append-only file.
+
+  Every session is a segment file of length-prefixed records: the encoded
+  events, and checkpoints of the session state written every
+  `checkpoint_interval` events. Appending an event is a single write at the end
+  of the file. An in-memory index of the record offsets lets reads decode only
+  the events they return, and restoring the state of a session only replays the
+  events after its last checkpoint. Segments are scanned through memory maps
+  when they are first accessed. Archiving events rewrites the segment without
+  them, and moves them to an archive file next to it.
+
+  Reading events after a timestamp bisects the timestamps of the events. An
+  event appended with an older timestamp than the one before it is indexed at
+  the timestamp before it, so it is read along with the events around it.
+
+  The app and user states are stored as JSON files next to the segments. The
+  files are read and written in a worker thread, one operation at a time, so
+  that the event loop is not blocked. The service is meant for a single
+  process: files are not locked.
+  """
+
+  def __init__(
+      self,
+      root_dir: str,
+      *,
+      checkpoint_interval: int = 100,
+      fsync: bool = False,
+      max_open_files: int = 64,
+  ):
+    """Initializes the file log session service.
+
+    Args:
+      root_dir: The directory storing the sessions.
+      checkpoint_interval: The number of events between two checkpoints of the
+        session state.
+      fsync: Whether to sync every append to disk, so that it survives an
+        operating system crash and not only a process crash.
+      max_open_files: The maximum number of segment files kept open for
+        appending.
+    """
+    self.root_dir = root_dir
+    self.checkpoint_interval = checkpoint_interval
+    self.fsync = fsync
+    self.max_open_files = max_open_files
+    self._indexes: dict[_SessionKey, _SegmentIndex] = {}
+    # The files open for appending, from the least to the most recently used.
+    self._open_files: OrderedDict[_SessionKey, BinaryIO] = OrderedDict()
+    self._app_states: dict[str, dict[str, Any]] = {}
+    self._user_states: dict[tuple[str, str], dict[str, Any]] = {}
+    # Guards the indexes, the open files and the states above.
+    self._lock = threading.Lock()
+
+  @override
+  async def create_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
+  ) -> Session:
+    return await self._run(
+        self._create_session_impl,
+        app_name=app_name,
+        user_id=user_id,
+        state=state,
+        session_id=session_id,
+    )
+
+  def _create_session_impl(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]],
+      session_id: Optional[str],
+  ) -> Session:
+    session_id = (
+        session_id.strip()
+        if session_id and session_id.strip()
+        else str(uuid.uuid4())
+    )
+    path = self._segment_path(app_name, user_id, session_id)
+    if os.path.exists(path):
+      raise ValueError(f'Session already exists: {session_id}')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    app_state_delta, user_state_delta, session_state = (
+        _session_util.extract_state_delta(state)
+    )
+    self._update_app_state(app_name, app_state_delta)
+    self._update_user_state(app_name, user_id, user_state_delta)
+
+    key = (app_name, user_id, session_id)
+    index = _SegmentIndex(path)
+    index.state = session_state
+    self._indexes[key] = index
+    self._write_checkpoint(key, index, time.time())
+
+    return Session(
+        app_name=app_name,
+        user_id=user_id,
+        id=session_id,
+        state=self._merge_state(app_name, user_id, session_state),
+        last_update_time=index.last_update_time,
+    )
+
+  @override
+  async def get_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    return await self._run(
+        self._get_session_impl,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=config,
+    )
+
+  def _get_session_impl(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig],
+  ) -> Optional[Session]:
+    index = self._get_index(app_name, user_id, session_id)
+    if index is None:
+      return None
+    state = self._restore_state(index)
+
+    start = 0
+    if config:
+      if config.num_recent_events:
+        start = max(0, len(index.event_offsets) - config.num_recent_events)
+      if config.after_timestamp:
+        start = max(
+            start,
+            bisect.bisect_left(index.event_timestamps, config.after_timestamp),
+        )
+    events = [
+        Event.model_validate_json(payload)
+        for payload in _read_payloads(index.path, index.event_offsets[start:])
+    ]
+
+    return Session(
+        app_name=app_name,
+        user_id=user_id,
+        id=session_id,
+        state=self._merge_state(app_name, user_id, state),
+        events=events,
+        last_update_time=index.last_update_time,
+    )
+
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      after: Optional[float] = None,
+      batch_size: int = 100,
+  ) -> AsyncIterator[Event]:
+    index = await self._run(self._get_index, app_name, user_id, session_id)
+    if index is None:
+      return
+    # Only the events appended so far are iterated.
+    num_events = len(index.event_offsets)
+    start = 0
+    if after:
+      start = bisect.bisect_left(index.event_timestamps, after, 0, num_events)
+    for batch_start in range(start, num_events, batch_size):
+      batch_offsets = index.event_offsets[
+          batch_start : min(batch_start + batch_size, num_events)
+      ]
+      for payload in await self._run(_read_payloads, index.path, batch_offsets):
+        yield Event.model_validate_json(payload)
+
+  @override
+  async def list_sessions(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    return await self._run(
+        self._list_sessions_impl,
+        app_name=app_name,
+        user_id=user_id,
+        config=config,
+    )
+
+  def _list_sessions_impl(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig],
+  ) -> ListSessionsResponse:
+    sessions_dir = os.path.dirname(self._segment_path(app_name, user_id, ''))
+    if not os.path.isdir(sessions_dir):
+      return ListSessionsResponse()
+
+    sessions = []
+    for file_name in sorted(os.listdir(sessions_dir)):
+      if not file_name.endswith(_SEGMENT_SUFFIX):
+        continue
+      session_id = urllib.parse.unquote(file_name[: -len(_SEGMENT_SUFFIX)])
+      index = self._get_index(app_name, user_id, session_id)
+      if index is None:
+        continue
+      sessions.append(
+          Session(
+              app_name=app_name,
+              user_id=user_id,
+              id=session_id,
+              state={},
+              last_update_time=index.last_update_time,
+          )
+      )
+    sessions, next_page_token = _session_util.paginate_sessions(
+        sessions, config
+    )
+    return ListSessionsResponse(
+        sessions=sessions, next_page_token=next_page_token
+    )
+
+  @override
+  async def delete_session(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    await self._run(
+        self._delete_session_impl,
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+    )
+
+  def _delete_session_impl(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    key = (app_name, user_id, session_id)
+    self._close_file(key)
+    self._indexes.pop(key, None)
+    path = self._segment_path(app_name, user_id, session_id)
+    for file_path in (path, path + _ARCHIVE_SUFFIX):
+      if os.path.exists(file_path):
+        os.remove(file_path)
+
+  @override
+  async def append_event(self, session: Session, event: Event) -> Event:
+    if event.partial:
+      return event
+
+    last_update_time = await self._run(self._append_event_impl, session, event)
+
+    # Also update the in-memory session
+    await super().append_event(session=session, event=event)
+    session.last_update_time = last_update_time
+    return event
+
+  def _append_event_impl(self, session: Session, event: Event) -> float:
+    """Appends the event to the segment and returns its last update time."""
+    key = (session.app_name, session.user_id, session.id)
+    index = self._get_index(*key)
+    if index is None:
+      raise ValueError(f'Session not found: {session.id}')
+    state = self._restore_state(index)
+
+    offset = self._write_record(
+        key,
+        index,
+        _EVENT_RECORD,
+        event.timestamp,
+        event.model_dump_json(exclude_none=True).encode('utf-8'),
+    )
+    index.add_event(offset, event.timestamp)
+
+    if event.actions and event.actions.state_delta:
+      app_state_delta, user_state_delta, session_state_delta = (
+          _session_util.extract_state_delta(event.actions.state_delta)
+      )
+      self._update_app_state(session.app_name, app_state_delta)
+      self._update_user_state(
+          session.app_name, session.user_id, user_state_delta
+      )
+      state.update(session_state_delta)
+
+    if (
+        len(index.event_offsets) - index.num_checkpointed_events
+        >= self.checkpoint_interval
+    ):
+      self._write_checkpoint(key, index, event.timestamp)
+    return index.last_update_time
+
+  @property
+  @override
+  def supports_archiving(self) -> bool:
+    return True
+
+  @override
+  async def archive_events(
+      self,
+      session: Session,
+      events: list[Event],
+      *,
+      checkpoint_event: Optional[Event] = None,
+  ) -> None:
+    await self._run(
+        self._archive_events_impl,
+        session,
+        events,
+        checkpoint_event=checkpoint_event,
+    )
+
+  def _archive_events_impl(
+      self,
+      session: Session,
+      events: list[Event],
+      *,
+      checkpoint_event: Optional[Event],
+  ) -> None:
+    key = (session.app_name, session.user_id, session.id)
+    index = self._get_index(*key)
+    if index is None:
+      return
+    state = self._restore_state(index)
+
+    archived_ids = {event.id for event in events}
+    archived_records = []
+    kept_records = []
+    if checkpoint_event:
+      kept_records.append((
+          checkpoint_event.timestamp,
+          checkpoint_event.model_dump_json(exclude_none=True).encode('utf-8'),
+      ))
+    for timestamp, payload in zip(
+        index.event_timestamps,
+        _read_payloads(index.path, index.event_offsets),
+    ):
+      if json.loads(payload)['id'] in archived_ids:
+        archived_records.append((timestamp, payload))
+      else:
+        kept_records.append((timestamp, payload))
+    # The state, which already reflects the archived events, is checkpointed
+    # after the kept events, so that restoring it replays none of them.
+    checkpoint_record = (
+        _CHECKPOINT_RECORD,
+        index.last_update_time,
+        json.dumps(state).encode('utf-8'),
+    )
+
+    # The archived events are written first, so that a crash in between
+    # duplicates them instead of losing them.
+    self._write_records(
+        index.path + _ARCHIVE_SUFFIX,
+        [(_EVENT_RECORD, *record) for record in archived_records],
+        mode='ab',
+    )
+    self._close_file(key)
+    tmp_path = index.path + '.tmp'
+    self._write_records(
+        tmp_path,
+        [(_EVENT_RECORD, *record) for record in kept_records]
+        + [checkpoint_record],
+        mode='wb',
+    )
+    os.replace(tmp_path, index.path)
+
+    new_index = self._indexes[key] = _load_index(index.path)
+    new_index.state = state
+
+  def close(self) -> None:
+    """Closes the files open for appending."""
+    with self._lock:
+      for key in list(self._open_files):
+        self._close_file(key)
+
+  async def _run(self, func: Callable[..., _T], /, *args, **kwargs) -> _T:
+    """Runs `func` in a worker thread, while holding the lock."""
+
+    def run_locked() -> _T:
+      with self._lock:
+        return func(*args, **kwargs)
+
+    return await asyncio.to_thread(run_locked)
+
+  def _segment_path(self, app_name: str, user_id: str, session_id: str) -> str:
+    return os.path.join(
+        self._user_dir(app_name, user_id),
+        'sessions',
+        _quote(session_id) + _SEGMENT_SUFFIX,
+    )
+
+  def _app_dir(self, app_name: str) -> str:
+    return os.path.join(self.root_dir, _quote(app_name))
+
+  def _user_dir(self, app_name: str, user_id: str) -> str:
+    return os.path.join(self._app_dir(app_name), 'users', _quote(user_id))
+
+  def _get_index(
+      self, app_name: str, user_id: str, session_id: str
+  ) -> Optional[_SegmentIndex]:
+    key = (app_name, user_id, session_id)
+    index = self._indexes.get(key)
+    if index is None:
+      path = self._segment_path(app_name, user_id, session_id)
+      if not os.path.exists(path):
+        return None
+      index = self._indexes[key] = _load_index(path)
+    return index
+
+  def _restore_state(self, index: _SegmentIndex) -> dict[str, Any]:
+    """Returns the session state, replaying the events after the checkpoint."""
+    if index.state is None:
+      checkpoint_payload, *event_payloads = _read_payloads(
+          index.path,
+          [index.checkpoint_offset]
+          + index.event_offsets[index.num_checkpointed_events :],
+      )
+      state = json.loads(checkpoint_payload)
+      for payload in event_payloads:
+        event = Event.model_validate_json(payload)
+        if event.actions and event.actions.state_delta:
+          state.update(
+              _session_util.extract_state_delta(event.actions.state_delta)[2]
+          )
+      index.state = state
+    return index.state
+
+  def _write_checkpoint(
+      self, key: _SessionKey, index: _SegmentIndex, timestamp: float
+  ):
+    offset = self._write_record(
+        key,
+        index,
+        _CHECKPOINT_RECORD,
+        timestamp,
+        json.dumps(index.state).encode('utf-8'),
+    )
+    index.checkpoint_offset = offset
+    index.num_checkpointed_events = len(index.event_offsets)
+
+  def _write_record(
+      self,
+      key: _SessionKey,
+      index: _SegmentIndex,
+      record_type: int,
+      timestamp: float,
+      payload: bytes,
+  ) -> int:
+    """Appends a record to the segment and returns its offset."""
+    file = self._open_file(key, index)
+    offset = index.size
+    file.write(
+        _RECORD_HEADER.pack(len(payload), record_type, timestamp) + payload
+    )
+    file.flush()
+    if self.fsync:
+      os.fsync(file.fileno())
+    index.size += _RECORD_HEADER.size + len(payload)
+    index.last_update_time = timestamp
+    return offset
+
+  def _write_records(
+      self, path: str, records: list[tuple[int, float, bytes]], mode: str
+  ):
+    """Writes records of the given types, timestamps and payloads to a file."""
+    with open(path, mode) as f:
+      for record_type, timestamp, payload in records:
+        f.write(
+            _RECORD_HEADER.pack(len(payload), record_type, timestamp) + payload
+        )
+      f.flush()
+      if self.fsync:
+        os.fsync(f.fileno())
+
+  def _open_file(self, key: _SessionKey, index: _SegmentIndex) -> BinaryIO:
+    file = self._open_files.get(key)
+    if file is None:
+      file = self._open_files[key] = open(index.path, 'ab')
+      while len(self._open_files) > self.max_open_files:
+        self._close_file(next(iter(self._open_files)))
+    self._open_files.move_to_end(key)
+    return file
+
+  def _close_file(self, key: _SessionKey):
+    file = self._open_files.pop(key, None)
+    if file:
+      file.close()
+
+  def _merge_state(
+      self, app_name: str, user_id: str, session_state: dict[str, Any]
+  ) -> dict[str, Any]:
+    return _session_util.merge_state(
+        self._get_app_state(app_name),
+        self._get_user_state(app_name, user_id),
+        session_state,
+    )
+
+  def _get_app_state(self, app_name: str) -> dict[str, Any]:
+    if app_name not in self._app_states:
+      self._app_states[app_name] = _read_json(
+          os.path.join(self._app_dir(app_name), 'app_state.json')
+      )
+    return self._app_states[app_name]
+
+  def _get_user_state(self, app_name: str, user_id: str) -> dict[str, Any]:
+    if (app_name, user_id) not in self._user_states:
+      self._user_states[(app_name, user_id)] = _read_json(
+          os.path.join(self._user_dir(app_name, user_id), 'user_state.json')
+      )
+    return self._user_states[(app_name, user_id)]
+
+  def _update_app_state(self, app_name: str, state_delta: dict[str, Any]):
+    if state_delta:
+      app_state = self._get_app_state(app_name)
+      app_state.update(state_delta)
+      _write_json(
+          os.path.join(self._app_dir(app_name), 'app_state.json'), app_state
+      )
+
+  def _update_user_state(
+      self, app_name: str, user_id: str, state_delta: dict[str, Any]
+  ):
+    if state_delta:
+      user_state = self._get_user_state(app_name, user_id)
+      user_state.update(state_delta)
+      _write_json(
+          os.path.join(self._user_dir(app_name, user_id), 'user_state.json'),
+          user_state,
+      )
+
+
+def _quote(name: str) -> str:
+  """Escapes a name so that it can be used as a file name."""
+  return urllib.parse.quote(name, safe='')
+
+
+def _load_index(path: str) -> _SegmentIndex:
+  """Indexes a segment by scanning the record headers, without decoding."""
+  index = _SegmentIndex(path)
+  offset = 0
+  with open(path, 'r+b') as f:
+    size = os.fstat(f.fileno()).st_size
+    if size:
+      with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        while offset + _RECORD_HEADER.size <= size:
+          length, record_type, timestamp = _RECORD_HEADER.unpack_from(
+              buffer, offset
+          )
+          end = offset + _RECORD_HEADER.size + length
+          if end > size:
+            break
+          if record_type == _EVENT_RECORD:
+            index.add_event(offset, timestamp)
+          elif record_type == _CHECKPOINT_RECORD:
+            index.checkpoint_offset = offset
+            index.num_checkpointed_events = len(index.event_offsets)
+          index.last_update_time = timestamp
+          offset = end
+    if offset < size:
+      # The last record was partially written when the process stopped.
+      logger.warning('Truncating the partial record at the end of %s.', path)
+      f.truncate(offset)
+  index.size = offset
+  return index
+
+
+def _read_payloads(path: str, offsets: list[int]) -> list[bytes]:
+  """Reads the payloads of the records at the given offsets of a segment."""
+  if not offsets:
+    return []
+  with open(path, 'rb') as f:
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+      payloads = []
+      for offset in offsets:
+        length, _, _ = _RECORD_HEADER.unpack_from(buffer, offset)
+        start = offset + _RECORD_HEADER.size
+        payloads.append(buffer[start : start + length])
+      return payloads
+
+
+def _read_json(path: str) -> dict[str, Any]:
+  if not os.path.exists(path):
+    return {}
+  with open(path, 'r', encoding='utf-8') as f:
+    return json.load(f)
+
+
+def _write_json(path: str, value: dict[str, Any]):
+  """Replaces the file atomically, so that it is never partially written."""
+  os.makedirs(os.path.dirname(path), exist_ok=True)
+  tmp_path = path + '.tmp'
+  with open(tmp_path, 'w', encoding='utf-8') as f:
+    json.dump(value, f)
+  os.replace(tmp_path, path)
@@ -12,36 +12,164 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import OrderedDict
 import copy
 import logging
+import threading
 import time
 from typing import Any
+from typing import AsyncIterator
+from typing import Callable
 from typing import Optional
 import uuid
 
 from typing_extensions import override
 
 from ..events.event import Event
+from . import _session_util
 from .base_session_service import BaseSessionService
 from .base_session_service import GetSessionConfig
+from .base_session_service import ListSessionsConfig
 from .base_session_service import ListSessionsResponse
 from .session import Session
 from .state import State
 
 logger = logging.getLogger('google_adk.' + __name__)
 
+_SessionKey = tuple[str, str, str]
+
+# The number of shards of the stored sessions, each guarded by its own lock.
+_NUM_SHARDS = 16
 
-class InMemorySessionService(BaseSessionService):
-  """An in-memory implementation of the session service."""
+
+class _SessionShard:
+  """The stored sessions of the users hashed to a shard."""
 
   def __init__(self):
-    # A map from app name to a map from user ID to a map from session ID to
-    # session.
-    self.sessions: dict[str, dict[str, dict[str, Session]]] = {}
+    # Guards the sessions, including their events and states, and the counters.
+    self.lock = threading.Lock()
+    # A map from app name and user ID to a map from session ID to session.
+    self.sessions: dict[tuple[str, str], dict[str, Session]] = {}
+    self.num_events = 0
+    self.num_hits = 0
+    self.num_misses = 0
+
+  def get(
+      self, app_name: str, user_id: str, session_id: str
+  ) -> Optional[Session]:
+    return self.sessions.get((app_name, user_id), {}).get(session_id)
+
+
+class InMemorySessionService(BaseSessionService):
+  """An in-memory implementation of the session service.
+
+  Sessions returned by the service are copies: modifying them does not modify
+  the stored sessions. Only the requested events are copied, so reading the
+  recent events of a long session, e.g. with `GetSessionConfig`, does not copy
+  the whole session.
+
+  The memory used by the service can be bounded, e.g. when it is used as a cache
+  in front of a durable session service. Sessions idle for longer than
+  `session_ttl` are evicted, as well as the least recently used sessions once
+  `max_sessions` or `max_events` is exceeded. App and user states are kept.
+
+  The service can be shared by invocations running on several threads, e.g.
+  through `Runner.run`. The sessions are sharded by app name and user ID, and
+  each shard has its own lock, so that the sessions of different users rarely
+  contend. An event is applied to the caller's session and to the stored
+  session synchronously while holding the lock of the shard, so that concurrent
+  turns on a session do not interleave and no lock is held across a suspension
+  point. The app and user states are replaced rather than modified, so they are
+  read without a lock. When the memory is bounded, the eviction bookkeeping is
+  guarded by a service lock, held briefly on each access.
+
+  Attributes:
+    num_hits: The number of `get_session` calls that found the session.
+    num_misses: The number of `get_session` calls that did not find the
+      session.
+    num_evictions: The number of sessions evicted so far.
+  """
+
+  def __init__(
+      self,
+      *,
+      max_sessions: Optional[int] = None,
+      max_events: Optional[int] = None,
+      session_ttl: Optional[float] = None,
+      on_evict: Optional[Callable[[Session], None]] = None,
+  ):
+    """Initializes the in-memory session service.
+
+    Args:
+      max_sessions: The maximum number of sessions to keep.
+      max_events: The maximum total number of events to keep across sessions.
+        The most recently used session is never evicted to meet this budget.
+      session_ttl: The number of seconds after which a session that was not
+        accessed is evicted.
+      on_evict: Called with each evicted session, e.g. to spill it to durable
+        storage.
+    """
+    self._shards = [_SessionShard() for _ in range(_NUM_SHARDS)]
     # A map from app name to a map from user ID to a map from key to the value.
     self.user_state: dict[str, dict[str, dict[str, Any]]] = {}
     # A map from app name to a map from key to the value.
     self.app_state: dict[str, dict[str, Any]] = {}
+    # Guards the writes to the states above. The maps from key to value are
+    # replaced rather than modified, so they are read without a lock.
+    self._state_lock = threading.Lock()
+
+    self.max_sessions = max_sessions
+    self.max_events = max_events
+    self.session_ttl = session_ttl
+    self.on_evict = on_evict
+
+    self.num_evictions = 0
+
+    # The last access time of each session, from the least to the most
+    # recently used. Only maintained when the memory is bounded.
+    self._access_times: OrderedDict[_SessionKey, float] = OrderedDict()
+    # Guards the access times and the evictions. A shard lock may be acquired
+    # while holding it, but not the other way around.
+    self._eviction_lock = threading.Lock()
+    # The events moved out of each session by compaction.
+    self.archived_events: dict[_SessionKey, list[Event]] = {}
+
+  @property
+  def sessions(self) -> dict[str, dict[str, dict[str, Session]]]:
+    """The stored sessions, by app name, user ID and session ID.
+
+    The map is built from the shards on each access, e.g. to inspect them.
+    """
+    sessions = {}
+    for shard in self._shards:
+      with shard.lock:
+        for (app_name, user_id), user_sessions in shard.sessions.items():
+          sessions.setdefault(app_name, {})[user_id] = dict(user_sessions)
+    return sessions
+
+  @property
+  def num_hits(self) -> int:
+    return sum(shard.num_hits for shard in self._shards)
+
+  @property
+  def num_misses(self) -> int:
+    return sum(shard.num_misses for shard in self._shards)
+
+  @property
+  def _num_events(self) -> int:
+    """The total number of events across sessions."""
+    return sum(shard.num_events for shard in self._shards)
+
+  @property
+  def _bounded(self) -> bool:
+    return (
+        self.max_sessions is not None
+        or self.max_events is not None
+        or self.session_ttl is not None
+    )
+
+  def _shard(self, app_name: str, user_id: str) -> _SessionShard:
+    return self._shards[hash((app_name, user_id)) % _NUM_SHARDS]
 
   @override
   async def create_session(
@@ -96,13 +224,15 @@ class InMemorySessionService(BaseSessionService):
         last_update_time=time.time(),
     )
 
-    if app_name not in self.sessions:
-      self.sessions[app_name] = {}
-    if user_id not in self.sessions[app_name]:
-      self.sessions[app_name][user_id] = {}
-    self.sessions[app_name][user_id][session_id] = session
-
-    copied_session = copy.deepcopy(session)
+    copied_session = _snapshot(session, events=[])
+    shard = self._shard(app_name, user_id)
+    with shard.lock:
+      user_sessions = shard.sessions.setdefault((app_name, user_id), {})
+      replaced_session = user_sessions.get(session_id)
+      if replaced_session:
+        shard.num_events -= len(replaced_session.events)
+      user_sessions[session_id] = session
+    self._notify_evicted(self._touch(app_name, user_id, session_id))
     return self._merge_state(app_name, user_id, copied_session)
 
   @override
@@ -145,58 +275,141 @@ class InMemorySessionService(BaseSessionService):
       session_id: str,
       config: Optional[GetSessionConfig] = None,
   ) -> Session:
-    if app_name not in self.sessions:
-      return None
-    if user_id not in self.sessions[app_name]:
-      return None
-    if session_id not in self.sessions[app_name][user_id]:
-      return None
-
-    session = self.sessions[app_name][user_id].get(session_id)
-    copied_session = copy.deepcopy(session)
-
-    if config:
-      if config.num_recent_events:
-        copied_session.events = copied_session.events[
-            -config.num_recent_events :
-        ]
-      if config.after_timestamp:
-        i = len(copied_session.events) - 1
-        while i >= 0:
-          if copied_session.events[i].timestamp < config.after_timestamp:
-            break
-          i -= 1
-        if i >= 0:
-          copied_session.events = copied_session.events[i + 1 :]
-
+    self._notify_evicted(self._evict_sessions())
+    shard = self._shard(app_name, user_id)
+    with shard.lock:
+      session = shard.get(app_name, user_id, session_id)
+      if session is None:
+        shard.num_misses += 1
+        return None
+      shard.num_hits += 1
+      # Only the requested events are copied.
+      events = session.events
+      if config:
+        if config.num_recent_events:
+          events = events[-config.num_recent_events :]
+        if config.after_timestamp:
+          i = len(events) - 1
+          while i >= 0:
+            if events[i].timestamp < config.after_timestamp:
+              break
+            i -= 1
+          if i >= 0:
+            events = events[i + 1 :]
+      copied_session = _snapshot(session, events=copy.deepcopy(events))
+    self._notify_evicted(self._touch(app_name, user_id, session_id))
     return self._merge_state(app_name, user_id, copied_session)
 
+  def _touch(
+      self, app_name: str, user_id: str, session_id: str
+  ) -> list[Session]:
+    """Marks the session as the most recently used one, then evicts sessions.
+
+    Returns:
+      The evicted sessions, to be passed to `_notify_evicted` once the locks are
+      released, as `on_evict` may call the service.
+    """
+    if not self._bounded:
+      return []
+    key = (app_name, user_id, session_id)
+    shard = self._shard(app_name, user_id)
+    with self._eviction_lock:
+      # The session may have been removed since it was accessed.
+      with shard.lock:
+        stored = shard.get(*key) is not None
+      if stored:
+        self._access_times[key] = time.monotonic()
+        self._access_times.move_to_end(key)
+      return self._evict_sessions_locked()
+
+  def _evict_sessions(self) -> list[Session]:
+    """Evicts the expired sessions, then the sessions over the budget.
+
+    Returns:
+      The evicted sessions, to be passed to `_notify_evicted` once the locks are
+      released, as `on_evict` may call the service.
+    """
+    if not self._bounded:
+      return []
+    with self._eviction_lock:
+      return self._evict_sessions_locked()
+
+  def _evict_sessions_locked(self) -> list[Session]:
+    evicted_sessions = []
+    now = time.monotonic()
+    while self._access_times:
+      key, last_access_time = next(iter(self._access_times.items()))
+      expired = (
+          self.session_ttl is not None
+          and now - last_access_time > self.session_ttl
+      )
+      over_budget = len(self._access_times) > 1 and (
+          (
+              self.max_sessions is not None
+              and len(self._access_times) > self.max_sessions
+          )
+          or (
+              self.max_events is not None and self._num_events > self.max_events
+          )
+      )
+      if not expired and not over_budget:
+        break
+      session = self._remove_session(*key)
+      if session:
+        evicted_sessions.append(session)
+        self.num_evictions += 1
+    return evicted_sessions
+
+  def _notify_evicted(self, evicted_sessions: list[Session]) -> None:
+    if self.on_evict:
+      for session in evicted_sessions:
+        self.on_evict(session)
+
+  def _remove_session(
+      self, app_name: str, user_id: str, session_id: str
+  ) -> Optional[Session]:
+    """Removes the session from the storage and returns it, if stored.
+
+    Must be called while holding the eviction lock.
+    """
+    key = (app_name, user_id, session_id)
+    self._access_times.pop(key, None)
+    shard = self._shard(app_name, user_id)
+    with shard.lock:
+      user_sessions = shard.sessions.get((app_name, user_id), {})
+      session = user_sessions.pop(session_id, None)
+      if session is None:
+        return None
+      # Drops the emptied map, so that memory is released for idle users.
+      if not user_sessions:
+        del shard.sessions[(app_name, user_id)]
+      self.archived_events.pop(key, None)
+      shard.num_events -= len(session.events)
+    return session
+
   def _merge_state(self, app_name: str, user_id: str, copied_session: Session):
     # Merge app state
-    if app_name in self.app_state:
-      for key in self.app_state[app_name].keys():
-        copied_session.state[State.APP_PREFIX + key] = self.app_state[app_name][
-            key
-        ]
-
-    if (
-        app_name not in self.user_state
-        or user_id not in self.user_state[app_name]
-    ):
-      return copied_session
+    for key, value in self.app_state.get(app_name, {}).items():
+      copied_session.state[State.APP_PREFIX + key] = value
 
     # Merge session state with user state.
-    for key in self.user_state[app_name][user_id].keys():
-      copied_session.state[State.USER_PREFIX + key] = self.user_state[app_name][
-          user_id
-      ][key]
+    for key, value in (
+        self.user_state.get(app_name, {}).get(user_id, {}).items()
+    ):
+      copied_session.state[State.USER_PREFIX + key] = value
     return copied_session
 
   @override
   async def list_sessions(
-      self, *, app_name: str, user_id: str
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
   ) -> ListSessionsResponse:
-    return self._list_sessions_impl(app_name=app_name, user_id=user_id)
+    return self._list_sessions_impl(
+        app_name=app_name, user_id=user_id, config=config
+    )
 
   def list_sessions_sync(
       self, *, app_name: str, user_id: str
@@ -205,21 +418,31 @@ class InMemorySessionService(BaseSessionService):
     return self._list_sessions_impl(app_name=app_name, user_id=user_id)
 
   def _list_sessions_impl(
-      self, *, app_name: str, user_id: str
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
   ) -> ListSessionsResponse:
-    empty_response = ListSessionsResponse()
-    if app_name not in self.sessions:
-      return empty_response
-    if user_id not in self.sessions[app_name]:
-      return empty_response
+    self._notify_evicted(self._evict_sessions())
+
+    shard = self._shard(app_name, user_id)
+    with shard.lock:
+      user_sessions = shard.sessions.get((app_name, user_id))
+      if not user_sessions:
+        return ListSessionsResponse()
+
+      sessions, next_page_token = _session_util.paginate_sessions(
+          list(user_sessions.values()), config
+      )
 
     sessions_without_events = []
-    for session in self.sessions[app_name][user_id].values():
-      copied_session = copy.deepcopy(session)
-      copied_session.events = []
-      copied_session.state = {}
+    for session in sessions:
+      copied_session = session.model_copy(update={'events': [], 'state': {}})
       sessions_without_events.append(copied_session)
-    return ListSessionsResponse(sessions=sessions_without_events)
+    return ListSessionsResponse(
+        sessions=sessions_without_events, next_page_token=next_page_token
+    )
 
   async def delete_session(
       self, *, app_name: str, user_id: str, session_id: str
@@ -239,48 +462,128 @@ class InMemorySessionService(BaseSessionService):
   def _delete_session_impl(
       self, *, app_name: str, user_id: str, session_id: str
   ) -> None:
-    if (
-        self._get_session_impl(
-            app_name=app_name, user_id=user_id, session_id=session_id
-        )
-        is None
-    ):
-      return None
+    with self._eviction_lock:
+      self._remove_session(app_name, user_id, session_id)
 
-    self.sessions[app_name][user_id].pop(session_id)
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      after: Optional[float] = None,
+      batch_size: int = 100,
+  ) -> AsyncIterator[Event]:
+    shard = self._shard(app_name, user_id)
+    with shard.lock:
+      storage_session = shard.get(app_name, user_id, session_id)
+      if storage_session is None:
+        return
+      # Archiving replaces the list instead of modifying it, so the events
+      # present now are iterated in place.
+      events = storage_session.events
+      num_events = len(events)
+    start = 0
+    if after:
+      start = num_events
+      while start > 0 and events[start - 1].timestamp >= after:
+        start -= 1
+    for i in range(start, num_events):
+      yield copy.deepcopy(events[i])
+
+  @property
+  @override
+  def supports_archiving(self) -> bool:
+    return True
+
+  @override
+  async def archive_events(
+      self,
+      session: Session,
+      events: list[Event],
+      *,
+      checkpoint_event: Optional[Event] = None,
+  ) -> None:
+    key = (session.app_name, session.user_id, session.id)
+    shard = self._shard(session.app_name, session.user_id)
+    with shard.lock:
+      storage_session = shard.get(*key)
+      if storage_session is None:
+        return
+      archived_ids = {event.id for event in events}
+      archived_events = []
+      kept_events = []
+      for event in storage_session.events:
+        if event.id in archived_ids:
+          archived_events.append(event)
+        else:
+          kept_events.append(event)
+      if checkpoint_event:
+        kept_events.insert(0, copy.deepcopy(checkpoint_event))
+      self.archived_events.setdefault(key, []).extend(archived_events)
+      shard.num_events += len(kept_events) - len(storage_session.events)
+      storage_session.events = kept_events
 
   @override
   async def append_event(self, session: Session, event: Event) -> Event:
-    # Update the in-memory session.
-    await super().append_event(session=session, event=event)
-    session.last_update_time = event.timestamp
-
-    # Update the storage session
-    app_name = session.app_name
-    user_id = session.user_id
-    session_id = session.id
-    if app_name not in self.sessions:
-      return event
-    if user_id not in self.sessions[app_name]:
-      return event
-    if session_id not in self.sessions[app_name][user_id]:
-      return event
-
-    if event.actions and event.actions.state_delta:
-      for key in event.actions.state_delta:
-        if key.startswith(State.APP_PREFIX):
-          self.app_state.setdefault(app_name, {})[
-              key.removeprefix(State.APP_PREFIX)
-          ] = event.actions.state_delta[key]
-
-        if key.startswith(State.USER_PREFIX):
-          self.user_state.setdefault(app_name, {}).setdefault(user_id, {})[
-              key.removeprefix(State.USER_PREFIX)
-          ] = event.actions.state_delta[key]
-
-    storage_session = self.sessions[app_name][user_id].get(session_id)
-    await super().append_event(session=storage_session, event=event)
-
-    storage_session.last_update_time = event.timestamp
+    key = (session.app_name, session.user_id, session.id)
+    shard = self._shard(session.app_name, session.user_id)
+    with shard.lock:
+      # Update the in-memory session.
+      if not event.partial:
+        self._apply_event(session, event)
+      session.last_update_time = event.timestamp
+
+      storage_session = shard.get(*key)
+      if storage_session is None:
+        # Only the in-memory session is updated.
+        return event
+      if event.actions and event.actions.state_delta:
+        self._update_shared_state(
+            session.app_name, session.user_id, event.actions.state_delta
+        )
+
+      # Update the storage session
+      if not event.partial:
+        self._apply_event(storage_session, event)
+        shard.num_events += 1
+        storage_session.version += 1
+      storage_session.last_update_time = event.timestamp
+      session.version = storage_session.version
+    self._notify_evicted(self._touch(*key))
 
     return event
+
+  def _update_shared_state(
+      self, app_name: str, user_id: str, state_delta: dict[str, Any]
+  ) -> None:
+    """Applies the app and user keys of the state delta."""
+    app_state_delta, user_state_delta, _ = _session_util.extract_state_delta(
+        state_delta
+    )
+    if not app_state_delta and not user_state_delta:
+      return
+    with self._state_lock:
+      # The states are replaced, as they are read without a lock.
+      if app_state_delta:
+        self.app_state[app_name] = {
+            **self.app_state.get(app_name, {}),
+            **app_state_delta,
+        }
+      if user_state_delta:
+        user_states = self.user_state.setdefault(app_name, {})
+        user_states[user_id] = {
+            **user_states.get(user_id, {}),
+            **user_state_delta,
+        }
+
+
+def _snapshot(session: Session, events: list[Event]) -> Session:
+  """Returns a copy of the stored session with the given copied events.
+
+  The state is deep copied, as callers may modify it in place.
+  """
+  return session.model_copy(
+      update={'events': events, 'state': copy.deepcopy(session.state)}
+  )
@@ -33,6 +33,7 @@ class Session(BaseModel):
     events: The events of the session, e.g. user input, model response, function
       call/response, etc.
     last_update_time: The last update time of the session.
+    version: The version of the session in the storage.
   """
 
   model_config = ConfigDict(
@@ -56,3 +57,9 @@ class Session(BaseModel):
   call/response, etc."""
   last_update_time: float = 0.0
   """The last update time of the session."""
+  version: int = 0
+  """The version of the session in the storage, incremented by every append.
+
+  Only maintained by `DatabaseSessionService`, which uses it to detect
+  concurrent appends, and by `InMemorySessionService`.
+  """
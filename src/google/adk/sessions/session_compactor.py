@@ -0,0 +1,217 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+from typing import TYPE_CHECKING
+from typing import Union
+
+from google.genai import types
+
+from ..events.event import Event
+from .base_session_service import BaseSessionService
+from .base_session_service import EventSummarizer
+from .session import Session
+
+if TYPE_CHECKING:
+  from ..models.base_llm import BaseLlm
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+_SessionKey = tuple[str, str, str]
+
+_DEFAULT_SUMMARY_INSTRUCTION = (
+    'Summarize the following conversation between a user and AI agents. Keep'
+    ' every fact, decision and open question that later turns may rely on.'
+)
+
+
+class SessionCompactor:
+  """Compacts sessions in the background once they grow too large.
+
+  A session is compacted once it has more than `max_events` events, or once its
+  events take more than `max_bytes` bytes encoded as JSON. Compaction keeps the
+  `keep_recent_events` most recent events and archives the others through
+  `BaseSessionService.compact_session`. Sessions of services that do not
+  support archiving events are never compacted.
+  """
+
+  def __init__(
+      self,
+      session_service: BaseSessionService,
+      *,
+      max_events: Optional[int] = None,
+      max_bytes: Optional[int] = None,
+      keep_recent_events: int = 20,
+      summarizer: Optional[EventSummarizer] = None,
+  ):
+    """Initializes the session compactor.
+
+    Args:
+      session_service: The session service storing the sessions.
+      max_events: The number of events above which a session is compacted.
+      max_bytes: The size of the events above which a session is compacted.
+      keep_recent_events: The number of most recent events kept by compaction.
+      summarizer: Produces the event summarizing the archived events, e.g.
+        `LlmEventSummarizer`. Only the state is kept if not set.
+    """
+    self.session_service = session_service
+    self.max_events = max_events
+    self.max_bytes = max_bytes
+    self.keep_recent_events = keep_recent_events
+    self.summarizer = summarizer
+    self._tasks: dict[_SessionKey, asyncio.Task] = {}
+
+  def should_compact(self, session: Session) -> bool:
+    """Whether the session exceeds one of the thresholds."""
+    if len(session.events) <= self.keep_recent_events:
+      return False
+    if self.max_events is not None and len(session.events) > self.max_events:
+      return True
+    if self.max_bytes is not None:
+      num_bytes = 0
+      for event in session.events:
+        num_bytes += len(event.model_dump_json(exclude_none=True))
+        if num_bytes > self.max_bytes:
+          return True
+    return False
+
+  def maybe_compact(self, session: Session) -> Optional[asyncio.Task]:
+    """Starts compacting the session in the background if it is too large.
+
+    Returns:
+      The task compacting the session, if any.
+    """
+    if not self.session_service.supports_archiving:
+      return None
+    key = (session.app_name, session.user_id, session.id)
+    if key in self._tasks or not self.should_compact(session):
+      return self._tasks.get(key)
+    task = asyncio.create_task(self._compact(key))
+    self._tasks[key] = task
+    task.add_done_callback(lambda _: self._tasks.pop(key, None))
+    return task
+
+  async def wait(self) -> None:
+    """Waits for the compactions started on the current event loop to finish.
+
+    Call it before the event loop is closed, e.g. at the end of `asyncio.run`,
+    which cancels the tasks still pending.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+      tasks = [task for task in self._tasks.values() if task.get_loop() is loop]
+      if not tasks:
+        return
+      await asyncio.gather(*tasks, return_exceptions=True)
+
+  async def _compact(self, key: _SessionKey) -> None:
+    app_name, user_id, session_id = key
+    try:
+      # Compacts a fresh copy, as the caller keeps using its session.
+      session = await self.session_service.get_session(
+          app_name=app_name, user_id=user_id, session_id=session_id
+      )
+      if session and self.should_compact(session):
+        await self.session_service.compact_session(
+            session,
+            keep_recent_events=self.keep_recent_events,
+            summarizer=self.summarizer,
+        )
+    except Exception:
+      logger.exception('Failed to compact session %s.', session_id)
+
+
+class LlmEventSummarizer:
+  """Summarizes events with an LLM, for use as a compaction summarizer."""
+
+  def __init__(
+      self,
+      model: Union[str, BaseLlm],
+      *,
+      instruction: str = _DEFAULT_SUMMARY_INSTRUCTION,
+  ):
+    """Initializes the summarizer.
+
+    Args:
+      model: The model, or the name of the model, writing the summaries.
+      instruction: The instruction given to the model before the events.
+    """
+    if isinstance(model, str):
+      from ..models.registry import LLMRegistry
+
+      model = LLMRegistry.new_llm(model)
+    self.llm = model
+    self.instruction = instruction
+
+  async def __call__(self, events: list[Event]) -> Optional[Event]:
+    from ..models.llm_request import LlmRequest
+
+    lines = []
+    for event in events:
+      if not event.content or not event.content.parts:
+        continue
+      for part in event.content.parts:
+        if part.text:
+          lines.append(f'[{event.author}]: {part.text}')
+        elif part.function_call:
+          lines.append(
+              f'[{event.author}]: called tool `{part.function_call.name}` with'
+              f' {part.function_call.args}'
+          )
+        elif part.function_response:
+          lines.append(
+              f'[{event.author}]: tool `{part.function_response.name}`'
+              f' returned {part.function_response.response}'
+          )
+    if not lines:
+      return None
+
+    llm_request = LlmRequest(
+        model=self.llm.model,
+        contents=[
+            types.Content(
+                role='user',
+                parts=[
+                    types.Part(
+                        text=self.instruction + '\n\n' + '\n'.join(lines)
+                    )
+                ],
+            )
+        ],
+    )
+    summary = ''
+    async for llm_response in self.llm.generate_content_async(llm_request):
+      if llm_response.content and llm_response.content.parts:
+        summary += ''.join(
+            part.text for part in llm_response.content.parts if part.text
+        )
+    if not summary:
+      return None
+
+    return Event(
+        invocation_id=events[-1].invocation_id,
+        author='user',
+        content=types.Content(
+            role='user',
+            parts=[
+                types.Part(
+                    text=f'Summary of the earlier conversation:\n{summary}'
+                )
+            ],
+        ),
+    )
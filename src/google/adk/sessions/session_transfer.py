@@ -0,0 +1,231 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streams sessions between session services as NDJSON.
+
+The export is a sequence of JSON records, one per line. Each session is written
+as a `session` record, holding its state, followed by one `event` record per
+event:
+
+  {"type": "session", "app_name": ..., "user_id": ..., "id": ..., "state": ...}
+  {"type": "event", "event": {...}}
+"""
+
+import json
+import time
+from typing import Iterable
+from typing import Optional
+from typing import TextIO
+
+from pydantic import BaseModel
+
+from ..events.event import Event
+from .base_session_service import BaseSessionService
+from .base_session_service import ListSessionsConfig
+from .session import Session
+from .state import State
+
+_SESSION_RECORD = 'session'
+_EVENT_RECORD = 'event'
+
+
+class TransferStats(BaseModel):
+  """The statistics of an export or an import."""
+
+  num_sessions: int = 0
+  num_events: int = 0
+  elapsed_seconds: float = 0.0
+
+  @property
+  def events_per_second(self) -> float:
+    if not self.elapsed_seconds:
+      return 0.0
+    return self.num_events / self.elapsed_seconds
+
+
+async def export_sessions(
+    session_service: BaseSessionService,
+    output: TextIO,
+    *,
+    app_name: str,
+    user_ids: Iterable[str],
+    page_size: int = 100,
+) -> TransferStats:
+  """Writes the sessions of the users to the output as NDJSON.
+
+  Sessions are listed page by page, and the events of each session are streamed
+  through `iter_events`, so only a batch of events is held in memory.
+
+  The users are not listed, as session services only list the sessions of a
+  given user.
+
+  Args:
+    session_service: The session service to export the sessions from.
+    output: The text stream to write the records to.
+    app_name: The name of the app of the sessions.
+    user_ids: The users whose sessions are exported.
+    page_size: The number of sessions listed at once.
+
+  Returns:
+    The statistics of the export.
+  """
+  stats = TransferStats()
+  start_time = time.perf_counter()
+  for user_id in user_ids:
+    page_token = None
+    while True:
+      response = await session_service.list_sessions(
+          app_name=app_name,
+          user_id=user_id,
+          config=ListSessionsConfig(page_size=page_size, page_token=page_token),
+      )
+      for listed_session in response.sessions:
+        # Only reads the state, the events are streamed below.
+        session = await session_service.get_session_without_events(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=listed_session.id,
+        )
+        if session is None:
+          # Deleted since it was listed.
+          continue
+        _write_session_record(output, session)
+        async for event in session_service.iter_events(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session.id,
+            batch_size=page_size,
+        ):
+          _write_event_record(output, event)
+          stats.num_events += 1
+        stats.num_sessions += 1
+      page_token = response.next_page_token
+      if not page_token:
+        break
+  stats.elapsed_seconds = time.perf_counter() - start_time
+  return stats
+
+
+async def import_sessions(
+    session_service: BaseSessionService,
+    records: Iterable[str],
+    *,
+    batch_size: int = 100,
+    keep_session_ids: bool = True,
+    app_name: Optional[str] = None,
+) -> TransferStats:
+  """Creates the sessions read from NDJSON records in the session service.
+
+  The events are appended in batches through `append_events`, which
+  `DatabaseSessionService` persists in a single transaction per batch. Only a
+  batch of events is held in memory.
+
+  The state deltas of the events are replayed, except for the app and user
+  state: they are shared with other sessions, so they are restored from the
+  state of the session records instead.
+
+  Args:
+    session_service: The session service to import the sessions to.
+    records: The NDJSON lines, e.g. an open file.
+    batch_size: The maximum number of events appended at once.
+    keep_session_ids: Whether the sessions keep their IDs. Set it to False for
+      session services that generate the IDs, e.g. `VertexAiSessionService`.
+    app_name: The app name to import the sessions under, instead of the one of
+      the session records, e.g. the Agent Engine ID for
+      `VertexAiSessionService`.
+
+  Returns:
+    The statistics of the import.
+  """
+  stats = TransferStats()
+  start_time = time.perf_counter()
+  session: Optional[Session] = None
+  events: list[Event] = []
+
+  async def append_batch():
+    if not events:
+      return
+    await session_service.append_events(session, events)
+    stats.num_events += len(events)
+    events.clear()
+    # Keeps the memory bounded, the events are persisted already.
+    session.events.clear()
+
+  for line_number, line in enumerate(records, start=1):
+    if not line.strip():
+      continue
+    record = json.loads(line)
+    record_type = record.get('type')
+    if record_type == _SESSION_RECORD:
+      await append_batch()
+      session = await session_service.create_session(
+          app_name=app_name or record['app_name'],
+          user_id=record['user_id'],
+          state=record.get('state') or None,
+          session_id=record['id'] if keep_session_ids else None,
+      )
+      stats.num_sessions += 1
+    elif record_type == _EVENT_RECORD:
+      if session is None:
+        raise ValueError(
+            f'Event record on line {line_number} precedes any session record.'
+        )
+      events.append(
+          _without_shared_state(Event.model_validate(record['event']))
+      )
+      if len(events) >= batch_size:
+        await append_batch()
+    else:
+      raise ValueError(
+          f'Unknown record type {record_type!r} on line {line_number}.'
+      )
+  await append_batch()
+  stats.elapsed_seconds = time.perf_counter() - start_time
+  return stats
+
+
+def _write_session_record(output: TextIO, session: Session):
+  output.write(
+      json.dumps({
+          'type': _SESSION_RECORD,
+          'app_name': session.app_name,
+          'user_id': session.user_id,
+          'id': session.id,
+          'state': session.state,
+      })
+      + '\n'
+  )
+
+
+def _write_event_record(output: TextIO, event: Event):
+  output.write(
+      f'{{"type": "{_EVENT_RECORD}", "event": '
+      + event.model_dump_json(exclude_none=True)
+      + '}\n'
+  )
+
+
+def _without_shared_state(event: Event) -> Event:
+  """Drops the app and user state from the state delta of the event."""
+  state_delta = event.actions.state_delta
+  if any(
+      key.startswith((State.APP_PREFIX, State.USER_PREFIX))
+      for key in state_delta
+  ):
+    event.actions.state_delta = {
+        key: value
+        for key, value in state_delta.items()
+        if not key.startswith((State.APP_PREFIX, State.USER_PREFIX))
+    }
+  return event
@@ -13,10 +13,20 @@
 # limitations under the License.
 
 from typing import Any
+from typing import Iterator
 
 
 class State:
-  """A state dict that maintain the current value and the pending-commit delta."""
+  """A state dict that maintain the current value and the pending-commit delta.
+
+  Changes are only recorded in the delta, which is read through on top of the
+  value without copying either dict. The value is only updated at the storage
+  commit time, i.e. when the session service appends the event carrying the
+  delta to the session.
+
+  `temp:` keys are never persisted, so they are written to the value directly
+  and kept out of the delta.
+  """
 
   APP_PREFIX = "app:"
   USER_PREFIX = "user:"
@@ -39,14 +49,27 @@ class State:
 
   def __setitem__(self, key: str, value: Any):
     """Sets the value of the state dict for the given key."""
-    # TODO: make new change only store in delta, so that self._value is only
-    #   updated at the storage commit time.
-    self._value[key] = value
-    self._delta[key] = value
+    if key.startswith(State.TEMP_PREFIX):
+      self._value[key] = value
+      self._delta.pop(key, None)
+    else:
+      self._delta[key] = value
 
   def __contains__(self, key: str) -> bool:
     """Whether the state dict contains the given key."""
-    return key in self._value or key in self._delta
+    return key in self._delta or key in self._value
+
+  def __iter__(self) -> Iterator[str]:
+    """Iterates over the keys of the state dict, without copying it."""
+    yield from self._delta
+    for key in self._value:
+      if key not in self._delta:
+        yield key
+
+  def __len__(self) -> int:
+    return len(self._value) + sum(
+        1 for key in self._delta if key not in self._value
+    )
 
   def has_delta(self) -> bool:
     """Whether the state has pending delta."""
@@ -54,18 +77,24 @@ class State:
 
   def get(self, key: str, default: Any = None) -> Any:
     """Returns the value of the state dict for the given key."""
-    if key not in self:
-      return default
-    return self[key]
+    if key in self._delta:
+      return self._delta[key]
+    return self._value.get(key, default)
+
+  def keys(self) -> Iterator[str]:
+    """Iterates over the keys of the state dict."""
+    return iter(self)
+
+  def items(self) -> Iterator[tuple[str, Any]]:
+    """Iterates over the items of the state dict."""
+    for key in self:
+      yield key, self[key]
 
   def update(self, delta: dict[str, Any]):
     """Updates the state dict with the given delta."""
-    self._value.update(delta)
-    self._delta.update(delta)
+    for key, value in delta.items():
+      self[key] = value
 
   def to_dict(self) -> dict[str, Any]:
-    """Returns the state dict."""
-    result = {}
-    result.update(self._value)
-    result.update(self._delta)
-    return result
+    """Returns a copy of the state dict."""
+    return {**self._value, **self._delta}
@@ -11,11 +11,15 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import asyncio
+from datetime import datetime
+from datetime import timezone
 import logging
 import re
-import time
 from typing import Any
+from typing import AsyncIterator
 from typing import Optional
+import urllib.parse
 
 from dateutil import parser
 from google import genai
@@ -26,12 +30,18 @@ from ..events.event_actions import EventActions
 from . import _session_util
 from .base_session_service import BaseSessionService
 from .base_session_service import GetSessionConfig
+from .base_session_service import ListSessionsConfig
 from .base_session_service import ListSessionsResponse
 from .session import Session
 
 isoparse = parser.isoparse
 logger = logging.getLogger('google_adk.' + __name__)
 
+_EVENTS_PAGE_SIZE = 100
+_LRO_INITIAL_DELAY = 0.1
+_LRO_MAX_DELAY = 5.0
+_LRO_MAX_ATTEMPTS = 10
+
 
 class VertexAiSessionService(BaseSessionService):
   """Connects to the managed Vertex AI Session Service."""
@@ -77,20 +87,7 @@ class VertexAiSessionService(BaseSessionService):
 
     session_id = api_response['name'].split('/')[-3]
     operation_id = api_response['name'].split('/')[-1]
-
-    max_retry_attempt = 5
-    while max_retry_attempt >= 0:
-      lro_response = await self.api_client.async_request(
-          http_method='GET',
-          path=f'operations/{operation_id}',
-          request_dict={},
-      )
-
-      if lro_response.get('done', None):
-        break
-
-      time.sleep(1)
-      max_retry_attempt -= 1
+    await self._wait_for_operation(operation_id)
 
     # Get session resource
     get_session_api_response = await self.api_client.async_request(
@@ -122,41 +119,25 @@ class VertexAiSessionService(BaseSessionService):
   ) -> Session:
     reasoning_engine_id = _parse_reasoning_engine_id(app_name)
 
-    # Get session resource
-    get_session_api_response = await self.api_client.async_request(
-        http_method='GET',
-        path=f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}',
-        request_dict={},
-    )
-
-    session_id = get_session_api_response['name'].split('/')[-1]
-    update_timestamp = isoparse(
-        get_session_api_response['updateTime']
-    ).timestamp()
-    session = Session(
-        app_name=str(app_name),
-        user_id=str(user_id),
-        id=str(session_id),
-        state=get_session_api_response.get('sessionState', {}),
-        last_update_time=update_timestamp,
-    )
-
-    list_events_api_response = await self.api_client.async_request(
-        http_method='GET',
-        path=f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}/events',
-        request_dict={},
+    # The session and its events are fetched concurrently.
+    get_session_api_response, events = await asyncio.gather(
+        self.api_client.async_request(
+            http_method='GET',
+            path=(
+                f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}'
+            ),
+            request_dict={},
+        ),
+        self._list_events(
+            reasoning_engine_id,
+            session_id,
+            after_timestamp=config.after_timestamp if config else None,
+        ),
     )
 
-    # Handles empty response case
-    if list_events_api_response.get('httpHeaders', None):
-      return session
-
-    session.events = [
-        _from_api_event(event)
-        for event in list_events_api_response['sessionEvents']
-    ]
+    session = _from_api_session(app_name, user_id, get_session_api_response)
     session.events = [
-        event for event in session.events if event.timestamp <= update_timestamp
+        event for event in events if event.timestamp <= session.last_update_time
     ]
     session.events.sort(key=lambda event: event.timestamp)
 
@@ -164,43 +145,106 @@ class VertexAiSessionService(BaseSessionService):
       if config.num_recent_events:
         session.events = session.events[-config.num_recent_events :]
       elif config.after_timestamp:
-        i = len(session.events) - 1
-        while i >= 0:
-          if session.events[i].timestamp < config.after_timestamp:
-            break
-          i -= 1
-        if i >= 0:
-          session.events = session.events[i:]
+        session.events = [
+            event
+            for event in session.events
+            if event.timestamp >= config.after_timestamp
+        ]
 
     return session
 
   @override
-  async def list_sessions(
-      self, *, app_name: str, user_id: str
-  ) -> ListSessionsResponse:
+  async def get_session_without_events(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Session:
     reasoning_engine_id = _parse_reasoning_engine_id(app_name)
-
-    api_response = self.api_client.request(
+    get_session_api_response = await self.api_client.async_request(
         http_method='GET',
-        path=f'reasoningEngines/{reasoning_engine_id}/sessions?filter=user_id={user_id}',
+        path=f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}',
         request_dict={},
     )
+    return _from_api_session(app_name, user_id, get_session_api_response)
 
-    # Handles empty response case
-    if api_response.get('httpHeaders', None):
-      return ListSessionsResponse()
+  @override
+  async def list_sessions(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    reasoning_engine_id = _parse_reasoning_engine_id(app_name)
+
+    if config:
+      # The service filters, orders and pages the sessions, and its page tokens
+      # are passed through as is.
+      session_filter = f'user_id="{user_id}"'
+      if config.updated_after is not None:
+        updated_after = datetime.fromtimestamp(
+            config.updated_after, tz=timezone.utc
+        )
+        session_filter += f' AND update_time>"{updated_after.isoformat()}"'
+      params = {'filter': session_filter, 'orderBy': 'update_time desc'}
+      if config.page_size:
+        params['pageSize'] = config.page_size
+      if config.page_token:
+        params['pageToken'] = config.page_token
+    else:
+      params = {'filter': f'user_id={user_id}'}
 
     sessions = []
-    for api_session in api_response['sessions']:
-      session = Session(
-          app_name=app_name,
-          user_id=user_id,
-          id=api_session['name'].split('/')[-1],
-          state={},
-          last_update_time=isoparse(api_session['updateTime']).timestamp(),
+    while True:
+      api_response = await self.api_client.async_request(
+          http_method='GET',
+          path=(
+              f'reasoningEngines/{reasoning_engine_id}/sessions?'
+              + urllib.parse.urlencode(params)
+          ),
+          request_dict={},
       )
-      sessions.append(session)
-    return ListSessionsResponse(sessions=sessions)
+
+      # Handles empty response case
+      if api_response.get('httpHeaders', None):
+        return ListSessionsResponse(sessions=sessions)
+
+      for api_session in api_response.get('sessions', []):
+        session = Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=api_session['name'].split('/')[-1],
+            state={},
+            last_update_time=isoparse(api_session['updateTime']).timestamp(),
+        )
+        sessions.append(session)
+
+      next_page_token = api_response.get('nextPageToken') or None
+      if config or not next_page_token:
+        # Only a single page is returned when paginating explicitly.
+        return ListSessionsResponse(
+            sessions=sessions,
+            next_page_token=next_page_token if config else None,
+        )
+      params['pageToken'] = next_page_token
+
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      after: Optional[float] = None,
+      batch_size: int = 100,
+  ) -> AsyncIterator[Event]:
+    reasoning_engine_id = _parse_reasoning_engine_id(app_name)
+    async for page in self._iter_event_pages(
+        reasoning_engine_id,
+        session_id,
+        after_timestamp=after,
+        page_size=batch_size,
+    ):
+      for event in page:
+        yield event
 
   async def delete_session(
       self, *, app_name: str, user_id: str, session_id: str
@@ -226,6 +270,91 @@ class VertexAiSessionService(BaseSessionService):
 
     return event
 
+  async def _wait_for_operation(self, operation_id: str) -> None:
+    """Polls the long-running operation with exponential backoff."""
+    delay = _LRO_INITIAL_DELAY
+    for _ in range(_LRO_MAX_ATTEMPTS):
+      lro_response = await self.api_client.async_request(
+          http_method='GET',
+          path=f'operations/{operation_id}',
+          request_dict={},
+      )
+      if lro_response.get('done', None):
+        return
+      await asyncio.sleep(delay)
+      delay = min(delay * 2, _LRO_MAX_DELAY)
+    logger.warning('Operation %s is not done after polling.', operation_id)
+
+  async def _list_events(
+      self,
+      reasoning_engine_id: str,
+      session_id: str,
+      after_timestamp: Optional[float] = None,
+  ) -> list[Event]:
+    """Lists the events of a session."""
+    events = []
+    async for page in self._iter_event_pages(
+        reasoning_engine_id, session_id, after_timestamp
+    ):
+      events.extend(page)
+    return events
+
+  async def _iter_event_pages(
+      self,
+      reasoning_engine_id: str,
+      session_id: str,
+      after_timestamp: Optional[float] = None,
+      page_size: int = _EVENTS_PAGE_SIZE,
+  ) -> AsyncIterator[list[Event]]:
+    """Iterates over the pages of events of a session.
+
+    The next page is requested before the current one is decoded, so that the
+    requests overlap with the decoding of the events.
+    """
+    params = {'pageSize': page_size}
+    if after_timestamp:
+      after = datetime.fromtimestamp(after_timestamp, tz=timezone.utc)
+      params['filter'] = f'timestamp>="{after.isoformat()}"'
+
+    async def list_page(page_token: Optional[str] = None):
+      page_params = dict(params, pageToken=page_token) if page_token else params
+      return await self.api_client.async_request(
+          http_method='GET',
+          path=(
+              f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}'
+              '/events?'
+              + urllib.parse.urlencode(page_params)
+          ),
+          request_dict={},
+      )
+
+    api_response = await list_page()
+    next_page = None
+    try:
+      while True:
+        # Handles empty response case
+        if api_response.get('httpHeaders', None):
+          return
+
+        if api_response.get('nextPageToken'):
+          next_page = asyncio.create_task(
+              list_page(api_response['nextPageToken'])
+          )
+          # Lets the request of the next page start before decoding this one.
+          await asyncio.sleep(0)
+        yield [
+            _from_api_event(api_event)
+            for api_event in api_response.get('sessionEvents', [])
+        ]
+        if not next_page:
+          return
+        api_response = await next_page
+        next_page = None
+    finally:
+      # The caller may stop iterating before the last page.
+      if next_page:
+        next_page.cancel()
+
 
 def _convert_event_to_json(event: Event):
   metadata_json = {
@@ -277,6 +406,19 @@ def _convert_event_to_json(event: Event):
   return event_json
 
 
+def _from_api_session(
+    app_name: str, user_id: str, api_session: dict
+) -> Session:
+  """Converts a session resource to a session without events."""
+  return Session(
+      app_name=str(app_name),
+      user_id=str(user_id),
+      id=str(api_session['name'].split('/')[-1]),
+      state=api_session.get('sessionState', {}),
+      last_update_time=isoparse(api_session['updateTime']).timestamp(),
+  )
+
+
 def _from_api_event(api_event: dict) -> Event:
   event_actions = EventActions()
   if api_event.get('actions', None):
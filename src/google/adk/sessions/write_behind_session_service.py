@@ -0,0 +1,303 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import copy
+import logging
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Optional
+
+from typing_extensions import override
+
+from ..events.event import Event
+from .base_session_service import BaseSessionService
+from .base_session_service import GetSessionConfig
+from .base_session_service import ListSessionsConfig
+from .base_session_service import ListSessionsResponse
+from .session import Session
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+_SessionKey = tuple[str, str, str]
+
+
+class _PendingEvents:
+  """The events of a session that are not persisted yet."""
+
+  def __init__(self, session: Session):
+    # The session of the caller, whose last_update_time and version are
+    # refreshed after every flush.
+    self.session = session
+    # The session passed to the delegate. It carries the state and version of
+    # the persisted session, without the buffered events, which were already
+    # applied to the caller's session. The delegate checks the state against
+    # the stored one when it rebases the events on concurrent appends.
+    self.shadow = Session(
+        id=session.id,
+        app_name=session.app_name,
+        user_id=session.user_id,
+        state=copy.deepcopy(session.state),
+        last_update_time=session.last_update_time,
+        version=session.version,
+    )
+    self.events: list[Event] = []
+    self.lock = asyncio.Lock()
+    self.timer: Optional[asyncio.TimerHandle] = None
+
+  def cancel_timer(self):
+    if self.timer:
+      self.timer.cancel()
+      self.timer = None
+
+
+class WriteBehindSessionService(BaseSessionService):
+  """A session service that buffers appended events before persisting them.
+
+  Appended events are applied to the session right away, but are written to
+  the delegate session service in batches through `append_events`, which
+  `DatabaseSessionService` persists in a single transaction. The events of a
+  session are flushed when:
+
+  * `max_buffered_events` events are buffered,
+  * `max_buffer_delay` seconds passed since the first buffered event,
+  * `flush` is called, which `Runner` does at the end of every invocation,
+  * the session is read through `get_session` or `list_sessions`.
+
+  Buffering trades durability for latency: events that are buffered when the
+  process crashes are lost, and another process reading the session from the
+  delegate does not see them yet. Use `on_flush` to learn when events become
+  durable, and `on_flush_error` to handle events that failed to persist. Failed
+  events stay buffered and are retried on the next flush.
+  """
+
+  def __init__(
+      self,
+      delegate: BaseSessionService,
+      *,
+      max_buffered_events: int = 16,
+      max_buffer_delay: Optional[float] = 1.0,
+      on_flush: Optional[Callable[[Session, list[Event]], None]] = None,
+      on_flush_error: Optional[
+          Callable[[Session, list[Event], Exception], None]
+      ] = None,
+  ):
+    """Initializes the write-behind session service.
+
+    Args:
+      delegate: The session service that persists the sessions.
+      max_buffered_events: The number of buffered events of a session that
+        triggers a flush.
+      max_buffer_delay: The maximum number of seconds an event stays buffered.
+        If None, events are only flushed on the other triggers.
+      on_flush: Called with the session and the events once they are persisted.
+      on_flush_error: Called with the session, the events and the error when
+        persisting the events failed. Errors of flushes that have no caller
+        waiting on them, i.e. those triggered by `max_buffer_delay`, are logged
+        if this is not set.
+    """
+    self.delegate = delegate
+    self.max_buffered_events = max_buffered_events
+    self.max_buffer_delay = max_buffer_delay
+    self.on_flush = on_flush
+    self.on_flush_error = on_flush_error
+    self._pending: dict[_SessionKey, _PendingEvents] = {}
+    self._flush_tasks: set[asyncio.Task] = set()
+
+  @override
+  async def create_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
+  ) -> Session:
+    return await self.delegate.create_session(
+        app_name=app_name, user_id=user_id, state=state, session_id=session_id
+    )
+
+  @override
+  async def get_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    await self._flush((app_name, user_id, session_id))
+    return await self.delegate.get_session(
+        app_name=app_name, user_id=user_id, session_id=session_id, config=config
+    )
+
+  @override
+  async def get_session_without_events(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Optional[Session]:
+    await self._flush((app_name, user_id, session_id))
+    return await self.delegate.get_session_without_events(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+
+  @override
+  async def list_sessions(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    for key in list(self._pending):
+      if key[:2] == (app_name, user_id):
+        await self._flush(key)
+    return await self.delegate.list_sessions(
+        app_name=app_name, user_id=user_id, config=config
+    )
+
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      after: Optional[float] = None,
+      batch_size: int = 100,
+  ) -> AsyncIterator[Event]:
+    await self._flush((app_name, user_id, session_id))
+    async for event in self.delegate.iter_events(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        after=after,
+        batch_size=batch_size,
+    ):
+      yield event
+
+  @override
+  async def delete_session(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    pending = self._pending.pop((app_name, user_id, session_id), None)
+    if pending:
+      pending.cancel_timer()
+    await self.delegate.delete_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+
+  @override
+  async def append_event(self, session: Session, event: Event) -> Event:
+    await self.append_events(session=session, events=[event])
+    return event
+
+  @override
+  async def append_events(
+      self, session: Session, events: list[Event]
+  ) -> list[Event]:
+    events_to_store = [event for event in events if not event.partial]
+    if not events_to_store:
+      return events
+
+    key = (session.app_name, session.user_id, session.id)
+    pending = self._pending.get(key)
+    if not pending:
+      # Created before the events are applied, to capture the persisted state.
+      pending = self._pending[key] = _PendingEvents(session)
+    pending.session = session
+
+    for event in events_to_store:
+      await super().append_event(session=session, event=event)
+    pending.events.extend(events_to_store)
+
+    if len(pending.events) >= self.max_buffered_events:
+      await self._flush(key)
+    elif self.max_buffer_delay is not None and not pending.timer:
+      pending.timer = asyncio.get_running_loop().call_later(
+          self.max_buffer_delay, self._flush_later, key
+      )
+    return events
+
+  @override
+  async def flush(self, session: Session) -> None:
+    await self._flush((session.app_name, session.user_id, session.id))
+
+  @property
+  @override
+  def supports_archiving(self) -> bool:
+    return self.delegate.supports_archiving
+
+  @override
+  async def archive_events(
+      self,
+      session: Session,
+      events: list[Event],
+      *,
+      checkpoint_event: Optional[Event] = None,
+  ) -> None:
+    # The archived events must be persisted before they can be moved.
+    await self.flush(session)
+    await self.delegate.archive_events(
+        session, events, checkpoint_event=checkpoint_event
+    )
+
+  async def flush_all(self) -> None:
+    """Persists the buffered events of all the sessions."""
+    for key in list(self._pending):
+      await self._flush(key)
+
+  def _flush_later(self, key: _SessionKey):
+    task = asyncio.create_task(self._flush(key, has_caller=False))
+    self._flush_tasks.add(task)
+    task.add_done_callback(self._flush_tasks.discard)
+
+  async def _flush(self, key: _SessionKey, has_caller: bool = True):
+    pending = self._pending.get(key)
+    if not pending:
+      return
+
+    async with pending.lock:
+      pending.cancel_timer()
+      if not pending.events:
+        return
+      # Events appended while the delegate is writing go to a new batch.
+      events = pending.events
+      pending.events = []
+      try:
+        await self.delegate.append_events(pending.shadow, events)
+      except Exception as e:
+        pending.events[:0] = events
+        if self.on_flush_error:
+          self.on_flush_error(pending.session, events, e)
+        if has_caller:
+          raise
+        if not self.on_flush_error:
+          logger.exception(
+              'Failed to persist %d events of session %s.',
+              len(events),
+              pending.session.id,
+          )
+        return
+      finally:
+        # The delegate applies the events to the shadow session too, which
+        # keeps its state in step with the persisted one.
+        pending.shadow.events.clear()
+
+      pending.session.last_update_time = pending.shadow.last_update_time
+      pending.session.version = pending.shadow.version
+      if self.on_flush:
+        self.on_flush(pending.session, events)
+      if not pending.events and self._pending.get(key) is pending:
+        del self._pending[key]
@@ -41,10 +41,23 @@ class BaseTool(ABC):
   """Whether the tool is a long running operation, which typically returns a
   resource id first and finishes the operation later."""
 
-  def __init__(self, *, name, description, is_long_running: bool = False):
+  run_serially: bool = False
+  """Whether the tool must not run concurrently with the other function calls
+  of the same model response, e.g. because it is not safe to call in parallel.
+  """
+
+  def __init__(
+      self,
+      *,
+      name,
+      description,
+      is_long_running: bool = False,
+      run_serially: bool = False,
+  ):
     self.name = name
     self.description = description
     self.is_long_running = is_long_running
+    self.run_serially = run_serially
 
   def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
     """Gets the OpenAPI specification of this tool in the form of a FunctionDeclaration.
@@ -14,6 +14,9 @@
 
 from __future__ import annotations
 
+from typing import Literal
+from typing import Optional
+
 from google.genai import types
 from typing_extensions import override
 
@@ -40,13 +43,23 @@ class CrewaiTool(FunctionTool):
 
   If the original tool name and description are not suitable, you can override
   them in the constructor.
+
+  Like any `FunctionTool`, the tool runs in the shared tool thread pool, unless
+  `executor` is None or 'process'.
   """
 
   tool: CrewaiBaseTool
   """The wrapped CrewAI tool."""
 
-  def __init__(self, tool: CrewaiBaseTool, *, name: str, description: str):
-    super().__init__(tool.run)
+  def __init__(
+      self,
+      tool: CrewaiBaseTool,
+      *,
+      name: str,
+      description: str,
+      executor: Optional[Literal["thread", "process"]] = "thread",
+  ):
+    super().__init__(tool.run, executor=executor)
     self.tool = tool
     if name:
       self.name = name
@@ -13,8 +13,10 @@
 # limitations under the License.
 
 import inspect
+import pickle
 from typing import Any
 from typing import Callable
+from typing import Literal
 from typing import Optional
 
 from google.genai import types
@@ -23,18 +25,45 @@ from typing_extensions import override
 from ._automatic_function_calling_util import build_function_declaration
 from .base_tool import BaseTool
 from .tool_context import ToolContext
+from .tool_process_pool import run_in_tool_process_pool
+from .tool_thread_pool import get_tool_thread_pool
 
 
 class FunctionTool(BaseTool):
   """A tool that wraps a user-defined Python function.
 
+  Synchronous functions run in the shared tool thread pool, so that a blocking
+  function does not block the event loop. Cheap functions can run on the event
+  loop instead, with `executor=None`, and CPU-bound functions in the shared
+  tool process pool, with `executor='process'`.
+
   Attributes:
     func: The function to wrap.
+    executor: Where a synchronous function runs: 'thread' for the shared tool
+      thread pool, or None for the event loop. With 'process', the function
+      runs in the shared tool process pool, whether it is synchronous or not.
   """
 
-  def __init__(self, func: Callable[..., Any]):
-    super().__init__(name=func.__name__, description=func.__doc__)
+  def __init__(
+      self,
+      func: Callable[..., Any],
+      *,
+      run_serially: bool = False,
+      executor: Optional[Literal['thread', 'process']] = 'thread',
+  ):
+    super().__init__(
+        name=func.__name__, description=func.__doc__, run_serially=run_serially
+    )
+    if executor == 'process':
+      try:
+        pickle.dumps(func)
+      except Exception as e:
+        raise ValueError(
+            f'Function {func.__name__} cannot run in a process pool, as it'
+            ' cannot be pickled. Define it at the top level of a module.'
+        ) from e
     self.func = func
+    self.executor = executor
 
   @override
   def _get_declaration(self) -> Optional[types.FunctionDeclaration]:
@@ -76,8 +105,12 @@ class FunctionTool(BaseTool):
 You could retry calling this tool, but it is IMPORTANT for you to provide all the mandatory parameters."""
       return {'error': error_str}
 
-    if inspect.iscoroutinefunction(self.func):
+    if self.executor == 'process':
+      return await run_in_tool_process_pool(self.func, args_to_call) or {}
+    elif inspect.iscoroutinefunction(self.func):
       return await self.func(**args_to_call) or {}
+    elif self.executor == 'thread':
+      return await get_tool_thread_pool().run(self.func, **args_to_call) or {}
     else:
       return self.func(**args_to_call) or {}
 
@@ -14,6 +14,8 @@
 
 from typing import Any
 from typing import Callable
+from typing import Literal
+from typing import Optional
 
 from google.genai import types
 from pydantic import model_validator
@@ -28,13 +30,21 @@ class LangchainTool(FunctionTool):
 
   If the original tool name and description are not suitable, you can override
   them in the constructor.
+
+  Like any `FunctionTool`, the tool runs in the shared tool thread pool, unless
+  `executor` is None or 'process'.
   """
 
   tool: Any
   """The wrapped langchain tool."""
 
-  def __init__(self, tool: Any):
-    super().__init__(tool._run)
+  def __init__(
+      self,
+      tool: Any,
+      *,
+      executor: Optional[Literal['thread', 'process']] = 'thread',
+  ):
+    super().__init__(tool._run, executor=executor)
     self.tool = tool
     if tool.name:
       self.name = tool.name
@@ -0,0 +1,298 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The process pool running the CPU-bound functions of the tools.
+
+Threads serialize on the GIL, so `FunctionTool(func, executor='process')` runs
+`func` in a shared `ToolProcessPool` instead. The function and its arguments
+must be picklable, e.g. a module-level function.
+
+The `ToolContext` can't be sent to a worker process. The function receives a
+copy of it, whose state changes, actions and saved artifacts are applied to
+the `ToolContext` once the function returns. Loading or listing artifacts and
+searching memory are not available in a worker process.
+
+The workers are started on first use and kept for the next calls. They can be
+started ahead of the first call, and the pool resized, with:
+
+  pool = ToolProcessPool(max_workers=8)
+  pool.warm_up()
+  set_tool_process_pool(pool)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import inspect
+import multiprocessing
+import os
+import threading
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from google.genai import types
+from typing_extensions import override
+
+from ..events.event_actions import EventActions
+from .tool_context import ToolContext
+
+if TYPE_CHECKING:
+  from ..memory.base_memory_service import SearchMemoryResponse
+
+
+class ToolProcessPool:
+  """A `ProcessPoolExecutor` running the CPU-bound functions of the tools.
+
+  The workers are spawned rather than forked, as forking a process running
+  threads, e.g. the tool thread pool, can deadlock the child.
+
+  If a worker dies, e.g. killed for running out of memory, the executor is
+  broken: the calls running on it fail, and it is replaced for the next calls.
+  """
+
+  def __init__(self, max_workers: Optional[int] = None):
+    """
+    Args:
+      max_workers: The number of worker processes. The number of CPUs if not
+        set.
+    """
+    if max_workers is None:
+      max_workers = os.cpu_count() or 1
+    if max_workers <= 0:
+      raise ValueError('max_workers must be greater than 0.')
+    self.max_workers = max_workers
+    self._lock = threading.Lock()
+    self._executor = self._create_executor()
+
+  def _create_executor(self) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(
+        max_workers=self.max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+    )
+
+  async def run(self, func: Callable[..., Any], /, **kwargs: Any) -> Any:
+    """Runs `func(**kwargs)` in a worker process and returns its result.
+
+    Raises:
+      BrokenProcessPool: If a worker died while the call was running. The
+        next calls run on a new executor.
+    """
+    executor = self._executor
+    try:
+      return await asyncio.wrap_future(executor.submit(func, **kwargs))
+    except BrokenProcessPool:
+      self._replace_executor(executor)
+      raise
+
+  def _replace_executor(self, broken_executor: ProcessPoolExecutor):
+    with self._lock:
+      # The concurrent calls failing on the same executor replace it once.
+      if self._executor is not broken_executor:
+        return
+      self._executor = self._create_executor()
+    broken_executor.shutdown(wait=False)
+
+  def warm_up(self):
+    """Starts the worker processes and waits until they are ready."""
+    futures = [
+        self._executor.submit(os.getpid) for _ in range(self.max_workers)
+    ]
+    for future in futures:
+      future.result()
+
+  def shutdown(self, wait: bool = True):
+    """Stops the worker processes once the submitted calls are done."""
+    self._executor.shutdown(wait=wait)
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[ToolProcessPool] = None
+
+
+def get_tool_process_pool() -> ToolProcessPool:
+  """Returns the shared pool, creating a default one on first use."""
+  global _pool
+  with _pool_lock:
+    if _pool is None:
+      _pool = ToolProcessPool()
+    return _pool
+
+
+def set_tool_process_pool(pool: ToolProcessPool):
+  """Replaces the shared pool used by the tools.
+
+  The previous pool is not shut down, as calls may still be running on it.
+  """
+  global _pool
+  with _pool_lock:
+    _pool = pool
+
+
+class _ProcessToolContext(ToolContext):
+  """The picklable copy of a `ToolContext` sent to a worker process."""
+
+  def __init__(self, tool_context: ToolContext):
+    from ..sessions.state import State
+
+    # The invocation context holds the services and the whole session, so it
+    # is not sent. Only the values read by the tools are copied.
+    self._invocation_context = None
+    self._event_actions = tool_context.actions.model_copy(deep=True)
+    self._state = State(
+        value=dict(tool_context._invocation_context.session.state),
+        delta=self._event_actions.state_delta,
+    )
+    self.function_call_id = tool_context.function_call_id
+    self._invocation_id = tool_context.invocation_id
+    self._agent_name = tool_context.agent_name
+    self._user_content = tool_context.user_content
+    self._saved_artifacts: list[tuple[str, types.Part]] = []
+
+  @property
+  @override
+  def invocation_id(self) -> str:
+    return self._invocation_id
+
+  @property
+  @override
+  def agent_name(self) -> str:
+    return self._agent_name
+
+  @property
+  @override
+  def user_content(self) -> Optional[types.Content]:
+    return self._user_content
+
+  @override
+  async def save_artifact(
+      self, filename: str, artifact: types.Part
+  ) -> Optional[int]:
+    """Records an artifact to save once the tool returns.
+
+    Returns:
+      None, as the version is only known once the artifact is saved.
+    """
+    self._saved_artifacts.append((filename, artifact))
+    return None
+
+  @override
+  async def load_artifact(
+      self, filename: str, version: Optional[int] = None
+  ) -> Optional[types.Part]:
+    raise ValueError('Artifacts cannot be loaded in a tool process pool.')
+
+  @override
+  async def list_artifacts(self) -> list[str]:
+    raise ValueError('Artifacts cannot be listed in a tool process pool.')
+
+  @override
+  async def search_memory(self, query: str) -> SearchMemoryResponse:
+    raise ValueError('Memory cannot be searched in a tool process pool.')
+
+
+def _call_in_process(
+    func: Callable[..., Any],
+    args: dict[str, Any],
+    tool_context: Optional[_ProcessToolContext],
+) -> tuple[
+    Any, Optional[EventActions], list[tuple[str, types.Part]], dict[str, Any]
+]:
+  """Calls the function in the worker process.
+
+  Returns:
+    The result of the function, and the actions, saved artifacts and `temp:`
+    state set by the function, to apply to the tool context in the parent
+    process.
+  """
+  from ..sessions.state import State
+
+  temp_snapshot = {}
+  if tool_context is not None:
+    args['tool_context'] = tool_context
+    temp_snapshot = {
+        key: value
+        for key, value in tool_context._state._value.items()
+        if key.startswith(State.TEMP_PREFIX)
+    }
+  if inspect.iscoroutinefunction(func):
+    result = asyncio.run(func(**args))
+  else:
+    result = func(**args)
+  if tool_context is None:
+    return result, None, [], {}
+  # The `temp:` keys are written to the value rather than the delta, so the
+  # ones set by the function are found by comparing it to the snapshot.
+  temp_state = {
+      key: value
+      for key, value in tool_context._state._value.items()
+      if key.startswith(State.TEMP_PREFIX)
+      and (key not in temp_snapshot or value is not temp_snapshot[key])
+  }
+  return (
+      result,
+      tool_context.actions,
+      tool_context._saved_artifacts,
+      temp_state,
+  )
+
+
+async def run_in_tool_process_pool(
+    func: Callable[..., Any], args: dict[str, Any]
+) -> Any:
+  """Runs the function of a tool in the shared process pool.
+
+  Args:
+    func: The picklable function to run.
+    args: The arguments of the function. A `tool_context` argument is sent as a
+      copy, whose changes are applied to it once the function returns.
+
+  Returns:
+    The result of the function.
+  """
+  tool_context = args.get('tool_context')
+  process_tool_context = None
+  if tool_context is not None:
+    process_tool_context = _ProcessToolContext(tool_context)
+    args = {key: value for key, value in args.items() if key != 'tool_context'}
+
+  (
+      result,
+      actions,
+      saved_artifacts,
+      temp_state,
+  ) = await get_tool_process_pool().run(
+      _call_in_process,
+      func=func,
+      args=args,
+      tool_context=process_tool_context,
+  )
+
+  if tool_context is not None:
+    # The actions of the copy started from those of the tool context, so the
+    # dicts are merged in place, keeping the state delta bound to the state.
+    for name in EventActions.model_fields:
+      value = getattr(actions, name)
+      current = getattr(tool_context.actions, name)
+      if isinstance(current, dict):
+        current.update(value)
+      else:
+        setattr(tool_context.actions, name, value)
+    tool_context.state.update(temp_state)
+    for filename, artifact in saved_artifacts:
+      await tool_context.save_artifact(filename, artifact)
+  return result
@@ -0,0 +1,158 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The thread pool running the synchronous functions of the tools.
+
+A blocking tool called on the event loop would block every other session
+served by the process, so `FunctionTool` runs synchronous functions in a shared
+`ToolThreadPool` by default. The pool can be replaced to change its size:
+
+  set_tool_thread_pool(ToolThreadPool(max_workers=64))
+
+and its saturation is reported by `get_tool_thread_pool().stats()`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import os
+import threading
+import time
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ToolThreadPoolStats(BaseModel):
+  """A snapshot of the usage of a `ToolThreadPool`."""
+
+  max_workers: int
+  """The maximum number of calls running at the same time."""
+
+  active_calls: int
+  """The number of calls running in a worker thread."""
+
+  queued_calls: int
+  """The number of calls waiting for a free worker thread."""
+
+  completed_calls: int
+  """The number of calls that finished, successfully or not."""
+
+  total_queue_seconds: float
+  """The total time the completed and active calls waited for a worker."""
+
+
+class ToolThreadPool:
+  """A `ThreadPoolExecutor` running the synchronous functions of the tools.
+
+  The calls run in a copy of the caller's context, so that context variables,
+  e.g. the current tracing span, are visible to the tool.
+  """
+
+  def __init__(self, max_workers: Optional[int] = None):
+    """
+    Args:
+      max_workers: The maximum number of calls running at the same time. The
+        default of `ThreadPoolExecutor` if not set.
+    """
+    if max_workers is None:
+      max_workers = min(32, (os.cpu_count() or 1) + 4)
+    if max_workers <= 0:
+      raise ValueError('max_workers must be greater than 0.')
+    self.max_workers = max_workers
+    self._executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix='adk_tool'
+    )
+    self._lock = threading.Lock()
+    self._active_calls = 0
+    self._queued_calls = 0
+    self._completed_calls = 0
+    self._total_queue_seconds = 0.0
+
+  async def run(self, func: Callable[..., Any], /, **kwargs: Any) -> Any:
+    """Runs `func(**kwargs)` in a worker thread and returns its result."""
+    context = contextvars.copy_context()
+    submitted_at = time.perf_counter()
+    with self._lock:
+      self._queued_calls += 1
+
+    def call() -> Any:
+      with self._lock:
+        self._queued_calls -= 1
+        self._active_calls += 1
+        self._total_queue_seconds += time.perf_counter() - submitted_at
+      try:
+        return context.run(func, **kwargs)
+      finally:
+        with self._lock:
+          self._active_calls -= 1
+          self._completed_calls += 1
+
+    try:
+      future = self._executor.submit(call)
+    except BaseException:
+      with self._lock:
+        self._queued_calls -= 1
+      raise
+    try:
+      return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+      # A call cancelled before it started never runs. A started call can't
+      # be interrupted and is counted when it finishes.
+      if future.cancel():
+        with self._lock:
+          self._queued_calls -= 1
+      raise
+
+  def stats(self) -> ToolThreadPoolStats:
+    """Returns the current usage of the pool."""
+    with self._lock:
+      return ToolThreadPoolStats(
+          max_workers=self.max_workers,
+          active_calls=self._active_calls,
+          queued_calls=self._queued_calls,
+          completed_calls=self._completed_calls,
+          total_queue_seconds=self._total_queue_seconds,
+      )
+
+  def shutdown(self, wait: bool = True):
+    """Stops the worker threads once the submitted calls are done."""
+    self._executor.shutdown(wait=wait)
+
+
+_pool_lock = threading.Lock()
+_pool: Optional[ToolThreadPool] = None
+
+
+def get_tool_thread_pool() -> ToolThreadPool:
+  """Returns the shared pool, creating a default one on first use."""
+  global _pool
+  with _pool_lock:
+    if _pool is None:
+      _pool = ToolThreadPool()
+    return _pool
+
+
+def set_tool_thread_pool(pool: ToolThreadPool):
+  """Replaces the shared pool used by the tools.
+
+  The previous pool is not shut down, as calls may still be running on it.
+  """
+  global _pool
+  with _pool_lock:
+    _pool = pool
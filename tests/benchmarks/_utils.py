@@ -0,0 +1,53 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Shared helpers for the benchmark scripts."""
+
+import contextlib
+import time
+from typing import Iterator
+
+
+class LatencyRecorder:
+  """Collects latency samples, in seconds, and reports percentiles."""
+
+  def __init__(self):
+    self.samples: list[float] = []
+
+  @contextlib.contextmanager
+  def measure(self) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+      yield
+    finally:
+      self.samples.append(time.perf_counter() - start)
+
+  def percentile(self, p: float) -> float:
+    """Returns the `p`-th percentile (0-100) of the samples, in milliseconds."""
+    if not self.samples:
+      return 0.0
+    ordered = sorted(self.samples)
+    index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+    return ordered[index] * 1000
+
+  def ops_per_second(self) -> float:
+    """Returns the number of operations per second of measured time."""
+    total = sum(self.samples)
+    return len(self.samples) / total if total else 0.0
+
+  def summary(self) -> str:
+    return (
+        f'n={len(self.samples):<6d} p50={self.percentile(50):8.2f}ms'
+        f' p90={self.percentile(90):8.2f}ms p99={self.percentile(99):8.2f}ms'
+    )
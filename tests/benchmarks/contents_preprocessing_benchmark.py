@@ -0,0 +1,118 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures the per-step cost of building the LLM contents by history length.
+
+A step appends a function call and its response to the history, then builds
+the contents, as an agent does on every tool round trip. The incremental
+builder, reused across the steps of an invocation, is reported next to a full
+rebuild of the contents from the whole history, which every step used to do.
+
+Usage:
+
+  python -m tests.benchmarks.contents_preprocessing_benchmark
+"""
+
+import argparse
+
+from google.adk.events import Event
+from google.adk.flows.llm_flows import contents
+from google.genai import types
+
+from ._utils import LatencyRecorder
+
+_AGENT_NAME = 'agent'
+
+
+def _make_round_trip(i: int) -> list[Event]:
+  call_id = f'adk-call-{i}'
+  return [
+      Event(
+          author=_AGENT_NAME,
+          content=types.Content(
+              role='model',
+              parts=[
+                  types.Part(
+                      function_call=types.FunctionCall(
+                          id=call_id, name='lookup', args={'query': f'q{i}'}
+                      )
+                  )
+              ],
+          ),
+      ),
+      Event(
+          author=_AGENT_NAME,
+          content=types.Content(
+              role='user',
+              parts=[
+                  types.Part(
+                      function_response=types.FunctionResponse(
+                          id=call_id,
+                          name='lookup',
+                          response={'result': 'lorem ipsum ' * 20},
+                      )
+                  )
+              ],
+          ),
+      ),
+  ]
+
+
+def _run_level(num_events: int, num_steps: int):
+  events = [
+      Event(
+          author='user',
+          content=types.Content(role='user', parts=[types.Part(text='hi')]),
+      )
+  ]
+  while len(events) < num_events:
+    events.extend(_make_round_trip(len(events)))
+
+  builder = contents._ContentsBuilder(None, _AGENT_NAME)
+  builder.build(events)
+  incremental_latency = LatencyRecorder()
+  full_latency = LatencyRecorder()
+  for _ in range(num_steps):
+    events.extend(_make_round_trip(len(events)))
+    with incremental_latency.measure():
+      incremental_contents = builder.build(events)
+    with full_latency.measure():
+      full_contents = contents._get_contents(None, events, _AGENT_NAME)
+    assert incremental_contents == full_contents
+
+  print(
+      f'  events={num_events:<6d} incremental: {incremental_latency.summary()}'
+      f' | full rebuild p50={full_latency.percentile(50):8.2f}ms'
+  )
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument(
+      '--num_events',
+      type=int,
+      nargs='+',
+      default=[10, 100, 500, 1000, 5000],
+      help='History lengths to measure.',
+  )
+  parser.add_argument('--num_steps', type=int, default=20)
+  args = parser.parse_args()
+
+  print('Per-step LLM contents preprocessing')
+  for num_events in args.num_events:
+    _run_level(num_events, args.num_steps)
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,146 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures DatabaseSessionService latency as concurrent sessions grow.
+
+Every simulated session runs a number of turns concurrently with the others,
+each turn being a `get_session` followed by an `append_event`. Alongside the
+sessions, a probe coroutine measures how late the event loop wakes it up, which
+shows whether database round trips are blocking the loop.
+
+Note that SQLite serializes writers, so with many concurrent sessions the turn
+latency on SQLite mostly measures queueing on the database lock. Use a server
+database (e.g. `postgresql+asyncpg://...`) to compare turn latency percentiles.
+
+Usage:
+
+  python -m tests.benchmarks.database_session_concurrency_benchmark \\
+      --db_url=sqlite:////tmp/sync.db \\
+      --db_url=sqlite+aiosqlite:////tmp/async.db
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import Session
+from google.genai import types
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from ._utils import LatencyRecorder
+
+_APP_NAME = 'benchmark_app'
+
+
+async def _run_session(
+    service: DatabaseSessionService,
+    session: Session,
+    num_turns: int,
+    turn_latency: LatencyRecorder,
+):
+  user_id = session.user_id
+  for turn in range(num_turns):
+    with turn_latency.measure():
+      session = await service.get_session(
+          app_name=_APP_NAME, user_id=user_id, session_id=session.id
+      )
+      await service.append_event(
+          session,
+          Event(
+              author='user',
+              invocation_id=f'invocation_{turn}',
+              content=types.Content(
+                  role='user', parts=[types.Part(text=f'turn {turn}')]
+              ),
+              actions=EventActions(state_delta={'turn': turn}),
+          ),
+      )
+
+
+async def _probe_event_loop(stop: asyncio.Event, lag: LatencyRecorder):
+  """Records how late the event loop schedules a 1ms sleep."""
+  while not stop.is_set():
+    start = time.perf_counter()
+    await asyncio.sleep(0.001)
+    lag.samples.append(max(0.0, time.perf_counter() - start - 0.001))
+
+
+async def _run_level(db_url: str, concurrency: int, num_turns: int):
+  service = DatabaseSessionService(db_url)
+  sessions = [
+      await service.create_session(app_name=_APP_NAME, user_id=f'user_{i}')
+      for i in range(concurrency)
+  ]
+  turn_latency = LatencyRecorder()
+  loop_lag = LatencyRecorder()
+  stop = asyncio.Event()
+  probe = asyncio.create_task(_probe_event_loop(stop, loop_lag))
+  start = time.perf_counter()
+  await asyncio.gather(*[
+      _run_session(service, session, num_turns, turn_latency)
+      for session in sessions
+  ])
+  elapsed = time.perf_counter() - start
+  stop.set()
+  await probe
+  if isinstance(service.db_engine, AsyncEngine):
+    await service.db_engine.dispose()
+  else:
+    service.db_engine.dispose()
+  print(
+      f'  concurrency={concurrency:<4d} turn: {turn_latency.summary()}'
+      f' | loop lag p99={loop_lag.percentile(99):8.2f}ms'
+      f' | {len(turn_latency.samples) / elapsed:8.1f} turns/s'
+  )
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument(
+      '--db_url',
+      action='append',
+      help='Database URL to benchmark. Can be repeated.',
+  )
+  parser.add_argument(
+      '--concurrency',
+      type=int,
+      nargs='+',
+      default=[1, 4, 16, 64],
+      help='Numbers of concurrent sessions to run.',
+  )
+  parser.add_argument('--num_turns', type=int, default=20)
+  args = parser.parse_args()
+
+  db_urls = args.db_url or [
+      'sqlite:////tmp/adk_benchmark_sync.db',
+      'sqlite+aiosqlite:////tmp/adk_benchmark_async.db',
+  ]
+  for db_url in db_urls:
+    print(db_url)
+    for concurrency in args.concurrency:
+      # Start every level from an empty SQLite file.
+      url = make_url(db_url)
+      if url.get_backend_name() == 'sqlite' and url.database:
+        if os.path.exists(url.database):
+          os.remove(url.database)
+      await _run_level(db_url, concurrency, args.num_turns)
+
+
+if __name__ == '__main__':
+  asyncio.run(main())
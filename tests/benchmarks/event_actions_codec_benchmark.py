@@ -0,0 +1,123 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares session load time with pickled and JSON encoded event actions.
+
+Usage:
+
+  python -m tests.benchmarks.event_actions_codec_benchmark --num_events=10000
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+import os
+import pickle
+import tempfile
+
+from google.adk.events import EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions.database_session_service import StorageEvent
+import sqlalchemy
+
+from ._utils import LatencyRecorder
+
+_APP_NAME = 'benchmark_app'
+_USER_ID = 'user'
+
+
+def _make_actions(i: int) -> EventActions:
+  return EventActions(
+      state_delta={'turn': i, 'last_tool': f'tool_{i % 7}'},
+      artifact_delta={f'file_{i % 3}.txt': i},
+  )
+
+
+def _insert_events(service: DatabaseSessionService, session_id: str, n: int):
+  with service.database_session_factory() as sql_session:
+    sql_session.add_all([
+        StorageEvent(
+            id=f'event_{i:08d}',
+            app_name=_APP_NAME,
+            user_id=_USER_ID,
+            session_id=session_id,
+            invocation_id=f'invocation_{i // 4}',
+            author='agent',
+            timestamp=datetime.fromtimestamp(1_700_000_000 + i),
+            actions=_make_actions(i),
+        )
+        for i in range(n)
+    ])
+    sql_session.commit()
+
+
+def _pickle_all_actions(service: DatabaseSessionService):
+  """Rewrites the actions of all events the way earlier versions stored them."""
+  events = StorageEvent.__table__
+  with service.database_session_factory() as sql_session:
+    rows = sql_session.execute(
+        sqlalchemy.select(StorageEvent.id, StorageEvent.actions)
+    ).all()
+    sql_session.execute(
+        sqlalchemy.update(events)
+        .where(events.c.id == sqlalchemy.bindparam('event_id'))
+        .values(
+            actions=sqlalchemy.bindparam(
+                'pickled_actions', type_=sqlalchemy.LargeBinary
+            )
+        ),
+        [
+            {'event_id': event_id, 'pickled_actions': pickle.dumps(actions)}
+            for event_id, actions in rows
+        ],
+    )
+    sql_session.commit()
+
+
+async def _measure_load(
+    service: DatabaseSessionService, session_id: str, repeats: int
+) -> LatencyRecorder:
+  latency = LatencyRecorder()
+  for _ in range(repeats):
+    with latency.measure():
+      await service.get_session(
+          app_name=_APP_NAME, user_id=_USER_ID, session_id=session_id
+      )
+  return latency
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--num_events', type=int, default=10_000)
+  parser.add_argument('--repeats', type=int, default=5)
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as tmp_dir:
+    service = DatabaseSessionService(
+        f'sqlite:///{os.path.join(tmp_dir, "sessions.db")}'
+    )
+    session = await service.create_session(app_name=_APP_NAME, user_id=_USER_ID)
+    _insert_events(service, session.id, args.num_events)
+
+    json_latency = await _measure_load(service, session.id, args.repeats)
+    _pickle_all_actions(service)
+    pickle_latency = await _measure_load(service, session.id, args.repeats)
+
+  print(f'get_session with {args.num_events} events')
+  print(f'  pickle: {pickle_latency.summary()}')
+  print(f'  json:   {json_latency.summary()}')
+
+
+if __name__ == '__main__':
+  asyncio.run(main())
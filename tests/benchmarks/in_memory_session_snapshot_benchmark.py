@@ -0,0 +1,110 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures the per-turn overhead of InMemorySessionService by session length.
+
+A turn is a `get_session` followed by an `append_event`. `get_session` copies
+the events it returns, so the cost of a tail read of the recent events, which
+only copies those, is reported next to it, as well as the cost of deep copying
+the whole stored session for reference.
+
+Usage:
+
+  python -m tests.benchmarks.in_memory_session_snapshot_benchmark
+"""
+
+import argparse
+import asyncio
+import copy
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from ._utils import LatencyRecorder
+
+_APP_NAME = 'benchmark_app'
+_USER_ID = 'user'
+
+
+def _make_event(i: int) -> Event:
+  return Event(
+      author='agent',
+      invocation_id=f'invocation_{i // 4}',
+      content=types.Content(
+          role='model',
+          parts=[types.Part(text=f'response {i} ' + 'lorem ipsum ' * 20)],
+      ),
+      actions=EventActions(state_delta={'turn': i}),
+  )
+
+
+async def _run_level(num_events: int, num_turns: int):
+  service = InMemorySessionService()
+  session = await service.create_session(app_name=_APP_NAME, user_id=_USER_ID)
+  for i in range(num_events):
+    await service.append_event(session, _make_event(i))
+
+  turn_latency = LatencyRecorder()
+  for i in range(num_turns):
+    with turn_latency.measure():
+      session = await service.get_session(
+          app_name=_APP_NAME, user_id=_USER_ID, session_id=session.id
+      )
+      await service.append_event(session, _make_event(num_events + i))
+
+  tail_latency = LatencyRecorder()
+  for _ in range(num_turns):
+    with tail_latency.measure():
+      await service.get_session(
+          app_name=_APP_NAME,
+          user_id=_USER_ID,
+          session_id=session.id,
+          config=GetSessionConfig(num_recent_events=10),
+      )
+
+  deepcopy_latency = LatencyRecorder()
+  stored_session = service.sessions[_APP_NAME][_USER_ID][session.id]
+  for _ in range(min(num_turns, 5)):
+    with deepcopy_latency.measure():
+      copy.deepcopy(stored_session)
+
+  print(
+      f'  events={num_events:<6d} turn: {turn_latency.summary()}'
+      f' | tail read p50={tail_latency.percentile(50):8.2f}ms'
+      f' | full deepcopy p50={deepcopy_latency.percentile(50):8.2f}ms'
+  )
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument(
+      '--num_events',
+      type=int,
+      nargs='+',
+      default=[10, 100, 1000, 2000, 10000],
+      help='Session lengths to measure.',
+  )
+  parser.add_argument('--num_turns', type=int, default=50)
+  args = parser.parse_args()
+
+  print('InMemorySessionService per-turn overhead')
+  for num_events in args.num_events:
+    await _run_level(num_events, args.num_turns)
+
+
+if __name__ == '__main__':
+  asyncio.run(main())
@@ -0,0 +1,125 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures the cost of every session service operation by session length.
+
+For each backend and number of events, a synthetic session is built with
+`append_event`, then read back with and without `GetSessionConfig`, listed and
+deleted. Ops/sec and latency percentiles are reported per operation, along
+with the memory retained by the service and the peak memory while building the
+session.
+
+The workload is the conformance workload of the session service tests, which
+also checks the results of every operation.
+
+Usage:
+
+  python -m tests.benchmarks.session_service_benchmark --num_events 10 1000 100000
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import tempfile
+import tracemalloc
+from typing import Callable
+
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import FileLogSessionService
+from google.adk.sessions import InMemorySessionService
+
+from ..unittests.sessions.session_service_conformance import APP_NAME
+from ..unittests.sessions.session_service_conformance import make_event
+from ..unittests.sessions.session_service_conformance import OPERATIONS
+from ..unittests.sessions.session_service_conformance import run_workload
+from ._utils import LatencyRecorder
+
+
+async def _measure_memory(
+    service: BaseSessionService, num_events: int
+) -> tuple[int, int]:
+  """Returns the retained and peak memory of building a session, in bytes."""
+  events = [make_event(i) for i in range(num_events)]
+  tracemalloc.start()
+  try:
+    start, _ = tracemalloc.get_traced_memory()
+    session = await service.create_session(app_name=APP_NAME, user_id=USER_ID)
+    for event in events:
+      await service.append_event(session, event)
+    del session
+    current, peak = tracemalloc.get_traced_memory()
+  finally:
+    tracemalloc.stop()
+  return current - start, peak - start
+
+
+def _backends(tmp_dir: str) -> dict[str, Callable[[], BaseSessionService]]:
+  counter = itertools.count()
+  return {
+      'InMemorySessionService': InMemorySessionService,
+      'DatabaseSessionService (SQLite in memory)': lambda: (
+          DatabaseSessionService('sqlite:///:memory:')
+      ),
+      'DatabaseSessionService (SQLite file)': lambda: DatabaseSessionService(
+          f'sqlite:///{os.path.join(tmp_dir, f"{next(counter)}.db")}'
+      ),
+      'FileLogSessionService': lambda: FileLogSessionService(
+          os.path.join(tmp_dir, f'log_{next(counter)}')
+      ),
+  }
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument(
+      '--num_events', type=int, nargs='+', default=[10, 100, 1000, 10000]
+  )
+  parser.add_argument(
+      '--skip_memory',
+      action='store_true',
+      help='Skips the memory measurement, which builds every session twice.',
+  )
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as tmp_dir:
+    for name, create_service in _backends(tmp_dir).items():
+      for num_events in args.num_events:
+        print(f'{name}, {num_events} events')
+        recorders: dict[str, LatencyRecorder] = {}
+        await run_workload(
+            create_service(),
+            num_events,
+            lambda operation: recorders.setdefault(
+                operation, LatencyRecorder()
+            ).measure(),
+        )
+        for operation in OPERATIONS:
+          if operation in recorders:
+            recorder = recorders[operation]
+            print(
+                f'  {operation:<31s} {recorder.ops_per_second():10.0f} ops/s'
+                f' {recorder.summary()}'
+            )
+        if not args.skip_memory:
+          retained, peak = await _measure_memory(create_service(), num_events)
+          print(
+              f'  memory: retained={retained / 2**20:.1f}MiB'
+              f' peak={peak / 2**20:.1f}MiB'
+          )
+
+
+if __name__ == '__main__':
+  asyncio.run(main())
@@ -0,0 +1,90 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the append and tail read latency of durable session stores.
+
+Usage:
+
+  python -m tests.benchmarks.session_store_append_benchmark --num_events=2000
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import FileLogSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+from ._utils import LatencyRecorder
+
+_APP_NAME = 'benchmark_app'
+_USER_ID = 'user'
+
+
+async def _run(service: BaseSessionService, num_events: int):
+  session = await service.create_session(app_name=_APP_NAME, user_id=_USER_ID)
+  append_latency = LatencyRecorder()
+  for i in range(num_events):
+    event = Event(
+        author='agent',
+        invocation_id=f'invocation_{i // 4}',
+        content=types.Content(
+            role='model', parts=[types.Part(text=f'response {i} ' * 20)]
+        ),
+        actions=EventActions(state_delta={'turn': i}),
+    )
+    with append_latency.measure():
+      await service.append_event(session, event)
+
+  tail_latency = LatencyRecorder()
+  for _ in range(20):
+    with tail_latency.measure():
+      await service.get_session(
+          app_name=_APP_NAME,
+          user_id=_USER_ID,
+          session_id=session.id,
+          config=GetSessionConfig(num_recent_events=10),
+      )
+  print(f'  append:   {append_latency.summary()}')
+  print(f'  tail(10): {tail_latency.summary()}')
+
+
+async def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--num_events', type=int, default=2000)
+  args = parser.parse_args()
+
+  with tempfile.TemporaryDirectory() as tmp_dir:
+    print('DatabaseSessionService (SQLite)')
+    await _run(
+        DatabaseSessionService(
+            f'sqlite:///{os.path.join(tmp_dir, "sessions.db")}'
+        ),
+        args.num_events,
+    )
+    print('FileLogSessionService')
+    await _run(
+        FileLogSessionService(os.path.join(tmp_dir, 'sessions')),
+        args.num_events,
+    )
+
+
+if __name__ == '__main__':
+  asyncio.run(main())
@@ -14,9 +14,9 @@
 
 """Tests for utilities in cli_tool_click."""
 
-
 from __future__ import annotations
 
+import asyncio
 import builtins
 from pathlib import Path
 from types import SimpleNamespace
@@ -27,7 +27,10 @@ from typing import Tuple
 
 import click
 from click.testing import CliRunner
+from google.adk.cli import cli_sessions
 from google.adk.cli import cli_tools_click
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
 import pytest
 
 
@@ -330,3 +333,79 @@ def test_cli_eval_success_path(
   assert "Eval Run Summary" in result.output
   assert "Tests passed: 1" in result.output
   assert "Tests failed: 1" in result.output
+
+
+# cli sessions export / import
+def test_cli_sessions_export_and_import(tmp_path: Path) -> None:
+  """Sessions exported from one DB should be imported into another."""
+  source_url = f"sqlite:///{tmp_path / 'source.db'}"
+  destination_url = f"sqlite:///{tmp_path / 'destination.db'}"
+  asyncio.run(
+      DatabaseSessionService(source_url).create_session(
+          app_name="my_app", user_id="user", session_id="s1", state={"k": "v"}
+      )
+  )
+  export_file = tmp_path / "sessions.ndjson"
+
+  runner = CliRunner()
+  result = runner.invoke(
+      cli_tools_click.main,
+      [
+          "sessions",
+          "export",
+          f"--session_db_url={source_url}",
+          "--app_name=my_app",
+          "--user_id=user",
+          str(export_file),
+      ],
+  )
+  assert result.exit_code == 0, result.output
+  result = runner.invoke(
+      cli_tools_click.main,
+      [
+          "sessions",
+          "import",
+          f"--session_db_url={destination_url}",
+          str(export_file),
+      ],
+  )
+  assert result.exit_code == 0, result.output
+
+  session = asyncio.run(
+      DatabaseSessionService(destination_url).get_session(
+          app_name="my_app", user_id="user", session_id="s1"
+      )
+  )
+  assert session.state == {"k": "v"}
+
+
+def test_cli_sessions_export_uses_agent_engine_id(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+  """Agent Engine sessions should be exported under the engine ID."""
+  session_service = InMemorySessionService()
+  asyncio.run(
+      session_service.create_session(
+          app_name="engine", user_id="user", session_id="s1"
+      )
+  )
+  monkeypatch.setattr(
+      cli_sessions,
+      "create_session_service",
+      lambda session_db_url: (session_service, "engine"),
+  )
+  export_file = tmp_path / "sessions.ndjson"
+
+  result = CliRunner().invoke(
+      cli_tools_click.main,
+      [
+          "sessions",
+          "export",
+          "--session_db_url=agentengine://engine",
+          "--user_id=user",
+          str(export_file),
+      ],
+  )
+
+  assert result.exit_code == 0, result.output
+  assert '"app_name": "engine"' in export_file.read_text()
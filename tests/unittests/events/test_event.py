@@ -0,0 +1,59 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent import futures
+import time
+from unittest import mock
+import uuid
+
+from google.adk.events import Event
+
+
+def test_new_id_is_uuid_v7():
+  event_id = Event.new_id()
+
+  parsed_id = uuid.UUID(event_id)
+  assert str(parsed_id) == event_id
+  assert parsed_id.version == 7
+  assert parsed_id.variant == uuid.RFC_4122
+
+
+def test_new_ids_sort_in_creation_order():
+  ids = [Event.new_id() for _ in range(10000)]
+
+  assert ids == sorted(ids)
+  assert len(set(ids)) == len(ids)
+
+
+def test_new_ids_are_unique_across_threads():
+  with futures.ThreadPoolExecutor(4) as executor:
+    ids = list(executor.map(lambda _: Event.new_id(), range(20000)))
+
+  assert len(set(ids)) == len(ids)
+
+
+def test_new_ids_are_monotonic_when_the_clock_goes_backwards():
+  first_id = Event.new_id()
+  with mock.patch('time.time_ns', return_value=0):
+    second_id = Event.new_id()
+
+  assert second_id > first_id
+
+
+def test_new_id_embeds_the_creation_time():
+  start_millis = time.time_ns() // 1_000_000
+  event_id = Event.new_id()
+  end_millis = time.time_ns() // 1_000_000
+
+  assert start_millis <= uuid.UUID(event_id).int >> 80 <= end_millis
@@ -0,0 +1,131 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.events import Event
+from google.adk.flows.llm_flows import contents
+from google.genai import types
+
+
+def _text_event(author: str, text: str) -> Event:
+  role = 'user' if author == 'user' else 'model'
+  return Event(
+      author=author,
+      content=types.Content(role=role, parts=[types.Part(text=text)]),
+  )
+
+
+def _function_call_event(author: str, *call_ids: str) -> Event:
+  return Event(
+      author=author,
+      content=types.Content(
+          role='model',
+          parts=[
+              types.Part(
+                  function_call=types.FunctionCall(
+                      id=call_id, name='tool', args={'id': call_id}
+                  )
+              )
+              for call_id in call_ids
+          ],
+      ),
+  )
+
+
+def _function_response_event(author: str, call_id: str, result: str) -> Event:
+  return Event(
+      author=author,
+      content=types.Content(
+          role='user',
+          parts=[
+              types.Part(
+                  function_response=types.FunctionResponse(
+                      id=call_id, name='tool', response={'result': result}
+                  )
+              )
+          ],
+      ),
+  )
+
+
+def _history() -> list[Event]:
+  """Returns a history with an async function call answered twice."""
+  return [
+      _text_event('user', 'hi'),
+      _function_call_event('agent', 'adk-long'),
+      _function_response_event('agent', 'adk-long', 'pending'),
+      _text_event('agent', 'Waiting for the long running tool.'),
+      _text_event('other_agent', 'I am another agent.'),
+      _text_event('user', 'any update?'),
+      _function_call_event('agent', 'c1', 'c2'),
+      _function_response_event('agent', 'c1', 'one'),
+      _function_response_event('agent', 'c2', 'two'),
+      _function_response_event('agent', 'adk-long', 'done'),
+      _text_event('agent', 'The long running tool is done.'),
+      _function_call_event('agent', 'c3'),
+      _function_response_event('agent', 'c3', 'three'),
+  ]
+
+
+def test_incremental_build_matches_full_build():
+  builder = contents._ContentsBuilder(None, 'agent')
+  events = []
+  for event in _history():
+    events.append(event)
+    assert builder.build(events) == contents._get_contents(
+        None, list(events), 'agent'
+    )
+
+
+def test_async_function_response_is_moved_to_its_call():
+  built_contents = contents._get_contents(None, _history(), 'agent')
+
+  # The latest response of the async call replaces the pending one, and the
+  # client function call IDs are removed.
+  assert built_contents[1].parts[0].function_call.id is None
+  assert built_contents[2].parts[0].function_response.response == {
+      'result': 'done'
+  }
+  assert built_contents[4].parts[1].text == (
+      '[other_agent] said: I am another agent.'
+  )
+  # The responses of the parallel calls are merged.
+  assert [part.function_response.id for part in built_contents[7].parts] == [
+      'c1',
+      'c2',
+  ]
+  assert len(built_contents) == 11
+
+
+def test_rebuilds_when_events_are_replaced():
+  builder = contents._ContentsBuilder(None, 'agent')
+  events = _history()
+  builder.build(events)
+
+  compacted_events = events[5:]
+  assert builder.build(compacted_events) == contents._get_contents(
+      None, compacted_events, 'agent'
+  )
+
+
+def test_built_contents_are_copies():
+  builder = contents._ContentsBuilder(None, 'agent')
+  events = [_text_event('user', 'hi'), _function_call_event('agent', 'adk-1')]
+
+  built_contents = builder.build(events)
+  built_contents[0].parts[0].text = 'modified'
+  built_contents[1].parts.append(types.Part(text='appended'))
+
+  assert builder.build(events) == contents._get_contents(None, events, 'agent')
+  assert events[0].content.parts[0].text == 'hi'
+  assert events[1].content.parts[0].function_call.id == 'adk-1'
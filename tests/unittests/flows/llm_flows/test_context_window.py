@@ -0,0 +1,237 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.agents import Agent
+from google.adk.agents import ContextWindowConfig
+from google.adk.flows.llm_flows import _context_window
+from google.adk.models import LlmRequest
+from google.genai import types
+import pytest
+
+from ... import utils
+
+
+def _text(role: str, text: str) -> types.Content:
+  return types.Content(role=role, parts=[types.Part(text=text)])
+
+
+def _function_call(call_id: str) -> types.Content:
+  return types.Content(
+      role='model',
+      parts=[
+          types.Part(
+              function_call=types.FunctionCall(
+                  id=call_id, name='tool', args={'query': 'x' * 40}
+              )
+          )
+      ],
+  )
+
+
+def _function_response(call_id: str) -> types.Content:
+  return types.Content(
+      role='user',
+      parts=[
+          types.Part(
+              function_response=types.FunctionResponse(
+                  id=call_id, name='tool', response={'result': 'y' * 40}
+              )
+          )
+      ],
+  )
+
+
+async def _run_processor(
+    contents: list[types.Content], context_window: ContextWindowConfig
+) -> list[types.Content]:
+  agent = Agent(
+      model='gemini-1.5-flash', name='agent', context_window=context_window
+  )
+  invocation_context = await utils.create_invocation_context(agent=agent)
+  request = LlmRequest(model='gemini-1.5-flash', contents=list(contents))
+  async for _ in _context_window.request_processor.run_async(
+      invocation_context, request
+  ):
+    pass
+  return request.contents
+
+
+@pytest.mark.asyncio
+async def test_contents_within_budget_are_kept():
+  contents = [_text('user', 'hi'), _text('model', 'hello')]
+
+  assert (
+      await _run_processor(contents, ContextWindowConfig(max_tokens=100))
+      == contents
+  )
+
+
+@pytest.mark.asyncio
+async def test_drops_oldest_contents_and_keeps_function_pairs():
+  contents = [
+      _text('user', 'a' * 40),
+      _function_call('1'),
+      _function_response('1'),
+      _text('user', 'b' * 40),
+      _function_call('2'),
+      _function_response('2'),
+      _text('model', 'c' * 40),
+  ]
+
+  # The texts are estimated at 10 tokens, the function pairs at 30 tokens.
+  kept_contents = await _run_processor(
+      contents, ContextWindowConfig(max_tokens=70)
+  )
+
+  assert kept_contents == contents[3:]
+
+
+@pytest.mark.asyncio
+async def test_kept_contents_start_with_user_turn():
+  contents = [
+      _text('user', 'a' * 40),
+      _text('model', 'b' * 40),
+      _text('user', 'c' * 40),
+      _function_call('1'),
+      _function_response('1'),
+  ]
+
+  # Dropping the first text fits the budget, but would start with a model turn.
+  kept_contents = await _run_processor(
+      contents, ContextWindowConfig(max_tokens=50)
+  )
+
+  assert kept_contents == contents[2:]
+
+
+@pytest.mark.asyncio
+async def test_user_question_is_kept_during_tool_loop():
+  contents = [
+      _text('user', 'a' * 40),
+      _function_call('1'),
+      _function_response('1'),
+      _function_call('2'),
+      _function_response('2'),
+  ]
+
+  kept_contents = await _run_processor(
+      contents, ContextWindowConfig(max_tokens=40)
+  )
+
+  assert kept_contents == [contents[0]] + contents[3:]
+
+
+@pytest.mark.asyncio
+async def test_tool_loop_stays_within_budget():
+  contents = [_text('user', 'a' * 40)]
+  for i in range(10):
+    contents += [_function_call(str(i)), _function_response(str(i))]
+
+  kept_contents = await _run_processor(
+      contents, ContextWindowConfig(max_tokens=100)
+  )
+
+  assert (
+      sum(
+          _context_window._estimate_tokens(content) for content in kept_contents
+      )
+      <= 100
+  )
+  # The question of the user is kept with the latest three round trips.
+  assert kept_contents == [contents[0]] + contents[-6:]
+
+
+@pytest.mark.asyncio
+async def test_latest_contents_are_kept_over_budget():
+  contents = [_function_call('1'), _function_response('1')]
+
+  assert (
+      await _run_processor(contents, ContextWindowConfig(max_tokens=1))
+      == contents
+  )
+
+
+@pytest.mark.asyncio
+async def test_count_tokens_hook():
+  contents = [_text('user', 'one'), _text('model', 'two'), _text('user', 'go')]
+
+  kept_contents = await _run_processor(
+      contents,
+      ContextWindowConfig(
+          max_tokens=2, count_tokens=lambda content: len(content.parts)
+      ),
+  )
+
+  assert kept_contents == contents[2:]
+
+
+@pytest.mark.asyncio
+async def test_async_count_tokens_hook():
+  async def count_tokens(content: types.Content) -> int:
+    return len(content.parts)
+
+  contents = [_text('user', 'one'), _text('model', 'two'), _text('user', 'go')]
+
+  kept_contents = await _run_processor(
+      contents,
+      ContextWindowConfig(max_tokens=2, count_tokens=count_tokens),
+  )
+
+  assert kept_contents == contents[2:]
+
+
+def test_estimate_tokens():
+  assert _context_window._estimate_tokens(_text('user', 'x' * 10)) == 3
+  assert (
+      _context_window._estimate_tokens(
+          types.Content(
+              role='user',
+              parts=[
+                  types.Part(
+                      inline_data=types.Blob(
+                          mime_type='image/png', data=b'\x00' * 1000
+                      )
+                  )
+              ],
+          )
+      )
+      == 258
+  )
+
+
+def test_prompt_stays_bounded_across_turns():
+  mock_model = utils.MockModel.create(
+      responses=[f'response {i} ' + 'z' * 40 for i in range(10)]
+  )
+  agent = Agent(
+      name='root_agent',
+      model=mock_model,
+      context_window=ContextWindowConfig(max_tokens=50),
+  )
+  runner = utils.InMemoryRunner(agent)
+
+  for i in range(10):
+    runner.run(f'message {i}')
+
+  last_request = mock_model.requests[-1]
+  assert (
+      sum(
+          _context_window._estimate_tokens(content)
+          for content in last_request.contents
+      )
+      <= 50
+  )
+  assert last_request.contents[-1].parts[0].text == 'message 9'
+  # Older turns were kept as long as they fit.
+  assert len(last_request.contents) > 1
@@ -0,0 +1,186 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from typing import Optional
+
+from google.adk.agents import Agent
+from google.adk.tools import FunctionTool
+from google.adk.tools import ToolContext
+from google.genai import types
+import pytest
+
+from ... import utils
+
+
+def _function_calls(*args: tuple[str, int]) -> list[types.Part]:
+  return [
+      types.Part.from_function_call(name=name, args={'x': x})
+      for name, x in args
+  ]
+
+
+def _function_responses(*args: tuple[str, int]) -> list[types.Part]:
+  return [
+      types.Part.from_function_response(name=name, response={'result': result})
+      for name, result in args
+  ]
+
+
+class _Tracker:
+  """Tracks the function calls in flight."""
+
+  def __init__(self):
+    self.in_flight = 0
+    self.max_in_flight = 0
+    self.calls: list[str] = []
+
+  async def call(self, name: str, delay: float):
+    self.calls.append(f'start {name}')
+    self.in_flight += 1
+    self.max_in_flight = max(self.max_in_flight, self.in_flight)
+    await asyncio.sleep(delay)
+    self.in_flight -= 1
+    self.calls.append(f'end {name}')
+
+
+async def _run(
+    function_calls: list[types.Part],
+    tools: list,
+    max_parallel_tool_calls: Optional[int] = None,
+):
+  mock_model = utils.MockModel.create(responses=[function_calls, 'done'])
+  agent = Agent(
+      name='root_agent',
+      model=mock_model,
+      tools=tools,
+      max_parallel_tool_calls=max_parallel_tool_calls,
+  )
+  runner = utils.TestInMemoryRunner(agent)
+  return await runner.run_async_with_new_session('test')
+
+
+@pytest.mark.asyncio
+async def test_parallel_calls_run_concurrently_in_order():
+  tracker = _Tracker()
+
+  async def slow_double(x: int) -> int:
+    # The earlier calls finish last.
+    await tracker.call(f'slow_double({x})', delay=0.01 * (4 - x))
+    return x * 2
+
+  function_calls = _function_calls(
+      ('slow_double', 1), ('slow_double', 2), ('slow_double', 3)
+  )
+  events = await _run(function_calls, [slow_double])
+
+  assert tracker.max_in_flight == 3
+  assert utils.simplify_events(events) == [
+      ('root_agent', function_calls),
+      (
+          'root_agent',
+          _function_responses(
+              ('slow_double', 2), ('slow_double', 4), ('slow_double', 6)
+          ),
+      ),
+      ('root_agent', 'done'),
+  ]
+
+
+@pytest.mark.asyncio
+async def test_max_parallel_tool_calls():
+  tracker = _Tracker()
+
+  async def slow_double(x: int) -> int:
+    await tracker.call(f'slow_double({x})', delay=0.01)
+    return x * 2
+
+  await _run(
+      _function_calls(*[('slow_double', x) for x in range(5)]),
+      [slow_double],
+      max_parallel_tool_calls=2,
+  )
+
+  assert tracker.max_in_flight == 2
+  assert len(tracker.calls) == 10
+
+
+@pytest.mark.asyncio
+async def test_failing_call_cancels_and_awaits_other_calls():
+  calls = []
+
+  async def fail(x: int) -> int:
+    await asyncio.sleep(0.01)
+    raise ValueError('tool failed')
+
+  async def slow(x: int) -> int:
+    try:
+      await asyncio.sleep(1)
+    except asyncio.CancelledError:
+      await asyncio.sleep(0)
+      calls.append('cleaned up')
+      raise
+    return x
+
+  with pytest.raises(ValueError, match='tool failed'):
+    await _run(_function_calls(('fail', 1), ('slow', 2)), [fail, slow])
+
+  assert calls == ['cleaned up']
+
+
+@pytest.mark.asyncio
+async def test_serial_tools_run_alone():
+  tracker = _Tracker()
+
+  async def parallel(x: int) -> int:
+    await tracker.call(f'parallel({x})', delay=0.01)
+    return x
+
+  async def serial(x: int) -> int:
+    await tracker.call(f'serial({x})', delay=0.01)
+    return x
+
+  await _run(
+      _function_calls(
+          ('parallel', 1), ('parallel', 2), ('serial', 3), ('parallel', 4)
+      ),
+      [parallel, FunctionTool(serial, run_serially=True)],
+  )
+
+  assert tracker.calls == [
+      'start parallel(1)',
+      'start parallel(2)',
+      'end parallel(1)',
+      'end parallel(2)',
+      'start serial(3)',
+      'end serial(3)',
+      'start parallel(4)',
+      'end parallel(4)',
+  ]
+
+
+@pytest.mark.asyncio
+async def test_state_deltas_of_parallel_calls_are_merged():
+
+  async def set_state(x: int, tool_context: ToolContext) -> int:
+    await asyncio.sleep(0.01 * (3 - x))
+    tool_context.state[f'key_{x}'] = x
+    tool_context.state['last'] = x
+    return x
+
+  events = await _run(
+      _function_calls(('set_state', 1), ('set_state', 2)), [set_state]
+  )
+
+  assert events[1].actions.state_delta == {'key_1': 1, 'key_2': 2, 'last': 2}
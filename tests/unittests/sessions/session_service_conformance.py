@@ -0,0 +1,151 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The conformance workload of the session services.
+
+Every operation of `BaseSessionService` is run on a synthetic session, and its
+results are checked. The session service tests run it on every backend, so a
+new backend must pass it, and the session service benchmark measures it.
+"""
+
+import contextlib
+from typing import Callable
+from typing import ContextManager
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import BaseSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+
+APP_NAME = 'benchmark_app'
+USER_ID = 'user'
+_NUM_RECENT_EVENTS = 10
+_NUM_READS = 20
+
+OPERATIONS = [
+    'create_session',
+    'append_event',
+    'get_session',
+    'get_session(num_recent_events)',
+    'get_session(after_timestamp)',
+    'iter_events',
+    'list_sessions',
+    'delete_session',
+]
+
+
+def make_event(i: int) -> Event:
+  return Event(
+      author='agent',
+      invocation_id=f'invocation_{i // 4}',
+      content=types.Content(
+          role='model', parts=[types.Part(text=f'response {i} ' * 20)]
+      ),
+      actions=EventActions(state_delta={'turn': i}),
+  )
+
+
+async def run_workload(
+    service: BaseSessionService,
+    num_events: int,
+    measure: Callable[[str], ContextManager[None]] = (
+        lambda operation: contextlib.nullcontext()
+    ),
+) -> None:
+  """Runs every operation on a session of `num_events` events.
+
+  Args:
+    service: The session service to run the operations on.
+    num_events: The number of events of the synthetic session.
+    measure: Returns the context manager wrapping each call of the given
+      operation, e.g. to record its latency.
+
+  Raises:
+    AssertionError: If an operation does not behave as specified by
+      `BaseSessionService`.
+  """
+  with measure('create_session'):
+    session = await service.create_session(
+        app_name=APP_NAME, user_id=USER_ID, state={'initial': True}
+    )
+  assert session.id
+  assert session.state == {'initial': True}
+
+  events = [make_event(i) for i in range(num_events)]
+  for event in events:
+    with measure('append_event'):
+      await service.append_event(session, event)
+  event_ids = [event.id for event in events]
+
+  for _ in range(_NUM_READS):
+    with measure('get_session'):
+      fetched = await service.get_session(
+          app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+      )
+  assert [event.id for event in fetched.events] == event_ids
+  expected_state = {'initial': True}
+  if num_events:
+    expected_state['turn'] = num_events - 1
+  assert fetched.state == expected_state
+
+  for _ in range(_NUM_READS):
+    with measure('get_session(num_recent_events)'):
+      fetched = await service.get_session(
+          app_name=APP_NAME,
+          user_id=USER_ID,
+          session_id=session.id,
+          config=GetSessionConfig(num_recent_events=_NUM_RECENT_EVENTS),
+      )
+  assert [event.id for event in fetched.events] == event_ids[
+      -_NUM_RECENT_EVENTS:
+  ]
+
+  if events:
+    after_timestamp = events[-min(num_events, _NUM_RECENT_EVENTS)].timestamp
+    for _ in range(_NUM_READS):
+      with measure('get_session(after_timestamp)'):
+        fetched = await service.get_session(
+            app_name=APP_NAME,
+            user_id=USER_ID,
+            session_id=session.id,
+            config=GetSessionConfig(after_timestamp=after_timestamp),
+        )
+    assert [event.id for event in fetched.events] == event_ids[
+        -_NUM_RECENT_EVENTS:
+    ]
+
+  with measure('iter_events'):
+    iterated_ids = [
+        event.id
+        async for event in service.iter_events(
+            app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+        )
+    ]
+  assert iterated_ids == event_ids
+
+  for _ in range(_NUM_READS):
+    with measure('list_sessions'):
+      response = await service.list_sessions(app_name=APP_NAME, user_id=USER_ID)
+  listed = [s for s in response.sessions if s.id == session.id]
+  assert len(listed) == 1
+  assert not listed[0].events
+
+  with measure('delete_session'):
+    await service.delete_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+    )
+  assert not await service.get_session(
+      app_name=APP_NAME, user_id=USER_ID, session_id=session.id
+  )
@@ -0,0 +1,189 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import CachingSessionService
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+import pytest
+
+
+def _event(i: int) -> Event:
+  return Event(
+      invocation_id='invocation',
+      author='agent',
+      actions=EventActions(state_delta={'turn': i}),
+  )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'delegate_factory',
+    [InMemorySessionService, lambda: DatabaseSessionService('sqlite://')],
+)
+async def test_fetches_only_new_events(delegate_factory):
+  delegate = delegate_factory()
+  session_service = CachingSessionService(delegate)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  for i in range(3):
+    await session_service.append_event(session, _event(i))
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  # Another writer appends to the session without going through the cache.
+  other_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  await delegate.append_event(other_session, _event(3))
+
+  with mock.patch.object(
+      delegate, 'get_session', wraps=delegate.get_session
+  ) as get_session:
+    fetched_session = await session_service.get_session(
+        app_name='my_app', user_id='user', session_id=session.id
+    )
+
+  config = get_session.call_args.kwargs['config']
+  assert config.after_timestamp == session.events[-1].timestamp
+  assert [e.id for e in fetched_session.events] == [
+      e.id for e in other_session.events
+  ]
+  assert fetched_session.state == {'turn': 3}
+  assert fetched_session.last_update_time == other_session.last_update_time
+  assert session_service.num_hits == 2
+
+  # The returned session can be appended to.
+  await session_service.append_event(fetched_session, _event(4))
+  fetched_session = await session_service.get_session(
+      app_name='my_app',
+      user_id='user',
+      session_id=session.id,
+      config=GetSessionConfig(num_recent_events=2),
+  )
+  assert [e.actions.state_delta['turn'] for e in fetched_session.events] == [
+      3,
+      4,
+  ]
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used_sessions():
+  delegate = InMemorySessionService()
+  session_service = CachingSessionService(delegate, max_sessions=1)
+  session_1 = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  await session_service.create_session(app_name='my_app', user_id='user')
+
+  assert await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session_1.id
+  )
+  assert session_service.num_misses == 1
+
+
+@pytest.mark.asyncio
+async def test_delete_session_invalidates_cache():
+  session_service = CachingSessionService(InMemorySessionService())
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+
+  await session_service.delete_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  assert not await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'delegate_factory',
+    [InMemorySessionService, lambda: DatabaseSessionService('sqlite://')],
+)
+async def test_keeps_events_of_other_writers_before_own_appends(
+    delegate_factory,
+):
+  delegate = delegate_factory()
+  session_service = CachingSessionService(delegate)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  other_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  # The other writer appends first, then the cached session is appended to.
+  await delegate.append_event(
+      other_session,
+      Event(
+          invocation_id='other',
+          author='agent',
+          actions=EventActions(state_delta={'other': True}),
+      ),
+  )
+  await session_service.append_event(session, _event(1))
+
+  fetched_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  stored_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert [e.id for e in fetched_session.events] == [
+      e.id for e in stored_session.events
+  ]
+  assert len(fetched_session.events) == 2
+  assert fetched_session.state == {'other': True, 'turn': 1}
+  assert fetched_session.version == stored_session.version
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'delegate_factory',
+    [InMemorySessionService, lambda: DatabaseSessionService('sqlite://')],
+)
+async def test_refetches_events_appended_out_of_timestamp_order(
+    delegate_factory,
+):
+  delegate = delegate_factory()
+  session_service = CachingSessionService(delegate)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  late_event = _event(0)
+  await session_service.append_event(session, _event(1))
+  await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  # Another writer appends an event created before the cached one.
+  other_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  await delegate.append_event(other_session, late_event)
+
+  fetched_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert late_event.id in {e.id for e in fetched_session.events}
+  assert session_service.num_misses == 1
@@ -0,0 +1,173 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import FileLogSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+import pytest
+
+
+def _event(i: int) -> Event:
+  return Event(
+      invocation_id=f'invocation_{i}',
+      author='agent',
+      actions=EventActions(
+          state_delta={'turn': i, 'user:turns': i + 1, 'temp:scratch': i}
+      ),
+  )
+
+
+@pytest.mark.asyncio
+async def test_sessions_survive_restart(tmp_path):
+  session_service = FileLogSessionService(str(tmp_path), checkpoint_interval=3)
+  session = await session_service.create_session(
+      app_name='my/app', user_id='user', state={'key': 'value'}
+  )
+  for i in range(5):
+    await session_service.append_event(session, _event(i))
+  session_service.close()
+
+  restarted_service = FileLogSessionService(str(tmp_path))
+  restored_session = await restarted_service.get_session(
+      app_name='my/app', user_id='user', session_id=session.id
+  )
+
+  assert [e.id for e in restored_session.events] == [
+      e.id for e in session.events
+  ]
+  assert restored_session.state == {
+      'key': 'value',
+      'turn': 4,
+      'user:turns': 5,
+  }
+  assert restored_session.last_update_time == session.last_update_time
+
+
+@pytest.mark.asyncio
+async def test_tail_read_only_decodes_recent_events(tmp_path):
+  session_service = FileLogSessionService(str(tmp_path))
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  for i in range(10):
+    await session_service.append_event(session, _event(i))
+
+  with mock.patch.object(
+      Event, 'model_validate_json', wraps=Event.model_validate_json
+  ) as model_validate_json:
+    recent_session = await session_service.get_session(
+        app_name='my_app',
+        user_id='user',
+        session_id=session.id,
+        config=GetSessionConfig(num_recent_events=2),
+    )
+
+  assert [e.id for e in recent_session.events] == [
+      e.id for e in session.events[-2:]
+  ]
+  assert model_validate_json.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_partial_record_is_truncated(tmp_path):
+  session_service = FileLogSessionService(str(tmp_path))
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  await session_service.append_event(session, _event(0))
+  session_service.close()
+  segment_path = session_service._segment_path('my_app', 'user', session.id)
+  with open(segment_path, 'ab') as f:
+    f.write(b'\x00\x00\x10\x00\x01')
+
+  restarted_service = FileLogSessionService(str(tmp_path))
+  restored_session = await restarted_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert len(restored_session.events) == 1
+
+  await restarted_service.append_event(restored_session, _event(1))
+  restarted_service.close()
+  restored_session = await FileLogSessionService(str(tmp_path)).get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert len(restored_session.events) == 2
+
+
+@pytest.mark.asyncio
+async def test_compact_session_archives_events(tmp_path):
+  session_service = FileLogSessionService(str(tmp_path), checkpoint_interval=3)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', state={'key': 'value'}
+  )
+  for i in range(6):
+    await session_service.append_event(session, _event(i))
+
+  async def summarize(events):
+    return Event(invocation_id='summary', author='user')
+
+  await session_service.compact_session(
+      session, keep_recent_events=2, summarizer=summarize
+  )
+  await session_service.append_event(session, _event(6))
+  session_service.close()
+
+  restored_session = await FileLogSessionService(str(tmp_path)).get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert [e.id for e in restored_session.events] == [
+      e.id for e in session.events
+  ]
+  assert len(restored_session.events) == 4
+  assert restored_session.events[0].invocation_id == 'summary'
+  assert restored_session.state == {
+      'key': 'value',
+      'turn': 6,
+      'user:turns': 7,
+  }
+  segment_path = session_service._segment_path('my_app', 'user', session.id)
+  with open(segment_path + '.archive', 'rb') as f:
+    assert f.read().count(b'"invocation_id":"invocation_') == 4
+
+
+@pytest.mark.asyncio
+async def test_events_after_timestamp_with_unordered_timestamps(tmp_path):
+  session_service = FileLogSessionService(str(tmp_path))
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  for timestamp in [1.0, 3.0, 2.0, 4.0]:
+    await session_service.append_event(
+        session, Event(author='agent', timestamp=timestamp)
+    )
+  session_service.close()
+
+  for service in [session_service, FileLogSessionService(str(tmp_path))]:
+    recent_session = await service.get_session(
+        app_name='my_app',
+        user_id='user',
+        session_id=session.id,
+        config=GetSessionConfig(after_timestamp=3.0),
+    )
+    # The event appended with an older timestamp is read with its neighbours.
+    assert [e.timestamp for e in recent_session.events] == [3.0, 2.0, 4.0]
+    assert [
+        e.timestamp
+        async for e in service.iter_events(
+            app_name='my_app', user_id='user', session_id=session.id, after=3.0
+        )
+    ] == [3.0, 2.0, 4.0]
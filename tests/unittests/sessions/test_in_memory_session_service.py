@@ -0,0 +1,232 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from concurrent import futures
+import sys
+from unittest import mock
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import InMemorySessionService
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used_sessions():
+  evicted_sessions = []
+  session_service = InMemorySessionService(
+      max_sessions=2, on_evict=evicted_sessions.append
+  )
+  for session_id in ['s1', 's2']:
+    await session_service.create_session(
+        app_name='my_app', user_id='user', session_id=session_id
+    )
+  # Makes s1 the most recently used session.
+  assert await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+
+  await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s3'
+  )
+
+  assert [session.id for session in evicted_sessions] == ['s2']
+  assert not await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s2'
+  )
+  assert await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  assert session_service.num_evictions == 1
+  assert session_service.num_hits == 2
+  assert session_service.num_misses == 1
+
+
+@pytest.mark.asyncio
+async def test_evicts_sessions_over_event_budget():
+  session_service = InMemorySessionService(max_events=3)
+  session_1 = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  session_2 = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s2'
+  )
+  for _ in range(2):
+    await session_service.append_event(session_1, Event(author='user'))
+  for _ in range(2):
+    await session_service.append_event(session_2, Event(author='user'))
+
+  assert session_service.num_evictions == 1
+  assert not await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+
+  # The most recently used session is kept even if it exceeds the budget.
+  for _ in range(3):
+    await session_service.append_event(session_2, Event(author='user'))
+  session_2 = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s2'
+  )
+  assert len(session_2.events) == 5
+
+
+@pytest.mark.asyncio
+async def test_evicts_idle_sessions():
+  session_service = InMemorySessionService(session_ttl=60)
+  with mock.patch('time.monotonic', return_value=1000):
+    session = await session_service.create_session(
+        app_name='my_app', user_id='user'
+    )
+    await session_service.append_event(
+        session,
+        Event(author='user', actions=EventActions(state_delta={'user:k': 1})),
+    )
+
+  with mock.patch('time.monotonic', return_value=1030):
+    assert await session_service.get_session(
+        app_name='my_app', user_id='user', session_id=session.id
+    )
+
+  with mock.patch('time.monotonic', return_value=1100):
+    assert not await session_service.get_session(
+        app_name='my_app', user_id='user', session_id=session.id
+    )
+    assert not (
+        await session_service.list_sessions(app_name='my_app', user_id='user')
+    ).sessions
+    # User state outlives the evicted sessions.
+    new_session = await session_service.create_session(
+        app_name='my_app', user_id='user'
+    )
+    assert new_session.state == {'user:k': 1}
+
+
+@pytest.fixture
+def frequent_thread_switches():
+  """Makes the threads switch as often as possible, to expose races."""
+  switch_interval = sys.getswitchinterval()
+  sys.setswitchinterval(1e-6)
+  yield
+  sys.setswitchinterval(switch_interval)
+
+
+@pytest.mark.usefixtures('frequent_thread_switches')
+def test_concurrent_turns_on_one_session():
+  session_service = InMemorySessionService()
+  session = session_service.create_session_sync(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  num_threads = 8
+  num_events = 200
+
+  async def run_turns(thread_index: int):
+    # Each thread runs its own event loop, as `Runner.run` does.
+    for i in range(num_events):
+      await session_service.append_event(
+          session,
+          Event(
+              author=f'agent_{thread_index}',
+              actions=EventActions(
+                  state_delta={'last': (thread_index, i), 'user:last': i}
+              ),
+          ),
+      )
+
+  with futures.ThreadPoolExecutor(num_threads) as executor:
+    list(
+        executor.map(
+            lambda thread_index: asyncio.run(run_turns(thread_index)),
+            range(num_threads),
+        )
+    )
+
+  stored_session = session_service.get_session_sync(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  for fetched_session in [session, stored_session]:
+    assert len(fetched_session.events) == num_threads * num_events
+    # The state matches the order of the events.
+    assert (
+        fetched_session.state['last']
+        == fetched_session.events[-1].actions.state_delta['last']
+    )
+    for thread_index in range(num_threads):
+      assert [
+          event.actions.state_delta['last'][1]
+          for event in fetched_session.events
+          if event.author == f'agent_{thread_index}'
+      ] == list(range(num_events))
+  assert stored_session.state['user:last'] == num_events - 1
+  assert session_service._num_events == num_threads * num_events
+
+
+@pytest.mark.usefixtures('frequent_thread_switches')
+def test_concurrent_sessions_with_evictions():
+  evicted_sessions = []
+  session_service = InMemorySessionService(
+      max_sessions=20, on_evict=evicted_sessions.append
+  )
+  num_threads = 8
+
+  async def run_sessions(thread_index: int):
+    user_id = f'user_{thread_index % 4}'
+    for i in range(50):
+      session = await session_service.create_session(
+          app_name='my_app', user_id=user_id
+      )
+      # Many sessions are interleaved on the event loop of each thread.
+      await asyncio.gather(*[
+          session_service.append_event(
+              session,
+              Event(
+                  author='user', actions=EventActions(state_delta={'turn': j})
+              ),
+          )
+          for j in range(5)
+      ])
+      await session_service.list_sessions(app_name='my_app', user_id=user_id)
+      fetched_session = await session_service.get_session(
+          app_name='my_app', user_id=user_id, session_id=session.id
+      )
+      if fetched_session:
+        assert len(fetched_session.events) <= 5
+      if i % 3 == 0:
+        await session_service.delete_session(
+            app_name='my_app', user_id=user_id, session_id=session.id
+        )
+
+  with futures.ThreadPoolExecutor(num_threads) as executor:
+    list(
+        executor.map(
+            lambda thread_index: asyncio.run(run_sessions(thread_index)),
+            range(num_threads),
+        )
+    )
+
+  stored_keys = {
+      (app_name, user_id, session_id)
+      for app_name, users in session_service.sessions.items()
+      for user_id, sessions in users.items()
+      for session_id in sessions
+  }
+  assert len(stored_keys) <= 20
+  assert set(session_service._access_times) == stored_keys
+  assert session_service._num_events == sum(
+      len(session.events)
+      for users in session_service.sessions.values()
+      for sessions in users.values()
+      for session in sessions.values()
+  )
+  assert len(evicted_sessions) == session_service.num_evictions
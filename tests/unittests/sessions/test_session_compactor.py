@@ -0,0 +1,247 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+from google.adk.agents import Agent
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import LlmEventSummarizer
+from google.adk.sessions import Session
+from google.adk.sessions import SessionCompactor
+from google.adk.sessions.database_session_service import StorageArchivedEvent
+from google.genai import types
+import pytest
+
+from .. import utils
+
+
+def _text_event(i: int) -> Event:
+  return Event(
+      invocation_id=f'invocation_{i}',
+      author='user' if i % 2 == 0 else 'agent',
+      content=types.Content(parts=[types.Part(text=f'message {i}')]),
+  )
+
+
+async def _create_session(session_service, num_events: int):
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', state={'key': 'value'}
+  )
+  for i in range(num_events):
+    await session_service.append_event(session, _text_event(i))
+  return session
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'session_service_factory',
+    [InMemorySessionService, lambda: DatabaseSessionService('sqlite://')],
+)
+async def test_compact_session_with_summary(session_service_factory):
+  session_service = session_service_factory()
+  session = await _create_session(session_service, 6)
+
+  async def summarize(events):
+    return Event(
+        invocation_id='summary',
+        author='user',
+        content=types.Content(
+            parts=[types.Part(text=f'summary of {len(events)} events')]
+        ),
+    )
+
+  compacted_session = await session_service.compact_session(
+      session, keep_recent_events=2, summarizer=summarize
+  )
+
+  expected_texts = ['summary of 4 events', 'message 4', 'message 5']
+  assert [
+      e.content.parts[0].text for e in compacted_session.events
+  ] == expected_texts
+  stored_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert [
+      e.content.parts[0].text for e in stored_session.events
+  ] == expected_texts
+  assert stored_session.state == {'key': 'value'}
+
+  if isinstance(session_service, InMemorySessionService):
+    archived_events = session_service.archived_events[
+        ('my_app', 'user', session.id)
+    ]
+  else:
+    with session_service.database_session_factory() as sql_session:
+      archived_events = sql_session.query(StorageArchivedEvent).all()
+  assert len(archived_events) == 4
+
+  # The session can still be appended to.
+  await session_service.append_event(stored_session, _text_event(6))
+
+
+@pytest.mark.asyncio
+async def test_compact_session_keeps_function_call_with_response():
+  session_service = InMemorySessionService()
+  session = await _create_session(session_service, 3)
+  await session_service.append_event(
+      session,
+      Event(
+          invocation_id='invocation',
+          author='agent',
+          content=types.Content(
+              parts=[
+                  types.Part(
+                      function_call=types.FunctionCall(
+                          id='call', name='tool', args={}
+                      )
+                  )
+              ]
+          ),
+      ),
+  )
+  await session_service.append_event(
+      session,
+      Event(
+          invocation_id='invocation',
+          author='agent',
+          content=types.Content(
+              parts=[
+                  types.Part(
+                      function_response=types.FunctionResponse(
+                          id='call', name='tool', response={}
+                      )
+                  )
+              ]
+          ),
+      ),
+  )
+
+  await session_service.compact_session(session, keep_recent_events=1)
+
+  assert len(session.events) == 2
+  assert session.events[0].get_function_calls()
+
+
+@pytest.mark.asyncio
+async def test_compactor_compacts_in_background():
+  session_service = InMemorySessionService()
+  session = await _create_session(session_service, 5)
+  compactor = SessionCompactor(
+      session_service,
+      max_events=4,
+      keep_recent_events=2,
+      summarizer=LlmEventSummarizer(
+          utils.MockModel.create(responses=['the summary'])
+      ),
+  )
+
+  assert not compactor.maybe_compact(session.model_copy(update={'events': []}))
+  await compactor.maybe_compact(session)
+
+  stored_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert len(stored_session.events) == 3
+  assert 'the summary' in stored_session.events[0].content.parts[0].text
+  assert 'message 2' in (
+      compactor.summarizer.llm.requests[-1].contents[0].parts[0].text
+  )
+
+
+class _RemoteArchivingSessionService(InMemorySessionService):
+  """Suspends while archiving, like a service writing to a remote store."""
+
+  async def archive_events(self, session, events, *, checkpoint_event=None):
+    await asyncio.sleep(0.01)
+    await super().archive_events(
+        session, events, checkpoint_event=checkpoint_event
+    )
+
+
+def test_compactor_finishes_on_sync_runner():
+  session_service = _RemoteArchivingSessionService()
+  mock_model = utils.MockModel.create(
+      responses=[f'response {i}' for i in range(3)]
+  )
+  runner = Runner(
+      app_name='my_app',
+      agent=Agent(name='root_agent', model=mock_model),
+      session_service=session_service,
+      session_compactor=SessionCompactor(
+          session_service, max_events=4, keep_recent_events=2
+      ),
+  )
+  session = session_service.create_session_sync(
+      app_name='my_app', user_id='user'
+  )
+
+  for i in range(3):
+    list(
+        runner.run(
+            user_id='user',
+            session_id=session.id,
+            new_message=types.Content(
+                role='user', parts=[types.Part(text=f'message {i}')]
+            ),
+        )
+    )
+
+  assert session_service.archived_events[('my_app', 'user', session.id)]
+  stored_session = session_service.get_session_sync(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert len(stored_session.events) <= 4
+
+
+class _NoArchivingSessionService(InMemorySessionService):
+
+  @property
+  def supports_archiving(self) -> bool:
+    return False
+
+
+@pytest.mark.asyncio
+async def test_compactor_skips_services_without_archiving():
+  session_service = _NoArchivingSessionService()
+  session = await _create_session(session_service, 5)
+  compactor = SessionCompactor(
+      session_service, max_events=4, keep_recent_events=2
+  )
+
+  assert compactor.should_compact(session)
+  assert not compactor.maybe_compact(session)
+
+
+def test_compactor_byte_threshold():
+  compactor = SessionCompactor(
+      InMemorySessionService(), max_bytes=1000, keep_recent_events=1
+  )
+  small_events = [_text_event(i) for i in range(2)]
+  large_events = small_events + [
+      Event(
+          invocation_id='invocation',
+          author='user',
+          content=types.Content(parts=[types.Part(text='x' * 1000)]),
+      )
+  ]
+
+  assert not compactor.should_compact(
+      Session(id='s', app_name='my_app', user_id='user', events=small_events)
+  )
+  assert compactor.should_compact(
+      Session(id='s', app_name='my_app', user_id='user', events=large_events)
+  )
@@ -12,20 +12,36 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import enum
-import pytest
+import json
+import pickle
+import tempfile
+from unittest import mock
 
 from google.adk.events import Event
 from google.adk.events import EventActions
 from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import FileLogSessionService
 from google.adk.sessions import InMemorySessionService
 from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.base_session_service import ListSessionsConfig
+from google.adk.sessions.database_session_service import SessionConflictError
+from google.adk.sessions.database_session_service import StorageEvent
+from google.adk.sessions.database_session_service import StorageEventBlob
+from google.adk.sessions.database_session_service import StorageSession
 from google.genai import types
+import pytest
+import sqlalchemy
+
+from . import session_service_conformance
 
 
 class SessionServiceType(enum.Enum):
   IN_MEMORY = 'IN_MEMORY'
   DATABASE = 'DATABASE'
+  ASYNC_DATABASE = 'ASYNC_DATABASE'
+  FILE_LOG = 'FILE_LOG'
 
 
 def get_session_service(
@@ -34,12 +50,22 @@ def get_session_service(
   """Creates a session service for testing."""
   if service_type == SessionServiceType.DATABASE:
     return DatabaseSessionService('sqlite:///:memory:')
+  if service_type == SessionServiceType.ASYNC_DATABASE:
+    return DatabaseSessionService('sqlite+aiosqlite:///:memory:')
+  if service_type == SessionServiceType.FILE_LOG:
+    return FileLogSessionService(tempfile.mkdtemp())
   return InMemorySessionService()
 
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+    'service_type',
+    [
+        SessionServiceType.IN_MEMORY,
+        SessionServiceType.DATABASE,
+        SessionServiceType.ASYNC_DATABASE,
+        SessionServiceType.FILE_LOG,
+    ],
 )
 async def test_get_empty_session(service_type):
   session_service = get_session_service(service_type)
@@ -50,7 +76,13 @@ async def test_get_empty_session(service_type):
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+    'service_type',
+    [
+        SessionServiceType.IN_MEMORY,
+        SessionServiceType.DATABASE,
+        SessionServiceType.ASYNC_DATABASE,
+        SessionServiceType.FILE_LOG,
+    ],
 )
 async def test_create_get_session(service_type):
   session_service = get_session_service(service_type)
@@ -87,7 +119,13 @@ async def test_create_get_session(service_type):
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+    'service_type',
+    [
+        SessionServiceType.IN_MEMORY,
+        SessionServiceType.DATABASE,
+        SessionServiceType.ASYNC_DATABASE,
+        SessionServiceType.FILE_LOG,
+    ],
 )
 async def test_create_and_list_sessions(service_type):
   session_service = get_session_service(service_type)
@@ -110,7 +148,69 @@ async def test_create_and_list_sessions(service_type):
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+    'service_type',
+    [
+        SessionServiceType.IN_MEMORY,
+        SessionServiceType.DATABASE,
+        SessionServiceType.ASYNC_DATABASE,
+        SessionServiceType.FILE_LOG,
+    ],
+)
+async def test_list_sessions_with_pagination(service_type):
+  session_service = get_session_service(service_type)
+  app_name = 'my_app'
+  user_id = 'test_user'
+  for i in range(5):
+    session = await session_service.create_session(
+        app_name=app_name, user_id=user_id, session_id=f'session{i}'
+    )
+  await session_service.create_session(
+      app_name=app_name, user_id='other_user', session_id='session5'
+  )
+
+  pages = []
+  config = ListSessionsConfig(page_size=2)
+  for _ in range(5):
+    response = await session_service.list_sessions(
+        app_name=app_name, user_id=user_id, config=config
+    )
+    pages.append([session.id for session in response.sessions])
+    if not response.next_page_token:
+      break
+    config = ListSessionsConfig(
+        page_size=2, page_token=response.next_page_token
+    )
+
+  assert pages == [
+      ['session4', 'session3'],
+      ['session2', 'session1'],
+      ['session0'],
+  ]
+
+  response = await session_service.list_sessions(
+      app_name=app_name,
+      user_id=user_id,
+      config=ListSessionsConfig(updated_after=session.last_update_time + 60),
+  )
+  assert not response.sessions
+  response = await session_service.list_sessions(
+      app_name=app_name,
+      user_id=user_id,
+      config=ListSessionsConfig(updated_after=session.last_update_time - 60),
+  )
+  assert len(response.sessions) == 5
+  assert not response.next_page_token
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'service_type',
+    [
+        SessionServiceType.IN_MEMORY,
+        SessionServiceType.DATABASE,
+        SessionServiceType.ASYNC_DATABASE,
+        SessionServiceType.FILE_LOG,
+    ],
 )
 async def test_session_state(service_type):
   session_service = get_session_service(service_type)
@@ -190,7 +290,13 @@ async def test_session_state(service_type):
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+    'service_type',
+    [
+        SessionServiceType.IN_MEMORY,
+        SessionServiceType.DATABASE,
+        SessionServiceType.ASYNC_DATABASE,
+        SessionServiceType.FILE_LOG,
+    ],
 )
 async def test_create_new_session_will_merge_states(service_type):
   session_service = get_session_service(service_type)
@@ -236,7 +342,13 @@ async def test_create_new_session_will_merge_states(service_type):
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+    'service_type',
+    [
+        SessionServiceType.IN_MEMORY,
+        SessionServiceType.DATABASE,
+        SessionServiceType.ASYNC_DATABASE,
+        SessionServiceType.FILE_LOG,
+    ],
 )
 async def test_append_event_bytes(service_type):
   session_service = get_session_service(service_type)
@@ -276,7 +388,13 @@ async def test_append_event_bytes(service_type):
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
+    'service_type',
+    [
+        SessionServiceType.IN_MEMORY,
+        SessionServiceType.DATABASE,
+        SessionServiceType.ASYNC_DATABASE,
+        SessionServiceType.FILE_LOG,
+    ],
 )
 async def test_append_event_complete(service_type):
   session_service = get_session_service(service_type)
@@ -315,7 +433,9 @@ async def test_append_event_complete(service_type):
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize('service_type', [SessionServiceType.IN_MEMORY])
+@pytest.mark.parametrize(
+    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.FILE_LOG]
+)
 async def test_get_session_with_config(service_type):
   session_service = get_session_service(service_type)
   app_name = 'my_app'
@@ -374,3 +494,470 @@ async def test_get_session_with_config(service_type):
   )
   events = session.events
   assert len(events) == num_test_events - after_timestamp + 1
+
+
+@pytest.mark.asyncio
+async def test_async_database_concurrent_sessions(tmp_path):
+  # In-memory SQLite shares a single connection, use a file for concurrency.
+  session_service = DatabaseSessionService(
+      f'sqlite+aiosqlite:///{tmp_path / "sessions.db"}'
+  )
+  app_name = 'my_app'
+  num_sessions = 10
+  num_events = 5
+
+  sessions = [
+      await session_service.create_session(
+          app_name=app_name, user_id=f'user{i}'
+      )
+      for i in range(num_sessions)
+  ]
+
+  async def run_turns(session):
+    for i in range(num_events):
+      await session_service.append_event(
+          session,
+          Event(
+              author='user',
+              invocation_id=f'invocation{i}',
+              actions=EventActions(state_delta={'count': i}),
+          ),
+      )
+
+  await asyncio.gather(*[run_turns(session) for session in sessions])
+
+  for session in sessions:
+    stored_session = await session_service.get_session(
+        app_name=app_name, user_id=session.user_id, session_id=session.id
+    )
+    assert len(stored_session.events) == num_events
+    assert stored_session.state['count'] == num_events - 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'service_type',
+    [
+        SessionServiceType.IN_MEMORY,
+        SessionServiceType.DATABASE,
+        SessionServiceType.ASYNC_DATABASE,
+        SessionServiceType.FILE_LOG,
+    ],
+)
+async def test_get_session_with_num_recent_events(service_type):
+  session_service = get_session_service(service_type)
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session = await session_service.create_session(
+      app_name=app_name, user_id=user_id
+  )
+  for i in range(1, 6):
+    await session_service.append_event(
+        session, Event(author='user', invocation_id=f'invocation{i}')
+    )
+
+  session = await session_service.get_session(
+      app_name=app_name,
+      user_id=user_id,
+      session_id=session.id,
+      config=GetSessionConfig(num_recent_events=3),
+  )
+  # The newest events are returned in chronological order.
+  assert [event.invocation_id for event in session.events] == [
+      'invocation3',
+      'invocation4',
+      'invocation5',
+  ]
+
+
+def test_database_session_service_migrates_events_index(tmp_path):
+  db_url = f'sqlite:///{tmp_path / "sessions.db"}'
+  index_name = 'ix_events_app_name_user_id_session_id_timestamp'
+  DatabaseSessionService(db_url)
+
+  # Simulates a table created before the index was introduced.
+  engine = sqlalchemy.create_engine(db_url)
+  with engine.begin() as connection:
+    connection.execute(sqlalchemy.text(f'DROP INDEX {index_name}'))
+
+  session_service = DatabaseSessionService(db_url)
+
+  indexes = sqlalchemy.inspect(session_service.db_engine).get_indexes('events')
+  assert index_name in [index['name'] for index in indexes]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
+async def test_iter_events(service_type):
+  session_service = get_session_service(service_type)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  events = [
+      Event(author='user', invocation_id=f'invocation{i}') for i in range(25)
+  ]
+  for event in events:
+    await session_service.append_event(session, event)
+
+  iterated_events = [
+      event
+      async for event in session_service.iter_events(
+          app_name='my_app', user_id='user', session_id=session.id, batch_size=7
+      )
+  ]
+  assert [e.id for e in iterated_events] == [e.id for e in events]
+
+  iterated_events = [
+      event
+      async for event in session_service.iter_events(
+          app_name='my_app',
+          user_id='user',
+          session_id=session.id,
+          after=events[20].timestamp,
+          batch_size=2,
+      )
+  ]
+  assert [e.id for e in iterated_events] == [e.id for e in events[20:]]
+
+  assert not [
+      event
+      async for event in session_service.iter_events(
+          app_name='my_app', user_id='user', session_id='missing'
+      )
+  ]
+
+
+@pytest.mark.asyncio
+async def test_database_iter_events_reads_batches():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  for i in range(10):
+    await session_service.append_event(
+        session, Event(author='user', invocation_id=f'invocation{i}')
+    )
+  statements = []
+  sqlalchemy.event.listen(
+      session_service.db_engine,
+      'before_cursor_execute',
+      lambda conn, cursor, statement, *args: statements.append(statement),
+  )
+
+  events = [
+      event
+      async for event in session_service.iter_events(
+          app_name='my_app', user_id='user', session_id=session.id, batch_size=4
+      )
+  ]
+
+  assert len(events) == 10
+  event_queries = [
+      s for s in statements if s.startswith('SELECT') and 'FROM events' in s
+  ]
+  assert len(event_queries) == 3
+  assert all('LIMIT' in s for s in event_queries)
+
+
+def _state_event(state_delta: dict) -> Event:
+  return Event(
+      author='user',
+      invocation_id='invocation',
+      actions=EventActions(state_delta=state_delta),
+  )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'service_type',
+    [SessionServiceType.DATABASE, SessionServiceType.ASYNC_DATABASE],
+)
+async def test_concurrent_appends_are_rebased(service_type):
+  session_service = get_session_service(service_type)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', state={'shared': 0}
+  )
+  first = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  second = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  await session_service.append_event(first, _state_event({'first': 1}))
+  await session_service.append_event(second, _state_event({'second': 2}))
+
+  assert second.state == {'shared': 0, 'first': 1, 'second': 2}
+  assert second.version == first.version + 1
+  stored_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert stored_session.state == {'shared': 0, 'first': 1, 'second': 2}
+  assert len(stored_session.events) == 2
+  assert stored_session.version == second.version
+
+
+@pytest.mark.asyncio
+async def test_conflicting_concurrent_appends_raise():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', state={'shared': 0}
+  )
+  stale_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  await session_service.append_event(session, _state_event({'shared': 1}))
+
+  with pytest.raises(SessionConflictError, match='shared'):
+    await session_service.append_event(
+        stale_session, _state_event({'shared': 2})
+    )
+
+  stored_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert stored_session.state == {'shared': 1}
+  assert len(stored_session.events) == 1
+
+
+@pytest.mark.asyncio
+async def test_append_event_retries_on_concurrent_update():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+
+  def bump_version(db_session, flush_context, instances):
+    # Simulates another writer updating the row after it was read.
+    db_session.execute(
+        sqlalchemy.update(StorageSession)
+        .values(version=StorageSession.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+
+  sqlalchemy.event.listen(
+      session_service.database_session_factory,
+      'before_flush',
+      bump_version,
+      once=True,
+  )
+  with mock.patch.object(
+      session_service,
+      '_try_append_events',
+      wraps=session_service._try_append_events,
+  ) as try_append_events:
+    await session_service.append_event(session, _state_event({'key': 'value'}))
+
+  assert try_append_events.call_count == 2
+
+  stored_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert stored_session.state == {'key': 'value'}
+  assert len(stored_session.events) == 1
+
+
+def test_database_session_service_migrates_session_version(tmp_path):
+  db_url = f'sqlite:///{tmp_path / "sessions.db"}'
+  DatabaseSessionService(db_url)
+
+  # Simulates a table created before the version was introduced.
+  engine = sqlalchemy.create_engine(db_url)
+  with engine.begin() as connection:
+    connection.execute(
+        sqlalchemy.text('DROP INDEX ix_sessions_app_name_user_id_update_time')
+    )
+    connection.execute(
+        sqlalchemy.text('ALTER TABLE sessions DROP COLUMN version')
+    )
+
+  session_service = DatabaseSessionService(db_url)
+
+  columns = sqlalchemy.inspect(session_service.db_engine).get_columns(
+      'sessions'
+  )
+  assert 'version' in [column['name'] for column in columns]
+
+
+@pytest.mark.asyncio
+async def test_append_event_only_writes_touched_state_rows():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  statements = []
+
+  @sqlalchemy.event.listens_for(
+      session_service.db_engine, 'before_cursor_execute'
+  )
+  def record_statement(conn, cursor, statement, *args):
+    statements.append(statement)
+
+  await session_service.append_event(
+      session,
+      Event(
+          author='user',
+          invocation_id='invocation',
+          actions=EventActions(state_delta={'key': 'value'}),
+      ),
+  )
+  assert not [s for s in statements if s.startswith('UPDATE app_states')]
+  assert not [s for s in statements if s.startswith('UPDATE user_states')]
+
+  statements.clear()
+  await session_service.append_event(
+      session,
+      Event(
+          author='user',
+          invocation_id='invocation',
+          actions=EventActions(state_delta={'user:key': 'value'}),
+      ),
+  )
+  assert not [s for s in statements if s.startswith('UPDATE app_states')]
+  assert [s for s in statements if s.startswith('UPDATE user_states')]
+
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert session.state == {'key': 'value', 'user:key': 'value'}
+
+
+@pytest.mark.asyncio
+async def test_database_session_service_migrates_pickled_event_actions():
+  session_service = get_session_service(SessionServiceType.DATABASE)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  actions = EventActions(
+      state_delta={'key': 'value'}, artifact_delta={'file': 1}, escalate=True
+  )
+  event = Event(author='user', invocation_id='invocation', actions=actions)
+  await session_service.append_event(session, event)
+
+  # Rewrites the event as pickled by earlier versions.
+  raw_actions = sqlalchemy.type_coerce(
+      StorageEvent.actions, sqlalchemy.LargeBinary
+  )
+  with session_service.database_session_factory() as sql_session:
+    sql_session.execute(
+        sqlalchemy.update(StorageEvent).values(
+            {raw_actions: pickle.dumps(actions)}
+        )
+    )
+    sql_session.commit()
+
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert session.events[0].actions == actions
+
+  assert await session_service.migrate_event_actions() == 1
+  assert await session_service.migrate_event_actions() == 0
+  with session_service.database_session_factory() as sql_session:
+    stored_actions = sql_session.execute(
+        sqlalchemy.select(raw_actions)
+    ).scalar()
+  assert json.loads(stored_actions)['actions']['artifactDelta'] == {'file': 1}
+
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert session.events[0].actions == actions
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'db_url', ['sqlite:///:memory:', 'sqlite+aiosqlite:///:memory:']
+)
+async def test_append_event_bytes_as_blobs(db_url):
+  session_service = DatabaseSessionService(
+      db_url, store_inline_data_as_blobs=True
+  )
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session = await session_service.create_session(
+      app_name=app_name, user_id=user_id
+  )
+  content = types.Content(
+      role='user',
+      parts=[
+          types.Part.from_bytes(data=b'test_image_data', mime_type='image/png'),
+          types.Part(text='text'),
+          types.Part.from_bytes(data=b'test_audio_data', mime_type='audio/pcm'),
+      ],
+  )
+  await session_service.append_event(
+      session, Event(invocation_id='invocation', author='user', content=content)
+  )
+  # Events without blobs are stored as before.
+  await session_service.append_event(
+      session,
+      Event(
+          invocation_id='invocation',
+          author='user',
+          content=types.Content(role='user', parts=[types.Part(text='text')]),
+      ),
+  )
+
+  session = await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert session.events[0].content == content
+  assert session.events[1].content.parts[0].text == 'text'
+
+  def read_storage(sql_session):
+    storage_event = sql_session.get(
+        StorageEvent,
+        (session.events[0].id, app_name, user_id, session.id),
+    )
+    storage_blobs = sql_session.query(StorageEventBlob).all()
+    return storage_event.content, [blob.data for blob in storage_blobs]
+
+  stored_content, stored_blobs = await session_service._run(read_storage)
+  assert 'data' not in stored_content['parts'][0]['inline_data']
+  assert stored_blobs == [b'test_image_data', b'test_audio_data']
+
+
+@pytest.mark.asyncio
+async def test_in_memory_session_snapshots_are_isolated():
+  session_service = get_session_service(SessionServiceType.IN_MEMORY)
+  app_name = 'my_app'
+  user_id = 'user'
+  session = await session_service.create_session(
+      app_name=app_name, user_id=user_id, state={'key': {'nested': 'value'}}
+  )
+  event = Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text='text')]),
+  )
+  await session_service.append_event(session, event)
+
+  # Changes to a returned session, including its events, don't reach the
+  # storage.
+  snapshot = await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  snapshot.events[0].content.parts[0].text = 'changed'
+  snapshot.events.append(Event(author='user'))
+  snapshot.state['key']['nested'] = 'changed'
+  snapshot.state['other_key'] = 'value'
+
+  session = await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id
+  )
+  assert len(session.events) == 1
+  assert session.events[0].content.parts[0].text == 'text'
+  assert session.state == {'key': {'nested': 'value'}}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
+@pytest.mark.parametrize('num_events', [0, 1, 25])
+async def test_session_service_conformance(service_type, num_events):
+  """Every backend must pass the conformance workload."""
+  await session_service_conformance.run_workload(
+      get_session_service(service_type), num_events
+  )
@@ -0,0 +1,135 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import io
+import json
+from unittest import mock
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.session_transfer import export_sessions
+from google.adk.sessions.session_transfer import import_sessions
+from google.genai import types
+import pytest
+
+
+async def _populate(session_service):
+  for user_id in ['alice', 'bob']:
+    for i in range(3):
+      session = await session_service.create_session(
+          app_name='my_app',
+          user_id=user_id,
+          session_id=f'{user_id}-{i}',
+          state={'initial': i},
+      )
+      for turn in range(4):
+        await session_service.append_event(
+            session,
+            Event(
+                invocation_id=f'invocation-{turn}',
+                author='user',
+                content=types.Content(
+                    role='user', parts=[types.Part(text=f'turn {turn}')]
+                ),
+                actions=EventActions(
+                    state_delta={
+                        'turn': turn,
+                        'app:counter': i * 10 + turn,
+                        'user:last_session': session.id,
+                    }
+                ),
+            ),
+        )
+
+
+@pytest.mark.asyncio
+async def test_export_and_import_round_trip():
+  source = InMemorySessionService()
+  await _populate(source)
+  output = io.StringIO()
+
+  export_stats = await export_sessions(
+      source, output, app_name='my_app', user_ids=['alice', 'bob']
+  )
+
+  assert export_stats.num_sessions == 6
+  assert export_stats.num_events == 24
+  lines = output.getvalue().splitlines()
+  assert len(lines) == 30
+  assert all(json.loads(line)['type'] in ('session', 'event') for line in lines)
+
+  destination = DatabaseSessionService('sqlite:///:memory:')
+  import_stats = await import_sessions(destination, lines, batch_size=3)
+
+  assert import_stats.num_sessions == 6
+  assert import_stats.num_events == 24
+  assert import_stats.events_per_second > 0
+  for user_id in ['alice', 'bob']:
+    for i in range(3):
+      session_id = f'{user_id}-{i}'
+      expected = await source.get_session(
+          app_name='my_app', user_id=user_id, session_id=session_id
+      )
+      imported = await destination.get_session(
+          app_name='my_app', user_id=user_id, session_id=session_id
+      )
+      assert imported.state == expected.state
+      assert [e.id for e in imported.events] == [e.id for e in expected.events]
+      assert imported.events[-1].content == expected.events[-1].content
+
+
+@pytest.mark.asyncio
+async def test_export_streams_events():
+  source = InMemorySessionService()
+  await _populate(source)
+  output = io.StringIO()
+
+  with mock.patch.object(
+      source, 'get_session', wraps=source.get_session
+  ) as get_session:
+    await export_sessions(source, output, app_name='my_app', user_ids=['bob'])
+
+  # Only the state is read through get_session.
+  for call in get_session.call_args_list:
+    assert call.kwargs['config'].num_recent_events == 1
+  assert len(output.getvalue().splitlines()) == 15
+
+
+@pytest.mark.asyncio
+async def test_import_under_another_app_name():
+  source = InMemorySessionService()
+  await _populate(source)
+  output = io.StringIO()
+  await export_sessions(source, output, app_name='my_app', user_ids=['alice'])
+
+  destination = InMemorySessionService()
+  await import_sessions(
+      destination, output.getvalue().splitlines(), app_name='engine'
+  )
+
+  imported = await destination.get_session(
+      app_name='engine', user_id='alice', session_id='alice-0'
+  )
+  assert len(imported.events) == 4
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_event_before_session():
+  with pytest.raises(ValueError, match='precedes any session record'):
+    await import_sessions(
+        InMemorySessionService(),
+        ['{"type": "event", "event": {"author": "user"}}'],
+    )
@@ -0,0 +1,74 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.state import State
+import pytest
+
+
+def test_changes_are_only_recorded_in_the_delta():
+  value = {'a': 1, 'b': 2}
+  delta = {}
+  state = State(value=value, delta=delta)
+
+  state['a'] = 10
+  state.update({'c': 3})
+
+  assert value == {'a': 1, 'b': 2}
+  assert delta == {'a': 10, 'c': 3}
+  assert state['a'] == 10
+  assert state.get('c') == 3
+  assert state.get('missing', 'default') == 'default'
+  assert 'b' in state
+  assert list(state) == ['a', 'c', 'b']
+  assert len(state) == 3
+  assert dict(state.items()) == state.to_dict() == {'a': 10, 'b': 2, 'c': 3}
+
+
+def test_temp_keys_are_written_to_the_value():
+  value = {}
+  delta = {}
+  state = State(value=value, delta=delta)
+
+  state['temp:scratch'] = 1
+
+  assert value == {'temp:scratch': 1}
+  assert not state.has_delta()
+  assert state['temp:scratch'] == 1
+
+
+@pytest.mark.asyncio
+async def test_delta_is_committed_when_the_event_is_appended():
+  session_service = InMemorySessionService()
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', state={'count': 0}
+  )
+  event_actions = EventActions()
+  state = State(value=session.state, delta=event_actions.state_delta)
+
+  state['count'] = state['count'] + 1
+  state['user:name'] = 'Alice'
+  assert session.state == {'count': 0}
+
+  await session_service.append_event(
+      session, Event(author='agent', actions=event_actions)
+  )
+
+  assert session.state == {'count': 1, 'user:name': 'Alice'}
+  stored_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert stored_session.state == {'count': 1, 'user:name': 'Alice'}
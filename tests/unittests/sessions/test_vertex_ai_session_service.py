@@ -12,19 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
 import re
-import this
 from typing import Any
+from unittest import mock
+import urllib.parse
 
 from dateutil.parser import isoparse
 from google.adk.events import Event
 from google.adk.events import EventActions
 from google.adk.sessions import Session
 from google.adk.sessions import VertexAiSessionService
+from google.adk.sessions import vertex_ai_session_service
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.base_session_service import ListSessionsConfig
 from google.genai import types
 import pytest
 
-
 MOCK_SESSION_JSON_1 = {
     'name': (
         'projects/test-project/locations/test-location/'
@@ -111,37 +115,55 @@ MOCK_SESSION = Session(
 
 
 SESSION_REGEX = r'^reasoningEngines/([^/]+)/sessions/([^/]+)$'
-SESSIONS_REGEX = r'^reasoningEngines/([^/]+)/sessions\?filter=user_id=([^/]+)$'
+SESSIONS_REGEX = r'^reasoningEngines/([^/]+)/sessions$'
 EVENTS_REGEX = r'^reasoningEngines/([^/]+)/sessions/([^/]+)/events$'
 LRO_REGEX = r'^operations/([^/]+)$'
+USER_FILTER_REGEX = r'user_id="?([^" ]+)"?'
+TIMESTAMP_FILTER_REGEX = r'timestamp>="([^"]+)"'
+
+
+def _page(items: list[Any], query: dict[str, list[str]]) -> dict[str, Any]:
+  """Returns the page of the items selected by the query, as the API does."""
+  start = int(query.get('pageToken', ['0'])[0])
+  page_size = int(query.get('pageSize', [len(items) or 1])[0])
+  page = {'items': items[start : start + page_size]}
+  if start + page_size < len(items):
+    page['nextPageToken'] = str(start + page_size)
+  return page
 
 
 class MockApiClient:
-  """Mocks the API Client."""
+  """Mocks the API Client with a local fake of the REST surface."""
 
   def __init__(self) -> None:
     """Initializes MockClient."""
-    this.session_dict: dict[str, Any] = {}
-    this.event_dict: dict[str, list[Any]] = {}
-
-  def request(self, http_method: str, path: str, request_dict: dict[str, Any]):
-    """Mocks the API Client request method."""
-    if http_method == 'GET':
-      if re.match(SESSIONS_REGEX, path):
-        match = re.match(SESSIONS_REGEX, path)
-        return {
-            'sessions': [
-                session
-                for session in self.session_dict.values()
-                if session['userId'] == match.group(2)
-            ],
-        }
-    raise ValueError(f'Unsupported sync path: {path}')
+    self.session_dict: dict[str, Any] = {}
+    self.event_dict: dict[str, list[Any]] = {}
+    # The number of times an operation is polled before it is done.
+    self.lro_polls_until_done = 1
+    self.sessions_page_size = None
+    self.requests: list[str] = []
+    self.in_flight = 0
+    self.max_in_flight = 0
 
   async def async_request(
       self, http_method: str, path: str, request_dict: dict[str, Any]
   ):
     """Mocks the API Client request method."""
+    self.requests.append(path)
+    self.in_flight += 1
+    self.max_in_flight = max(self.max_in_flight, self.in_flight)
+    try:
+      # Lets the other pending requests start, as a remote call would.
+      await asyncio.sleep(0)
+      return self._handle(http_method, path, request_dict)
+    finally:
+      self.in_flight -= 1
+
+  def _handle(self, http_method: str, path: str, request_dict: dict[str, Any]):
+    url = urllib.parse.urlsplit(path)
+    path = url.path
+    query = urllib.parse.parse_qs(url.query)
     if http_method == 'GET':
       if re.match(SESSION_REGEX, path):
         match = re.match(SESSION_REGEX, path)
@@ -152,31 +174,40 @@ class MockApiClient:
           else:
             raise ValueError(f'Session not found: {session_id}')
       elif re.match(SESSIONS_REGEX, path):
-        match = re.match(SESSIONS_REGEX, path)
-        return {
-            'sessions': [
+        user_id = re.match(USER_FILTER_REGEX, query['filter'][0]).group(1)
+        if self.sessions_page_size and 'pageSize' not in query:
+          query['pageSize'] = [str(self.sessions_page_size)]
+        page = _page(
+            [
                 session
                 for session in self.session_dict.values()
-                if session['userId'] == match.group(2)
+                if session['userId'] == user_id
             ],
-        }
+            query,
+        )
+        page['sessions'] = page.pop('items')
+        return page
       elif re.match(EVENTS_REGEX, path):
         match = re.match(EVENTS_REGEX, path)
-        if match:
-          return {
-              'sessionEvents': (
-                  self.event_dict[match.group(2)]
-                  if match.group(2) in self.event_dict
-                  else []
-              )
-          }
+        events = self.event_dict.get(match.group(2), [])
+        if 'filter' in query:
+          after = isoparse(
+              re.match(TIMESTAMP_FILTER_REGEX, query['filter'][0]).group(1)
+          )
+          events = [
+              event for event in events if isoparse(event['timestamp']) >= after
+          ]
+        page = _page(events, query)
+        page['sessionEvents'] = page.pop('items')
+        return page
       elif re.match(LRO_REGEX, path):
+        self.lro_polls_until_done -= 1
         return {
             'name': (
                 'projects/test-project/locations/test-location/'
                 'reasoningEngines/123/sessions/4'
             ),
-            'done': True,
+            'done': self.lro_polls_until_done <= 0,
         }
       else:
         raise ValueError(f'Unsupported path: {path}')
@@ -266,6 +297,37 @@ async def test_list_sessions():
   assert sessions.sessions[1].id == '2'
 
 
+@pytest.mark.asyncio
+async def test_list_sessions_with_pagination():
+  session_service = mock_vertex_ai_session_service()
+  with mock.patch.object(
+      session_service.api_client,
+      'async_request',
+      return_value={
+          'sessions': [MOCK_SESSION_JSON_1],
+          'nextPageToken': 'next',
+      },
+  ) as request:
+    sessions = await session_service.list_sessions(
+        app_name='123',
+        user_id='user',
+        config=ListSessionsConfig(
+            page_size=1, page_token='previous', updated_after=0
+        ),
+    )
+
+  path = request.call_args.kwargs['path']
+  assert path.startswith('reasoningEngines/123/sessions?')
+  assert urllib.parse.parse_qs(path.split('?')[1]) == {
+      'filter': ['user_id="user" AND update_time>"1970-01-01T00:00:00+00:00"'],
+      'orderBy': ['update_time desc'],
+      'pageSize': ['1'],
+      'pageToken': ['previous'],
+  }
+  assert [session.id for session in sessions.sessions] == ['1']
+  assert sessions.next_page_token == 'next'
+
+
 @pytest.mark.asyncio
 async def test_create_session():
   session_service = mock_vertex_ai_session_service()
@@ -296,3 +358,125 @@ async def test_create_session_with_custom_session_id():
     assert str(excinfo.value) == (
         'User-provided Session id is not supported for VertexAISessionService.'
     )
+
+
+def _mock_events(session_id: str, num_events: int) -> list[dict[str, Any]]:
+  return [
+      {
+          'name': (
+              'projects/test-project/locations/test-location/'
+              f'reasoningEngines/123/sessions/{session_id}/events/{i}'
+          ),
+          'invocationId': '123',
+          'author': 'user',
+          'timestamp': f'2024-12-12T12:{i // 60:02d}:{i % 60:02d}.000000Z',
+      }
+      for i in range(num_events)
+  ]
+
+
+@pytest.mark.asyncio
+async def test_get_session_fetches_session_and_events_concurrently():
+  session_service = mock_vertex_ai_session_service()
+
+  await session_service.get_session(
+      app_name='123', user_id='user', session_id='1'
+  )
+
+  assert session_service.api_client.max_in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_get_session_pages_events():
+  session_service = mock_vertex_ai_session_service()
+  session_service.api_client.event_dict['1'] = _mock_events('1', 250)
+
+  session = await session_service.get_session(
+      app_name='123', user_id='user', session_id='1'
+  )
+
+  assert [event.id for event in session.events] == [str(i) for i in range(250)]
+  events_requests = [
+      path for path in session_service.api_client.requests if '/events?' in path
+  ]
+  assert len(events_requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_session_filters_events_on_the_server():
+  session_service = mock_vertex_ai_session_service()
+  session_service.api_client.event_dict['1'] = _mock_events('1', 10)
+
+  session = await session_service.get_session(
+      app_name='123',
+      user_id='user',
+      session_id='1',
+      config=GetSessionConfig(
+          after_timestamp=isoparse('2024-12-12T12:00:07Z').timestamp()
+      ),
+  )
+
+  assert [event.id for event in session.events] == ['7', '8', '9']
+  events_request = session_service.api_client.requests[-1]
+  assert 'timestamp%3E%3D' in events_request
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_follows_pages():
+  session_service = mock_vertex_ai_session_service()
+  session_service.api_client.sessions_page_size = 1
+
+  sessions = await session_service.list_sessions(app_name='123', user_id='user')
+
+  assert [session.id for session in sessions.sessions] == ['1', '2']
+  assert sessions.next_page_token is None
+
+
+@pytest.mark.asyncio
+async def test_create_session_polls_operation_with_backoff():
+  session_service = mock_vertex_ai_session_service()
+  session_service.api_client.lro_polls_until_done = 4
+
+  with mock.patch.object(
+      vertex_ai_session_service.asyncio, 'sleep', wraps=asyncio.sleep
+  ) as sleep:
+    await session_service.create_session(app_name='123', user_id='user')
+
+  delays = [call.args[0] for call in sleep.call_args_list if call.args[0]]
+  assert delays == [0.1, 0.2, 0.4]
+
+
+@pytest.mark.asyncio
+async def test_iter_events_prefetches_one_page():
+  session_service = mock_vertex_ai_session_service()
+  session_service.api_client.event_dict['1'] = _mock_events('1', 500)
+
+  event_ids = []
+  async for event in session_service.iter_events(
+      app_name='123', user_id='user', session_id='1', batch_size=100
+  ):
+    event_ids.append(event.id)
+    if len(event_ids) == 150:
+      break
+
+  assert event_ids == [str(i) for i in range(150)]
+  events_requests = [
+      path for path in session_service.api_client.requests if '/events?' in path
+  ]
+  # Only the page after the one being consumed is requested ahead.
+  assert len(events_requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_session_without_events_does_not_list_events():
+  session_service = mock_vertex_ai_session_service()
+  session_service.api_client.event_dict['1'] = _mock_events('1', 250)
+
+  session = await session_service.get_session_without_events(
+      app_name='123', user_id='user', session_id='1'
+  )
+
+  assert session == MOCK_SESSION.model_copy(update={'events': []})
+  assert not [
+      path for path in session_service.api_client.requests if '/events' in path
+  ]
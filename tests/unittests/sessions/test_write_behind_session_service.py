@@ -0,0 +1,194 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import WriteBehindSessionService
+import pytest
+import sqlalchemy
+
+
+def _event(i: int) -> Event:
+  return Event(
+      invocation_id='invocation',
+      author='agent',
+      actions=EventActions(state_delta={'turn': i}),
+  )
+
+
+@pytest.mark.asyncio
+async def test_buffers_events_until_threshold():
+  delegate = InMemorySessionService()
+  flushed = []
+  session_service = WriteBehindSessionService(
+      delegate,
+      max_buffered_events=3,
+      max_buffer_delay=None,
+      on_flush=lambda session, events: flushed.append(len(events)),
+  )
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+
+  await session_service.append_event(session, _event(0))
+  await session_service.append_event(session, _event(1))
+
+  assert len(session.events) == 2
+  assert session.state == {'turn': 1}
+  stored_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert not stored_session.events
+  assert not flushed
+
+  await session_service.append_event(session, _event(2))
+
+  stored_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert [e.id for e in stored_session.events] == [e.id for e in session.events]
+  assert stored_session.state == {'turn': 2}
+  assert flushed == [3]
+
+
+@pytest.mark.asyncio
+async def test_get_session_flushes_pending_events():
+  session_service = WriteBehindSessionService(
+      InMemorySessionService(), max_buffer_delay=None
+  )
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  await session_service.append_event(session, _event(0))
+
+  fetched_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  assert len(fetched_session.events) == 1
+  assert fetched_session.state == {'turn': 0}
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_delay():
+  delegate = InMemorySessionService()
+  session_service = WriteBehindSessionService(delegate, max_buffer_delay=0.01)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  await session_service.append_event(session, _event(0))
+
+  await asyncio.sleep(0.05)
+
+  stored_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert len(stored_session.events) == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_persists_batch_in_one_transaction():
+  delegate = DatabaseSessionService('sqlite:///:memory:')
+  session_service = WriteBehindSessionService(delegate, max_buffer_delay=None)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  for i in range(3):
+    await session_service.append_event(session, _event(i))
+
+  commits = []
+  sqlalchemy.event.listen(delegate.db_engine, 'commit', commits.append)
+  await session_service.flush(session)
+
+  assert len(commits) == 1
+  stored_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert len(stored_session.events) == 3
+  assert stored_session.state == {'turn': 2}
+  # The caller's session can still be written to directly.
+  assert session.last_update_time == stored_session.last_update_time
+  await delegate.append_event(session, _event(3))
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_events_buffered():
+  delegate = InMemorySessionService()
+  errors = []
+  session_service = WriteBehindSessionService(
+      delegate,
+      max_buffer_delay=None,
+      on_flush_error=lambda session, events, error: errors.append(error),
+  )
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  await session_service.append_event(session, _event(0))
+
+  with pytest.MonkeyPatch.context() as monkeypatch:
+    monkeypatch.setattr(
+        delegate, 'append_events', _raise(RuntimeError('unavailable'))
+    )
+    with pytest.raises(RuntimeError):
+      await session_service.flush(session)
+  assert len(errors) == 1
+
+  await session_service.flush(session)
+
+  stored_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert len(stored_session.events) == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_rebases_on_concurrent_append():
+  delegate = DatabaseSessionService('sqlite:///:memory:')
+  session_service = WriteBehindSessionService(delegate, max_buffer_delay=None)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', state={'turn': 0}
+  )
+  # Another writer appends to the session through the delegate.
+  other_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  await delegate.append_event(
+      other_session,
+      Event(
+          invocation_id='other',
+          author='agent',
+          actions=EventActions(state_delta={'other': True}),
+      ),
+  )
+
+  await session_service.append_event(session, _event(1))
+  await session_service.flush(session)
+
+  stored_session = await delegate.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert len(stored_session.events) == 2
+  assert stored_session.state == {'turn': 1, 'other': True}
+  assert session.version == stored_session.version
+
+
+def _raise(error: Exception):
+  async def append_events(session, events):
+    raise error
+
+  return append_events
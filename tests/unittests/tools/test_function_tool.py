@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import threading
 from unittest.mock import MagicMock
 
 from google.adk.tools.function_tool import FunctionTool
@@ -236,3 +238,30 @@ async def test_run_async_with_optional_args_not_set_async_func():
   args = {"arg1": "test_value_1", "arg3": "test_value_3"}
   result = await tool.run_async(args=args, tool_context=MagicMock())
   assert result == "test_value_1,test_value_3"
+
+
+@pytest.mark.asyncio
+async def test_run_async_sync_func_runs_in_thread_pool():
+  """Test that blocking synchronous functions don't block the event loop."""
+  barrier = threading.Barrier(2, timeout=5)
+
+  def blocking_func():
+    # Only returns if both calls run at the same time.
+    barrier.wait()
+    return threading.current_thread()
+
+  tool = FunctionTool(blocking_func)
+  threads = await asyncio.gather(
+      tool.run_async(args={}, tool_context=MagicMock()),
+      tool.run_async(args={}, tool_context=MagicMock()),
+  )
+  assert threading.current_thread() not in threads
+  assert threads[0] is not threads[1]
+
+
+@pytest.mark.asyncio
+async def test_run_async_sync_func_without_executor():
+  """Test that synchronous functions run on the event loop with executor=None."""
+  tool = FunctionTool(threading.current_thread, executor=None)
+  result = await tool.run_async(args={}, tool_context=MagicMock())
+  assert result is threading.current_thread()
@@ -0,0 +1,155 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures.process import BrokenProcessPool
+import os
+
+from google.adk.agents import Agent
+from google.adk.tools import tool_process_pool
+from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.tool_context import ToolContext
+from google.adk.tools.tool_process_pool import ToolProcessPool
+from google.genai import types
+import pytest
+
+from .. import utils
+
+
+# The functions run in the worker processes must be importable by them.
+def get_pid(offset: int) -> int:
+  return os.getpid() + offset
+
+
+def exit_worker():
+  os._exit(1)
+
+
+def update_context(key: str, tool_context: ToolContext) -> str:
+  tool_context.state[key] = tool_context.state.get('count', 0) + 1
+  tool_context.state['temp:scratch'] = 'worker'
+  tool_context.actions.skip_summarization = True
+  return f'{tool_context.agent_name}:{tool_context.function_call_id}'
+
+
+async def save_report(tool_context: ToolContext) -> dict[str, str]:
+  await tool_context.save_artifact(
+      'report.txt', types.Part.from_text(text='report')
+  )
+  return {'status': 'saved'}
+
+
+async def load_report(tool_context: ToolContext):
+  return await tool_context.load_artifact('report.txt')
+
+
+@pytest.fixture(scope='module')
+def pool():
+  pool = ToolProcessPool(max_workers=1)
+  pool.warm_up()
+  yield pool
+  pool.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def shared_pool(pool, monkeypatch):
+  monkeypatch.setattr(tool_process_pool, '_pool', pool)
+
+
+async def _create_tool_context() -> ToolContext:
+  invocation_context = await utils.create_invocation_context(
+      Agent(name='test_agent')
+  )
+  invocation_context.session.state['count'] = 1
+  return ToolContext(invocation_context, function_call_id='call_1')
+
+
+@pytest.mark.asyncio
+async def test_runs_in_worker_process():
+  tool = FunctionTool(get_pid, executor='process')
+
+  result = await tool.run_async(args={'offset': 0}, tool_context=None)
+
+  assert result != os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_tool_context_changes_are_applied():
+  tool_context = await _create_tool_context()
+  tool = FunctionTool(update_context, executor='process')
+
+  result = await tool.run_async(
+      args={'key': 'new_count'}, tool_context=tool_context
+  )
+
+  assert result == 'test_agent:call_1'
+  assert tool_context.actions.state_delta == {'new_count': 2}
+  assert tool_context.state['new_count'] == 2
+  assert tool_context.actions.skip_summarization
+  session = tool_context._invocation_context.session
+  assert session.state['temp:scratch'] == 'worker'
+
+
+@pytest.mark.asyncio
+async def test_only_temp_state_set_by_function_is_returned():
+  tool_context = await _create_tool_context()
+  tool_context.state['temp:other'] = 'parent'
+
+  _, _, _, temp_state = tool_process_pool._call_in_process(
+      update_context,
+      {'key': 'new_count'},
+      tool_process_pool._ProcessToolContext(tool_context),
+  )
+
+  assert temp_state == {'temp:scratch': 'worker'}
+
+
+@pytest.mark.asyncio
+async def test_saved_artifacts_are_applied():
+  tool_context = await _create_tool_context()
+  tool = FunctionTool(save_report, executor='process')
+
+  result = await tool.run_async(args={}, tool_context=tool_context)
+
+  assert result == {'status': 'saved'}
+  assert tool_context.actions.artifact_delta == {'report.txt': 0}
+  assert (await tool_context.load_artifact('report.txt')).text == 'report'
+
+
+@pytest.mark.asyncio
+async def test_artifacts_cannot_be_loaded():
+  tool_context = await _create_tool_context()
+  tool = FunctionTool(load_report, executor='process')
+
+  with pytest.raises(ValueError, match='cannot be loaded'):
+    await tool.run_async(args={}, tool_context=tool_context)
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_replaced():
+  pool = ToolProcessPool(max_workers=1)
+  try:
+    with pytest.raises(BrokenProcessPool):
+      await pool.run(exit_worker)
+
+    assert await pool.run(get_pid, offset=0) != os.getpid()
+  finally:
+    pool.shutdown()
+
+
+def test_function_must_be_picklable():
+  def local_function():
+    pass
+
+  with pytest.raises(ValueError, match='cannot be pickled'):
+    FunctionTool(local_function, executor='process')
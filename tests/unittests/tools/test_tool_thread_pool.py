@@ -0,0 +1,116 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import contextvars
+import threading
+
+from google.adk.tools import tool_thread_pool
+from google.adk.tools.tool_thread_pool import ToolThreadPool
+import pytest
+
+_request_id = contextvars.ContextVar('request_id', default=None)
+
+
+@pytest.fixture
+def pool():
+  pool = ToolThreadPool(max_workers=1)
+  yield pool
+  pool.shutdown()
+
+
+async def _wait_for(condition):
+  while not condition():
+    await asyncio.sleep(0.001)
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_in_caller_context(pool):
+  _request_id.set('request-1')
+
+  def func(suffix):
+    return f'{_request_id.get()}-{suffix}'
+
+  assert await pool.run(func, suffix='a') == 'request-1-a'
+
+
+@pytest.mark.asyncio
+async def test_stats_report_saturation(pool):
+  release = threading.Event()
+  first = asyncio.ensure_future(pool.run(release.wait))
+  second = asyncio.ensure_future(pool.run(release.wait))
+  await _wait_for(lambda: pool.stats().active_calls == 1)
+
+  stats = pool.stats()
+  assert stats.max_workers == 1
+  assert stats.queued_calls == 1
+  assert stats.completed_calls == 0
+
+  release.set()
+  await asyncio.gather(first, second)
+  stats = pool.stats()
+  assert stats.active_calls == 0
+  assert stats.queued_calls == 0
+  assert stats.completed_calls == 2
+  assert stats.total_queue_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_call_does_not_run(pool):
+  release = threading.Event()
+  calls = []
+
+  def func():
+    calls.append('queued')
+
+  running = asyncio.ensure_future(pool.run(release.wait))
+  queued = asyncio.ensure_future(pool.run(func))
+  await _wait_for(lambda: pool.stats().queued_calls == 1)
+
+  queued.cancel()
+  with pytest.raises(asyncio.CancelledError):
+    await queued
+  release.set()
+  await running
+
+  assert not calls
+  assert pool.stats().queued_calls == 0
+  assert pool.stats().completed_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_raised_to_the_caller(pool):
+  def fail():
+    raise ValueError('failed')
+
+  with pytest.raises(ValueError, match='failed'):
+    await pool.run(fail)
+  assert pool.stats().completed_calls == 1
+
+
+def test_set_tool_thread_pool(monkeypatch):
+  monkeypatch.setattr(tool_thread_pool, '_pool', None)
+  default_pool = tool_thread_pool.get_tool_thread_pool()
+  assert tool_thread_pool.get_tool_thread_pool() is default_pool
+
+  pool = ToolThreadPool(max_workers=2)
+  tool_thread_pool.set_tool_thread_pool(pool)
+  assert tool_thread_pool.get_tool_thread_pool() is pool
+  pool.shutdown()
+  default_pool.shutdown()
+
+
+def test_invalid_max_workers():
+  with pytest.raises(ValueError):
+    ToolThreadPool(max_workers=0)